@@ -0,0 +1,44 @@
+"""
+Порівняння req/s та p99 між WSGI та ASGI розгортаннями одного сайту.
+
+Обидва сервери запускаються окремо (див. README), скрипт лише навантажує їх
+однаковими запитами по черзі і друкує таблицю або JSON.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.loadgen import format_table, run_load  # noqa: E402
+
+DEFAULT_PATHS = ['/', '/elevix/trainers/', '/elevix/trainers/1/']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--wsgi', required=True, help='Базовий URL WSGI-сервера, напр. http://127.0.0.1:8001')
+    parser.add_argument('--asgi', required=True, help='Базовий URL ASGI-сервера, напр. http://127.0.0.1:8002')
+    parser.add_argument('--path', action='append', dest='paths', help='Шлях для навантаження (можна кілька)')
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=15.0)
+    parser.add_argument('--json', action='store_true', help='Вивести результат у JSON')
+    args = parser.parse_args()
+
+    results = []
+    for path in args.paths or DEFAULT_PATHS:
+        for stack, base_url in (('wsgi', args.wsgi), ('asgi', args.asgi)):
+            result = run_load(base_url.rstrip('/') + path, args.concurrency, args.duration)
+            result['stack'] = stack
+            results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print(format_table(results, 'stack'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""Генератор навантаження: N потоків, кожен зі своїм keep-alive з'єднанням"""
+import http.client
+import re
+import threading
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+CSRF_INPUT_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def percentile(sorted_values, p):
+    """Перцентиль p (0-100) з уже відсортованого списку"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _connect(parts, timeout):
+    cls = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    return cls(parts.hostname, parts.port, timeout=timeout)
+
+
+def _cookies(response, jar):
+    for header in response.headers.get_all('Set-Cookie') or []:
+        jar.load(header)
+    return '; '.join(f'{name}={morsel.value}' for name, morsel in jar.items())
+
+
+def login(base_url, email, password, login_path='/admin/login/', timeout=30.0):
+    """
+    Входить через форму входу адмінки і повертає заголовок Cookie з сесією.
+
+    Та сама сесія відкриває і /elevix/profile/, і changelist-и адмінки.
+    """
+    parts = urlsplit(base_url)
+    conn = _connect(parts, timeout)
+    jar = SimpleCookie()
+    try:
+        conn.request('GET', login_path)
+        response = conn.getresponse()
+        match = CSRF_INPUT_RE.search(response.read().decode())
+        cookie = _cookies(response, jar)
+        if match is None:
+            raise RuntimeError(f'Не знайдено CSRF-токен на {login_path}')
+
+        body = urlencode({
+            'csrfmiddlewaretoken': match.group(1),
+            'username': email,
+            'password': password,
+            'next': '/admin/',
+        })
+        conn.request('POST', login_path, body=body, headers={
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Cookie': cookie,
+            'Referer': base_url.rstrip('/') + login_path,
+        })
+        response = conn.getresponse()
+        response.read()
+        cookie = _cookies(response, jar)
+    finally:
+        conn.close()
+
+    if response.status != 302 or 'sessionid' not in jar:
+        raise RuntimeError(f'Не вдалося увійти як {email} (HTTP {response.status})')
+    return cookie
+
+
+def check_ok(url, headers=None, timeout=30.0):
+    """Один GET перед навантаженням: сторінка має віддати 200, інакше вимірювати нічого"""
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path = f'{path}?{parts.query}'
+    conn = _connect(parts, timeout)
+    try:
+        conn.request('GET', path, headers=dict(headers or {}))
+        response = conn.getresponse()
+        response.read()
+    finally:
+        conn.close()
+    if response.status != 200:
+        location = response.getheader('Location') or ''
+        message = f'{url}: HTTP {response.status}' + (f' -> {location}' if location else '')
+        if location.startswith('https://'):
+            message += ' (для HTTP-бенчмарку запускайте сервер з SECURE_SSL_REDIRECT=False)'
+        raise RuntimeError(message)
+
+
+def _int_header(response, name):
+    value = response.getheader(name)
+    return int(float(value)) if value is not None else None
+
+
+def run_load(url, concurrency=50, duration=10.0, headers=None, timeout=30.0):
+    """
+    Навантажує URL протягом duration секунд з concurrency паралельними клієнтами.
+
+    Повертає словник з req/s, латентністю (мс) та кількістю помилок. Якщо сервер
+    віддає заголовки QueryBudgetMiddleware (QUERY_BUDGET_HEADERS = True), додає
+    кількість SQL-запитів, час БД та RSS кожного воркера.
+    """
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path = f'{path}?{parts.query}'
+    headers = dict(headers or {})
+
+    latencies, errors = [], [0]
+    queries, db_times, workers = [], [], {}
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(concurrency + 1)
+    deadline = [0.0]
+
+    def worker():
+        local_latencies, local_errors = [], 0
+        local_queries, local_db_times, local_workers = [], [], {}
+        conn = _connect(parts, timeout)
+        start_barrier.wait()
+        while time.perf_counter() < deadline[0]:
+            started = time.perf_counter()
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                # Редирект (наприклад, на HTTPS чи сторінку входу) - не виміряна сторінка
+                if response.status != 200:
+                    local_errors += 1
+                else:
+                    local_latencies.append(time.perf_counter() - started)
+                    if response.getheader('X-DB-Queries') is not None:
+                        local_queries.append(_int_header(response, 'X-DB-Queries'))
+                        local_db_times.append(float(response.getheader('X-DB-Time-Ms')))
+                        pid = _int_header(response, 'X-Worker-PID')
+                        rss = _int_header(response, 'X-Worker-RSS-KB')
+                        local_workers[pid] = max(rss, local_workers.get(pid, 0))
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+                conn = _connect(parts, timeout)
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+            queries.extend(local_queries)
+            db_times.extend(local_db_times)
+            for pid, rss in local_workers.items():
+                workers[pid] = max(rss, workers.get(pid, 0))
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    deadline[0] = time.perf_counter() + duration
+    start_barrier.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    latencies.sort()
+    to_ms = lambda value: round(value * 1000, 2) if value is not None else None
+    return {
+        'url': url,
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': to_ms(percentile(latencies, 50)),
+        'p95_ms': to_ms(percentile(latencies, 95)),
+        'p99_ms': to_ms(percentile(latencies, 99)),
+        'queries_avg': round(sum(queries) / len(queries), 2) if queries else None,
+        'queries_max': max(queries) if queries else None,
+        'db_ms_avg': round(sum(db_times) / len(db_times), 2) if db_times else None,
+        # Піковий RSS кожного воркера, що відповідав (PID -> КБ)
+        'worker_rss_kb': {str(pid): rss for pid, rss in sorted(workers.items())},
+    }
+
+
+def format_table(results, label_key):
+    """Текстова таблиця результатів; label_key - поле, що розрізняє рядки"""
+    lines = [
+        f"{label_key:<8} {'path':<28} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'queries':>8} {'rss MB':>8} {'errors':>7}"
+    ]
+    for result in results:
+        path = '/' + result['url'].split('/', 3)[-1]
+        rss = max(result.get('worker_rss_kb', {}).values(), default=None)
+        rss_mb = round(rss / 1024, 1) if rss else None
+        lines.append(
+            f"{result[label_key]!s:<8} {path:<28} {result['rps']:>9} {result['p50_ms']!s:>9} "
+            f"{result['p95_ms']!s:>9} {result['p99_ms']!s:>9} {result.get('queries_avg')!s:>8} "
+            f"{rss_mb!s:>8} {result['errors']:>7}"
+        )
+    return '\n'.join(lines)
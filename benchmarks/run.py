@@ -0,0 +1,104 @@
+"""
+Навантажувальний тест сайту: публічні сторінки, профіль та changelist-и адмінки.
+
+Підготовка (локальна БД, див. README):
+
+    python manage.py seed_benchmark --reset --trainers 500 --users 5000
+    QUERY_BUDGET_ENABLED=True QUERY_BUDGET_HEADERS=True DEBUG=False SECURE_SSL_REDIRECT=False \
+        gunicorn mysite.asgi:application -k uvicorn.workers.UvicornWorker -w 4
+
+Запуск:
+
+    python benchmarks/run.py --base-url http://127.0.0.1:8000 --label 1.4.0 --output bench-1.4.0.json
+
+Для кожного шляху звіт містить req/s, p50/p95/p99, середню кількість SQL-запитів
+і піковий RSS кожного воркера. JSON-звіти різних релізів можна порівнювати напряму.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.loadgen import check_ok, format_table, login, run_load  # noqa: E402
+
+PUBLIC_PATHS = ['/', '/elevix/trainers/', '/elevix/trainers/{trainer_pk}/']
+AUTH_PATHS = [
+    '/elevix/profile/',
+    '/admin/elevix/trainer/',
+    '/admin/elevix/service/',
+    '/admin/elevix/pricingplan/',
+    '/admin/elevix/booking/',
+    '/admin/elevix/schedule/',
+    '/admin/elevix/gymuser/',
+]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--trainer-pk', type=int, default=1, help='pk тренера для детальної сторінки')
+    parser.add_argument('--email', default='admin@bench.local', help='Адмін для профілю та адмінки')
+    parser.add_argument('--password', default='bench-admin')
+    parser.add_argument('--public-only', action='store_true', help='Без профілю та адмінки')
+    parser.add_argument('--path', action='append', dest='paths', help='Замість стандартного набору шляхів')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=15.0)
+    parser.add_argument('--label', default='', help='Мітка запуску (реліз, гілка)')
+    parser.add_argument('--output', help='Записати JSON-звіт у файл')
+    parser.add_argument('--json', action='store_true', help='Вивести JSON-звіт замість таблиці')
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip('/')
+    targets = [(path, False) for path in args.paths] if args.paths else (
+        [(path.format(trainer_pk=args.trainer_pk), False) for path in PUBLIC_PATHS]
+        + ([] if args.public_only else [(path, True) for path in AUTH_PATHS])
+    )
+
+    cookie = None
+    if any(needs_auth for _, needs_auth in targets):
+        cookie = login(base_url, args.email, args.password)
+
+    results = []
+    for path, needs_auth in targets:
+        headers = {'Cookie': cookie} if needs_auth else None
+        check_ok(base_url + path, headers=headers)
+        result = run_load(base_url + path, args.concurrency, args.duration, headers=headers)
+        result['auth'] = needs_auth
+        results.append(result)
+
+    report = {
+        'label': args.label,
+        'revision': _git_revision(),
+        'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'base_url': base_url,
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'python': platform.python_version(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(format_table(results, 'auth'))
+
+
+if __name__ == '__main__':
+    main()
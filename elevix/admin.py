@@ -1,7 +1,16 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.html import format_html
-from django.db.models import Count, Sum
+from django.db.models import Count, Q, Sum
+from .bulk import run_or_enqueue
+from .cache import CATALOG, SCHEDULE, bump_version
+from .catalog import schedule_rebuild
+from .exports import choice_label, export_csv, local_datetime, yes_no
+from .images import get_thumbnail_url
+from .jobs import stale_running
+from .ledger import CheckInError, check_in, reconcile_balances
 from .models import (
     GymUser,
     Trainer,
@@ -9,17 +18,54 @@ from .models import (
     PricingPlan,
     ServiceFeature,
     Booking,
+    BookingEvent,
+    Job,
+    SessionUsage,
     Schedule,
+    SlotOccurrence,
+    WaitlistEntry,
+    Notification,
     FAQ,
 )
+from .overlaps import describe_overlap, find_overlaps
+from .pagination import EstimatedCountPaginator
+from .search import TrigramSearchMixin
+from .slots import schedule_regenerate
+from .transitions import transition_bookings
+
+
+def run_bulk_action(modeladmin, request, queryset, action, done_message):
+    """Виконує масову дію або ставить її у фон (elevix.bulk) і повідомляє адміністратора"""
+    changed, job = run_or_enqueue(action, queryset, request.user)
+    if job is None:
+        modeladmin.message_user(request, done_message.format(changed))
+        return
+    modeladmin.message_user(request, format_html(
+        'Вибірка велика, дію виконає run_jobs порціями. Прогрес: <a href="{}">завдання #{}</a>.',
+        reverse('admin:elevix_job_change', args=[job.pk]),
+        job.pk,
+    ))
+
+
+def image_preview(field_file, size=50):
+    """Кругле превʼю зображення з кешованої мініатюри замість повного оригіналу"""
+    if not field_file:
+        return '—'
+    return format_html(
+        '<img src="{}" width="{}" height="{}" loading="lazy" style="border-radius: 50%; object-fit: cover;" />',
+        get_thumbnail_url(field_file),
+        size,
+        size
+    )
 
 
 @admin.register(GymUser)
-class GymUserAdmin(UserAdmin):
+class GymUserAdmin(TrigramSearchMixin, UserAdmin):
     """Адмін панель для GymUser"""
 
     # Поля які показуються в списку
     list_display = (
+        'avatar_preview',
         'email',
         'get_full_name_display',
         'phone',
@@ -39,7 +85,7 @@ class GymUserAdmin(UserAdmin):
         'date_joined',
     )
 
-    # Пошук
+    # Пошук (по триграмних індексах, номер - у будь-якому форматі)
     search_fields = (
         'email',
         'first_name',
@@ -47,6 +93,11 @@ class GymUserAdmin(UserAdmin):
         'middle_name',
         'phone',
     )
+    phone_search_fields = ('phone',)
+
+    # Мільйони рядків: оцінка кількості замість COUNT(*) і без другого підрахунку всієї таблиці
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     # Сортування за замовчуванням
     ordering = ('-date_joined',)
@@ -100,6 +151,11 @@ class GymUserAdmin(UserAdmin):
     )
 
     # Кастомні методи для відображення
+    @admin.display(description='Аватар')
+    def avatar_preview(self, obj):
+        """Попередній перегляд аватара"""
+        return image_preview(obj.avatar)
+
     @admin.display(description='ПІБ', ordering='last_name')
     def get_full_name_display(self, obj):
         """Відображення повного імені"""
@@ -123,7 +179,7 @@ class GymUserAdmin(UserAdmin):
         fieldsets = super().get_fieldsets(request, obj)
         return fieldsets
 
-    actions = ['activate_users', 'deactivate_users']
+    actions = ['activate_users', 'deactivate_users', 'export_users']
 
     @admin.action(description='✅ Активувати обраних користувачів')
     def activate_users(self, request, queryset):
@@ -132,8 +188,23 @@ class GymUserAdmin(UserAdmin):
 
     @admin.action(description='❌ Деактивувати обраних користувачів')
     def deactivate_users(self, request, queryset):
-        updated = queryset.update(is_active=False)
-        self.message_user(request, f'Деактивовано {updated} користувач(ів).')
+        run_bulk_action(self, request, queryset, 'deactivate_users', 'Деактивовано {} користувач(ів).')
+
+    @admin.action(description='📊 Експортувати обраних користувачів у CSV')
+    def export_users(self, request, queryset):
+        return export_csv(queryset, f'users-{timezone.localdate():%Y-%m-%d}.csv', [
+            ('ID', 'id'),
+            ('Email', 'email'),
+            ('Прізвище', 'last_name'),
+            ("Ім'я", 'first_name'),
+            ('По батькові', 'middle_name'),
+            ('Телефон', 'phone'),
+            ('Вік', 'age'),
+            ('Стать', 'gender', choice_label(GymUser, 'gender')),
+            ('Активний', 'is_active', yes_no),
+            ('Персонал', 'is_staff', yes_no),
+            ('Дата реєстрації', 'date_joined', local_datetime),
+        ])
 
 
 @admin.register(Trainer)
@@ -202,16 +273,14 @@ class TrainerAdmin(admin.ModelAdmin):
     # Автозаповнення для ForeignKey
     autocomplete_fields = ['user']
 
+    # Колонка user_link читає користувача з того самого запиту
+    list_select_related = ('user',)
+
     # Кастомні методи
     @admin.display(description='Фото')
     def get_photo_preview(self, obj):
         """Попередній перегляд фото"""
-        if obj.photo:
-            return format_html(
-                '<img src="{}" width="50" height="50" style="border-radius: 50%; object-fit: cover;" />',
-                obj.photo.url
-            )
-        return '—'
+        return image_preview(obj.photo)
 
     @admin.display(description='ПІБ', ordering='last_name')
     def get_full_name(self, obj):
@@ -254,14 +323,21 @@ class TrainerAdmin(admin.ModelAdmin):
     # Дії
     actions = ['export_trainers']
 
-    @admin.action(description='📊 Експортувати обраних тренерів')
+    @admin.action(description='📊 Експортувати обраних тренерів у CSV')
     def export_trainers(self, request, queryset):
-        """Експорт тренерів (приклад)"""
-        count = queryset.count()
-        self.message_user(
-            request,
-            f'Експортовано {count} тренер(ів).'
-        )
+        """Експорт тренерів; email користувача береться JOIN-ом у тому самому запиті"""
+        return export_csv(queryset, f'trainers-{timezone.localdate():%Y-%m-%d}.csv', [
+            ('ID', 'id'),
+            ('Прізвище', 'last_name'),
+            ("Ім'я", 'first_name'),
+            ('По батькові', 'middle_name'),
+            ('Вік', 'age'),
+            ('Стать', 'gender', choice_label(Trainer, 'gender')),
+            ('Спеціалізація', 'specialization', choice_label(Trainer, 'specialization')),
+            ('Досвід (років)', 'experience'),
+            ('Email користувача', 'user__email'),
+            ('Дата створення', 'created_at', local_datetime),
+        ])
 
 
 class ServiceFeatureInline(admin.TabularInline):
@@ -271,6 +347,30 @@ class ServiceFeatureInline(admin.TabularInline):
     fields = ('feature_text', 'icon', 'sort_order')
 
 
+class SessionUsageInline(admin.TabularInline):
+    """Журнал відвідувань пакета (лише перегляд - записи додає дія «Відмітити відвідування»)"""
+    model = SessionUsage
+    extra = 0
+    fields = ('created_at', 'sessions', 'slot', 'checked_in_by', 'note')
+    readonly_fields = fields
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+class BookingEventInline(admin.TabularInline):
+    """Історія статусів бронювання (лише перегляд)"""
+    model = BookingEvent
+    extra = 0
+    fields = ('created_at', 'from_status', 'to_status', 'actor')
+    readonly_fields = fields
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 class PricingPlanInline(admin.TabularInline):
     """Inline для тарифних планів"""
     model = PricingPlan
@@ -288,6 +388,7 @@ class ServiceAdmin(admin.ModelAdmin):
         'duration',
         'trainer_link',
         'is_active',
+        'cheapest_price_display',
         'plans_count',
         'features_count',
         'created_at',
@@ -328,6 +429,15 @@ class ServiceAdmin(admin.ModelAdmin):
 
     inlines = [PricingPlanInline, ServiceFeatureInline]
 
+    list_select_related = ('trainer',)
+
+    def get_queryset(self, request):
+        # Лічильники та найдешевший тариф рахуються в запиті списку, а не окремо для кожного рядка
+        return super().get_queryset(request).with_cheapest_plan().annotate(
+            plans_total=Count('pricing_plans', distinct=True),
+            features_total=Count('features', distinct=True),
+        )
+
     @admin.display(description='Категорія')
     def category_display(self, obj):
         """Відображення категорії з емодзі"""
@@ -351,29 +461,39 @@ class ServiceAdmin(admin.ModelAdmin):
             )
         return '—'
 
-    @admin.display(description='Тарифів')
+    @admin.display(description='Від (грн/заняття)', ordering='cheapest_price_per_session')
+    def cheapest_price_display(self, obj):
+        """Найнижча ціна заняття серед тарифів (підзапит у БД)"""
+        if obj.cheapest_price_per_session is None:
+            return '—'
+        return format_html('<span style="color: green;">{}</span>', obj.cheapest_price_per_session)
+
+    @admin.display(description='Тарифів', ordering='plans_total')
     def plans_count(self, obj):
         """Кількість тарифних планів"""
-        count = obj.pricing_plans.count()
-        return format_html('<span style="color: blue;">📊 {}</span>', count)
+        return format_html('<span style="color: blue;">📊 {}</span>', obj.plans_total)
 
-    @admin.display(description='Особливостей')
+    @admin.display(description='Особливостей', ordering='features_total')
     def features_count(self, obj):
         """Кількість особливостей"""
-        count = obj.features.count()
-        return format_html('<span style="color: green;">✅ {}</span>', count)
+        return format_html('<span style="color: green;">✅ {}</span>', obj.features_total)
 
     actions = ['activate_services', 'deactivate_services']
 
     @admin.action(description='✅ Активувати обрані послуги')
     def activate_services(self, request, queryset):
-        updated = queryset.update(is_active=True)
+        # pk беремо до update(): з фільтром is_active=False вибірка після нього порожня
+        service_ids = list(queryset.values_list('pk', flat=True))
+        updated = Service.objects.filter(pk__in=service_ids).update(is_active=True, updated_at=timezone.now())
+        # update() не надсилає сигнали - оновлюємо знімки та кеш вручну
+        schedule_rebuild(service_ids)
+        schedule_regenerate(service_ids=service_ids)
+        bump_version(CATALOG)
         self.message_user(request, f'Активовано {updated} послуг(и).')
 
     @admin.action(description='❌ Деактивувати обрані послуги')
     def deactivate_services(self, request, queryset):
-        updated = queryset.update(is_active=False)
-        self.message_user(request, f'Деактивовано {updated} послуг(и).')
+        run_bulk_action(self, request, queryset, 'deactivate_services', 'Деактивовано {} послуг(и).')
 
 
 @admin.register(PricingPlan)
@@ -387,6 +507,7 @@ class PricingPlanAdmin(admin.ModelAdmin):
         'price_display',
         'sessions_count',
         'discount_percent',
+        'effective_price_display',
         'price_per_session_display',
         'is_default',
     )
@@ -417,13 +538,16 @@ class PricingPlanAdmin(admin.ModelAdmin):
                 'price',
                 'sessions_count',
                 'discount_percent',
+                'effective_price',
+                'price_per_session',
                 'is_default',
             )
         }),
     )
 
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('effective_price', 'price_per_session', 'created_at', 'updated_at')
     autocomplete_fields = ['service']
+    list_select_related = ('service',)
 
     @admin.display(description='Послуга')
     def service_link(self, obj):
@@ -450,11 +574,15 @@ class PricingPlanAdmin(admin.ModelAdmin):
         """Відображення ціни"""
         return format_html('<strong style="color: green;">{} грн</strong>', obj.price)
 
-    @admin.display(description='Ціна/заняття')
+    @admin.display(description='Зі знижкою', ordering='effective_price')
+    def effective_price_display(self, obj):
+        """Ціна зі знижкою (обчислена в БД)"""
+        return format_html('<strong style="color: green;">{} грн</strong>', obj.effective_price)
+
+    @admin.display(description='Ціна/заняття', ordering='price_per_session')
     def price_per_session_display(self, obj):
-        """Ціна за одне заняття"""
-        price = obj.get_price_per_session()
-        return format_html('<span style="color: blue;">{:.2f} грн</span>', price)
+        """Ціна за одне заняття (обчислена в БД)"""
+        return format_html('<span style="color: blue;">{} грн</span>', obj.price_per_session)
 
 
 @admin.register(ServiceFeature)
@@ -487,6 +615,7 @@ class ServiceFeatureAdmin(admin.ModelAdmin):
     )
 
     autocomplete_fields = ['service']
+    list_select_related = ('service',)
 
     @admin.display(description='Послуга')
     def service_link(self, obj):
@@ -500,7 +629,7 @@ class ServiceFeatureAdmin(admin.ModelAdmin):
 
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(TrigramSearchMixin, admin.ModelAdmin):
     """Адмін панель для Booking"""
 
     list_display = (
@@ -521,12 +650,19 @@ class BookingAdmin(admin.ModelAdmin):
         'created_at',
     )
 
+    # Поля користувача і послуги шукаються підзапитами по їх індексах, без JOIN
     search_fields = (
         'user__email',
         'user__first_name',
         'user__last_name',
+        'user__phone',
         'service__name',
     )
+    phone_search_fields = ('user__phone',)
+
+    # Мільйони рядків: оцінка кількості замість COUNT(*) і без другого підрахунку всієї таблиці
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     ordering = ('-booking_date',)
 
@@ -538,6 +674,7 @@ class BookingAdmin(admin.ModelAdmin):
             'fields': (
                 'service',
                 'pricing_plan',
+                'schedule',
             )
         }),
         ('📅 Дата та статус', {
@@ -564,8 +701,11 @@ class BookingAdmin(admin.ModelAdmin):
         }),
     )
 
-    readonly_fields = ('created_at', 'updated_at')
-    autocomplete_fields = ['user', 'service', 'pricing_plan']
+    # Баланс занять змінюється лише через журнал (check_in / reconcile_balances)
+    readonly_fields = ('sessions_total', 'sessions_remaining', 'created_at', 'updated_at')
+    autocomplete_fields = ['user', 'service', 'pricing_plan', 'schedule']
+    inlines = [SessionUsageInline, BookingEventInline]
+    list_select_related = ('user', 'service')
 
     @admin.display(description='Користувач')
     def user_link(self, obj):
@@ -627,22 +767,67 @@ class BookingAdmin(admin.ModelAdmin):
             )
         return '—'
 
-    actions = ['confirm_bookings', 'complete_bookings', 'cancel_bookings']
+    actions = [
+        'confirm_bookings', 'complete_bookings', 'cancel_bookings', 'check_in_bookings', 'reconcile_sessions',
+        'export_bookings',
+    ]
 
     @admin.action(description='✅ Підтвердити обрані бронювання')
     def confirm_bookings(self, request, queryset):
-        updated = queryset.filter(status='pending').update(status='confirmed')
-        self.message_user(request, f'Підтверджено {updated} бронювань.')
+        self._transition(request, queryset, 'confirmed', 'Підтверджено')
 
     @admin.action(description='🎉 Завершити обрані бронювання')
     def complete_bookings(self, request, queryset):
-        updated = queryset.filter(status='confirmed').update(status='completed')
-        self.message_user(request, f'Завершено {updated} бронювань.')
+        self._transition(request, queryset, 'completed', 'Завершено')
 
     @admin.action(description='❌ Скасувати обрані бронювання')
     def cancel_bookings(self, request, queryset):
-        updated = queryset.update(status='cancelled')
-        self.message_user(request, f'Скасовано {updated} бронювань.')
+        # Черга заповнюється одразу в транзакції кожної порції; повідомлення про скасування надсилає run_jobs
+        run_bulk_action(self, request, queryset, 'cancel_bookings', 'Скасовано {} бронювань.')
+
+    def _transition(self, request, queryset, to_status, verb):
+        changed, skipped = transition_bookings(queryset.values_list('pk', flat=True), to_status, actor=request.user)
+        self.message_user(request, f'{verb} {changed} бронювань.')
+        if skipped:
+            self.message_user(request, f'Пропущено (недозволений перехід): {skipped}.', level=messages.WARNING)
+
+    @admin.action(description='🏋️ Відмітити відвідування (списати заняття)')
+    def check_in_bookings(self, request, queryset):
+        checked, failed = 0, 0
+        for booking_id in queryset.values_list('pk', flat=True):
+            try:
+                check_in(booking_id, staff=request.user)
+                checked += 1
+            except CheckInError:
+                failed += 1
+        self.message_user(request, f'Списано занять: {checked}.')
+        if failed:
+            self.message_user(request, f'Без залишку або неактивні: {failed}.', level=messages.WARNING)
+
+    @admin.action(description='🔄 Перерахувати залишок занять із журналу')
+    def reconcile_sessions(self, request, queryset):
+        updated = reconcile_balances(queryset.values_list('pk', flat=True))
+        self.message_user(request, f'Перераховано {updated} пакетів.')
+
+    @admin.action(description='📊 Експортувати обрані бронювання у CSV')
+    def export_bookings(self, request, queryset):
+        """Експорт бронювань; клієнт, послуга і тариф беруться JOIN-ами в тому самому запиті"""
+        return export_csv(queryset, f'bookings-{timezone.localdate():%Y-%m-%d}.csv', [
+            ('ID', 'id'),
+            ('Email клієнта', 'user__email'),
+            ('Прізвище', 'user__last_name'),
+            ("Ім'я", 'user__first_name'),
+            ('Телефон', 'user__phone'),
+            ('Послуга', 'service__name'),
+            ('Тариф', 'pricing_plan__name'),
+            ('Дата заняття', 'booking_date', local_datetime),
+            ('Статус', 'status', choice_label(Booking, 'status')),
+            ('Сума (грн)', 'total_price'),
+            ('Занять у пакеті', 'sessions_total'),
+            ('Залишок занять', 'sessions_remaining'),
+            ('Дата створення', 'created_at', local_datetime),
+            ('Примітки', 'notes'),
+        ])
 
 
 @admin.register(Schedule)
@@ -694,6 +879,7 @@ class ScheduleAdmin(admin.ModelAdmin):
     )
 
     autocomplete_fields = ['trainer', 'service']
+    list_select_related = ('trainer', 'service')
 
     @admin.display(description='Тренер')
     def trainer_link(self, obj):
@@ -735,15 +921,125 @@ class ScheduleAdmin(admin.ModelAdmin):
 
     @admin.action(description='✅ Активувати обрані розклади')
     def activate_schedules(self, request, queryset):
-        updated = queryset.update(is_active=True)
+        candidates = list(queryset.filter(is_active=False))
+        active = Schedule.objects.filter(
+            trainer_id__in={schedule.trainer_id for schedule in candidates}, is_active=True
+        )
+        # Розклади, що перетнулися б з активними або між собою, не вмикаємо
+        blocked = {}
+        for first, second in find_overlaps(list(active) + candidates):
+            for schedule in (first, second):
+                if not schedule.is_active:
+                    blocked[schedule.pk] = describe_overlap(first, second)
+        for message in set(blocked.values()):
+            self.message_user(request, f'Не активовано: {message}', level=messages.ERROR)
+
+        schedule_ids = [schedule.pk for schedule in candidates if schedule.pk not in blocked]
+        updated = Schedule.objects.filter(pk__in=schedule_ids).update(is_active=True)
+        # update() не надсилає сигнали - інвалідуємо кеш вручну
+        bump_version(SCHEDULE)
+        schedule_regenerate(schedule_ids=schedule_ids)
         self.message_user(request, f'Активовано {updated} розкладів.')
 
     @admin.action(description='❌ Деактивувати обрані розклади')
     def deactivate_schedules(self, request, queryset):
-        updated = queryset.update(is_active=False)
+        # pk беремо до update(): з фільтром is_active=True вибірка після нього порожня
+        schedule_ids = list(queryset.values_list('pk', flat=True))
+        updated = Schedule.objects.filter(pk__in=schedule_ids).update(is_active=False)
+        # update() не надсилає сигнали - інвалідуємо кеш вручну
+        bump_version(SCHEDULE)
+        schedule_regenerate(schedule_ids=schedule_ids)
         self.message_user(request, f'Деактивовано {updated} розкладів.')
 
 
+@admin.register(SlotOccurrence)
+class SlotOccurrenceAdmin(admin.ModelAdmin):
+    """Адмін панель для SlotOccurrence (заняття генеруються з розкладу)"""
+
+    list_display = (
+        'starts_at',
+        'service',
+        'trainer',
+        'booked_count',
+        'capacity',
+        'is_active',
+    )
+
+    list_filter = (
+        'is_active',
+        'service__category',
+    )
+
+    list_select_related = ('service', 'trainer')
+    date_hierarchy = 'starts_at'
+    ordering = ('starts_at',)
+
+    # Місткість і час задаються шаблоном розкладу, лічильник - бронюваннями
+    readonly_fields = ('schedule', 'service', 'trainer', 'starts_at', 'ends_at', 'capacity', 'booked_count')
+    fields = readonly_fields + ('is_active',)
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    """Адмін панель для WaitlistEntry"""
+
+    list_display = ('slot', 'user', 'status', 'created_at')
+    list_filter = ('status',)
+    list_select_related = ('slot__service', 'user')
+    search_fields = ('user__email', 'user__last_name')
+    raw_id_fields = ('slot', 'user', 'pricing_plan', 'booking')
+    ordering = ('-created_at',)
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    """Адмін панель для Notification (outbox)"""
+
+    list_display = ('subject', 'user', 'kind', 'created_at', 'sent_at')
+    list_filter = ('kind', 'sent_at')
+    list_select_related = ('user',)
+    search_fields = ('user__email', 'subject')
+    readonly_fields = ('user', 'booking', 'kind', 'subject', 'body', 'created_at', 'sending_at', 'sent_at')
+    ordering = ('-created_at',)
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Адмін панель для фонових завдань"""
+
+    list_display = ('kind', 'status', 'progress_display', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = (
+        'kind', 'payload', 'status', 'progress_display', 'last_pk', 'attempts', 'error',
+        'created_at', 'started_at', 'heartbeat_at', 'finished_at',
+    )
+    exclude = ('total', 'processed')
+    ordering = ('-created_at',)
+    actions = ['retry_jobs']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description='Прогрес')
+    def progress_display(self, obj):
+        if obj.total is None:
+            return '—'
+        percent = min(obj.processed * 100 // obj.total, 100) if obj.total else 100
+        return f'{obj.processed} / {obj.total} ({percent}%)'
+
+    @admin.action(description='🔁 Повторити невдалі та завислі завдання')
+    def retry_jobs(self, request, queryset):
+        # Завислі - running, виконавець яких упав; масові дії продовжаться з last_pk
+        updated = queryset.filter(Q(status='failed') | stale_running()).update(status='pending', error='')
+        self.message_user(request, f'Повернуто в чергу {updated} завдань.')
+
+
 @admin.register(FAQ)
 class FAQAdmin(admin.ModelAdmin):
     """Адмін панель для FAQ"""
@@ -804,11 +1100,15 @@ class FAQAdmin(admin.ModelAdmin):
     @admin.action(description='✅ Активувати обрані питання')
     def activate_faqs(self, request, queryset):
         updated = queryset.update(is_active=True)
+        # update() не надсилає сигнали - інвалідуємо кеш вручну
+        bump_version(CATALOG)
         self.message_user(request, f'Активовано {updated} питань.')
 
     @admin.action(description='❌ Деактивувати обрані питання')
     def deactivate_faqs(self, request, queryset):
         updated = queryset.update(is_active=False)
+        # update() не надсилає сигнали - інвалідуємо кеш вручну
+        bump_version(CATALOG)
         self.message_user(request, f'Деактивовано {updated} питань.')
 
 
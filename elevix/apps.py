@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ElevixConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'elevix'
+
+    def ready(self):
+        from . import signals  # noqa: F401
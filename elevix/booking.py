@@ -0,0 +1,109 @@
+"""Створення бронювань без овербукінгу"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Booking, BookingEvent, PricingPlan, Schedule, SlotOccurrence, WaitlistEntry
+from .slots import bump_availability, slot_bounds
+from .waitlist import release_place
+
+# Статуси, що займають місце на занятті
+ACTIVE_STATUSES = ('pending', 'confirmed')
+
+
+class BookingError(Exception):
+    """Бронювання неможливе (слот зайнятий, неправильна дата тощо)"""
+
+
+class SlotFullError(BookingError):
+    """На занятті немає вільних місць - можна стати в чергу"""
+
+    def __init__(self, message, slot_id):
+        super().__init__(message)
+        self.slot_id = slot_id
+
+
+def create_booking(user, schedule_id, pricing_plan_id, date, notes=''):
+    """
+    Бронює місце на занятті schedule у дату date.
+
+    Місце займається умовним UPDATE лічильника booked_count заняття
+    (booked_count < capacity). UPDATE блокує рядок заняття до кінця
+    транзакції, тож конкурентні запити на нього виконуються послідовно,
+    а при відкаті (наприклад, повторний запис) лічильник повертається.
+    Блокується рівно один рядок, тому взаємних блокувань не виникає.
+    """
+    with transaction.atomic():
+        schedule = Schedule.objects.select_related('service').filter(
+            pk=schedule_id, is_active=True, service__is_active=True
+        ).first()
+        if schedule is None:
+            raise BookingError('Заняття недоступне для бронювання.')
+        if date.weekday() != schedule.day_of_week:
+            raise BookingError(f'Це заняття проходить у {schedule.get_day_of_week_display().lower()}.')
+
+        starts_at, _ = slot_bounds(schedule, date)
+        if starts_at <= timezone.now():
+            raise BookingError('Заняття вже розпочалося.')
+
+        plan = PricingPlan.objects.filter(pk=pricing_plan_id, service_id=schedule.service_id).first()
+        if plan is None:
+            raise BookingError('Тарифний план не належить цій послузі.')
+
+        slot_id = SlotOccurrence.objects.filter(
+            schedule=schedule, starts_at=starts_at, is_active=True
+        ).values_list('pk', flat=True).first()
+        if slot_id is None:
+            raise BookingError('Запис на цю дату ще не відкрито.')
+
+        # Вільне місце при непорожній черзі дістається їй, а не новому учаснику
+        if WaitlistEntry.objects.filter(slot_id=slot_id, status='waiting').exists():
+            raise SlotFullError('На це заняття вже є черга.', slot_id)
+
+        reserved = SlotOccurrence.objects.filter(
+            pk=slot_id, booked_count__lt=F('capacity')
+        ).update(booked_count=F('booked_count') + 1)
+        if not reserved:
+            raise SlotFullError('На жаль, вільних місць на це заняття немає.', slot_id)
+
+        if Booking.objects.filter(slot_id=slot_id, user=user, status__in=ACTIVE_STATUSES).exists():
+            raise BookingError('Ви вже записані на це заняття.')
+
+        booking = Booking(
+            user=user,
+            service=schedule.service,
+            pricing_plan=plan,
+            schedule=schedule,
+            slot_id=slot_id,
+            booking_date=starts_at,
+            total_price=plan.effective_price,
+            notes=notes,
+        )
+        booking.save()
+        bump_availability([schedule.service_id])
+    return booking
+
+
+def cancel_bookings(booking_ids, actor=None):
+    """
+    Скасовує активні бронювання і віддає звільнені місця черзі в тій самій транзакції.
+
+    Повертає (скасовано, переведено з черги). На кожне скасування - сталий
+    набір запитів, незалежно від довжини черги.
+    """
+    with transaction.atomic():
+        rows = list(
+            Booking.objects.select_for_update()
+            .filter(pk__in=set(booking_ids), status__in=ACTIVE_STATUSES)
+            .values_list('pk', 'status', 'slot_id', 'service_id')
+        )
+        Booking.objects.filter(pk__in=[pk for pk, _, _, _ in rows]).update(
+            status='cancelled', updated_at=timezone.now()
+        )
+        BookingEvent.objects.bulk_create([
+            BookingEvent(booking_id=pk, from_status=status, to_status='cancelled', actor=actor)
+            for pk, status, _, _ in rows
+        ])
+        promoted = sum(1 for _, _, slot_id, _ in rows if slot_id and release_place(slot_id))
+        bump_availability(service_id for _, _, _, service_id in rows)
+    return len(rows), promoted
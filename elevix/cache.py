@@ -0,0 +1,91 @@
+"""Версіоновані ключі кешу для публічних сторінок"""
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+# Простори версій
+CATALOG = 'catalog'
+SCHEDULE = 'schedule'
+
+# Скільки живуть закешовані фрагменти (версія все одно інвалідує їх раніше)
+FRAGMENT_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(namespace):
+    return f'elevix:version:{namespace}'
+
+
+def get_version(namespace):
+    """Поточна версія простору (мітка часу останньої зміни)"""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Кеш очищено або ще порожній - стартуємо нову версію
+        cache.add(key, time.time(), None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(namespace):
+    """Async-версія get_version()"""
+    key = _version_key(namespace)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time(), None)
+        version = await cache.aget(key)
+    return version
+
+
+async def aget_versions(namespaces):
+    """Версії кількох просторів одним зверненням до кешу: {простір: версія}"""
+    keys = {namespace: _version_key(namespace) for namespace in namespaces}
+    versions = await cache.aget_many(keys.values())
+    missing = [key for key in keys.values() if key not in versions]
+    now = time.time()
+    if missing:
+        for key in missing:
+            await cache.aadd(key, now, None)
+        versions.update(await cache.aget_many(missing))
+    # Ключ, витіснений з переповненого кешу одразу після add, отримує нову версію
+    return {namespace: versions.get(key, now) for namespace, key in keys.items()}
+
+
+def get_version_datetime(namespace, version=None):
+    """Версія простору як datetime - для заголовка Last-Modified"""
+    if version is None:
+        version = get_version(namespace)
+    return datetime.fromtimestamp(version, tz=timezone.utc)
+
+
+def bump_version(namespace):
+    """Інвалідує всі фрагменти простору після коміту транзакції"""
+    transaction.on_commit(lambda: cache.set(_version_key(namespace), time.time(), None))
+
+
+async def arender_fragments(namespace, fragments):
+    """
+    Рендерить фрагменти сторінки з кешу версії простору.
+
+    fragments - словник {назва: (шаблон, async-завантажувач контексту)}.
+    Завантажувач викликається лише для фрагментів, яких немає в кеші,
+    тож на прогрітому кеші сторінка не робить жодного запиту до БД.
+    """
+    version = await aget_version(namespace)
+    keys = {name: f'elevix:fragment:{namespace}:{name}:{version}' for name in fragments}
+    cached = await cache.aget_many(keys.values())
+
+    rendered, missing = {}, {}
+    for name, (template_name, loader) in fragments.items():
+        html = cached.get(keys[name])
+        if html is None:
+            html = render_to_string(template_name, await loader())
+            missing[keys[name]] = html
+        rendered[name] = mark_safe(html)
+
+    if missing:
+        await cache.aset_many(missing, FRAGMENT_TIMEOUT)
+    return rendered
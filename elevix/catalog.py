@@ -0,0 +1,93 @@
+"""Знімки каталогу: послуга разом з тарифами, особливостями та тренером в одному рядку"""
+from functools import partial
+
+from django.db import transaction
+
+from .models import Service, CatalogSnapshot, Trainer
+
+
+def _plan_data(plan):
+    return {
+        'id': plan.pk,
+        'name': plan.name,
+        'plan_type': plan.plan_type,
+        'price': str(plan.price),
+        'sessions_count': plan.sessions_count,
+        'discount_percent': str(plan.discount_percent),
+        'has_discount': plan.effective_price != plan.price,
+        'effective_price': str(plan.effective_price),
+        'price_per_session': str(plan.price_per_session),
+        'is_default': plan.is_default,
+    }
+
+
+def build_snapshot_data(service):
+    """Дані знімка для послуги з уже підвантаженими тарифами, особливостями, тренером і with_cheapest_plan()"""
+    plans = [_plan_data(plan) for plan in service.pricing_plans.all()]
+    default_plan = next((plan for plan in plans if plan['is_default']), plans[0] if plans else None)
+    trainer = service.trainer
+
+    return {
+        'id': service.pk,
+        'name': service.name,
+        'description': service.description,
+        'category': service.category,
+        'category_display': service.get_category_display(),
+        # Decimal у JSON не зберігається: рядок для показу, float для порівнянь у шаблоні
+        'duration': str(service.duration),
+        'duration_hours': float(service.duration),
+        'trainer_id': trainer.pk if trainer else None,
+        # Через клас: у історичної моделі (міграція 0017) власних методів немає
+        'trainer_name': Trainer.get_full_name(trainer) if trainer else '',
+        'default_plan': default_plan,
+        'cheapest_plan_id': service.cheapest_plan_id,
+        'cheapest_price_per_session': (
+            f'{service.cheapest_price_per_session:.2f}' if service.cheapest_price_per_session is not None else None
+        ),
+        'pricing_plans': plans,
+        'features': [
+            {'feature_text': feature.feature_text, 'icon': feature.icon}
+            for feature in service.features.all()
+        ],
+    }
+
+
+def rebuild_snapshots(service_ids):
+    """Перебудовує знімки вказаних послуг; знімки видалених послуг прибирає каскад"""
+    services = Service.objects.filter(
+        pk__in=set(service_ids)
+    ).with_cheapest_plan().select_related(
+        'trainer'
+    ).prefetch_related(
+        'pricing_plans',
+        'features'
+    )
+
+    return save_snapshots(services, CatalogSnapshot)
+
+
+def save_snapshots(services, snapshot_model):
+    """Записує знімки послуг, підготовлених як у rebuild_snapshots, одним upsert"""
+    snapshots = [
+        snapshot_model(
+            service=service,
+            trainer=service.trainer,
+            is_active=service.is_active,
+            data=build_snapshot_data(service),
+        )
+        for service in services
+    ]
+    snapshot_model.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=['service'],
+        update_fields=['trainer', 'is_active', 'data', 'updated_at'],
+    )
+    return len(snapshots)
+
+
+def schedule_rebuild(service_ids):
+    """Перебудова знімків після коміту, щоб читати вже збережені дані"""
+    service_ids = [pk for pk in service_ids if pk is not None]
+    if service_ids:
+        transaction.on_commit(partial(rebuild_snapshots, service_ids))
@@ -0,0 +1,50 @@
+"""Декоратори представлень"""
+from functools import wraps
+
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+
+def acondition(validators_func):
+    """
+    Async-аналог django.views.decorators.http.condition.
+
+    Стандартний condition викликає etag_func/last_modified_func синхронно,
+    що в async-представленні заборонено для ORM. Тут validators_func - корутина,
+    яка повертає (etag, last_modified) одним зверненням до БД.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def _view_wrapper(request, *args, **kwargs):
+            etag, last_modified = await validators_func(request, *args, **kwargs)
+            etag = quote_etag(etag) if etag is not None else None
+            last_modified = int(last_modified.timestamp()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view_func(request, *args, **kwargs)
+
+            if request.method in ('GET', 'HEAD'):
+                if last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            return response
+
+        return _view_wrapper
+
+    return decorator
+
+
+def query_budget(max_queries):
+    """
+    Оголошує максимальну кількість SQL-запитів для представлення.
+
+    Бюджет перевіряє QueryBudgetMiddleware і тести з QueryBudgetTests;
+    він не повинен залежати від кількості рядків у таблицях.
+    """
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+
+    return decorator
@@ -0,0 +1,76 @@
+"""Потоковий експорт у CSV з адмінки: пам'ять не залежить від кількості рядків"""
+import csv
+import re
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+# Скільки рядків читається з БД за раз (серверний курсор у PostgreSQL)
+EXPORT_CHUNK_SIZE = 2000
+
+
+# Клітинка з таким початком у Excel виконується як формула (CSV injection)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Телефони та числа зі знаком ("+380 67 123-45-67") формулою не стають - лишаються як є
+SIGNED_NUMBER = re.compile(r'[+-][\d\s().-]*')
+
+
+def safe_cell(value):
+    """Рядок, що почався б як формула, отримує префікс ' і показується в Excel як текст"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) and not SIGNED_NUMBER.fullmatch(value):
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """Файлоподібний об'єкт для csv.writer, що повертає рядок замість запису"""
+
+    def write(self, value):
+        return value
+
+
+def choice_label(model, field_name):
+    """Форматер: код вибору -> його назва (status 'confirmed' -> 'Підтверджено')"""
+    labels = dict(model._meta.get_field(field_name).flatchoices)
+    return lambda value: labels.get(value, value)
+
+
+def local_datetime(value):
+    """Форматер дати-часу в локальному поясі"""
+    return timezone.localtime(value).strftime('%d.%m.%Y %H:%M') if value else ''
+
+
+def yes_no(value):
+    """Форматер булевого значення"""
+    return 'Так' if value else 'Ні'
+
+
+def export_csv(queryset, filename, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    StreamingHttpResponse з CSV для queryset.
+
+    columns - послідовність (заголовок, поле) або (заголовок, поле, форматер);
+    поле може йти через зв'язки (user__email), і тоді значення береться
+    JOIN-ом у тому самому запиті. Рядки читаються через values_list().iterator()
+    порціями chunk_size і одразу віддаються клієнту, тож експорт 10 і 1 000 000
+    рядків займає однаково пам'яті. Файл у UTF-8 з BOM, щоб Excel коректно
+    показав кирилицю; значення, що почалися б як формула, екрануються (safe_cell).
+    """
+    headers = [column[0] for column in columns]
+    fields = [column[1] for column in columns]
+    formatters = [column[2] if len(column) > 2 else None for column in columns]
+    rows = queryset.order_by('pk').values_list(*fields).iterator(chunk_size=chunk_size)
+    writer = csv.writer(_Echo())
+
+    def generate():
+        yield '\ufeff' + writer.writerow(headers)
+        for row in rows:
+            yield writer.writerow([
+                safe_cell(formatter(value) if formatter else ('' if value is None else value))
+                for formatter, value in zip(formatters, row)
+            ])
+
+    response = StreamingHttpResponse(generate(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -1,6 +1,9 @@
 # elevix/forms.py
+import datetime
+
 from django import forms
-from .models import GymUser
+from django.utils import timezone
+from .models import GymUser, Trainer, Schedule, PricingPlan
 
 
 class ProfileEditForm(forms.ModelForm):
@@ -13,4 +16,80 @@ class ProfileEditForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields['first_name'].required = True
-        self.fields['last_name'].required = True
\ No newline at end of file
+        self.fields['last_name'].required = True
+
+
+class TrainerFilterForm(forms.Form):
+    """Фільтри каталогу тренерів"""
+
+    specialization = forms.ChoiceField(
+        label="Спеціалізація",
+        choices=[('', 'Усі')] + Trainer.SPECIALIZATION_CHOICES,
+        required=False
+    )
+    gender = forms.ChoiceField(
+        label="Стать",
+        choices=[('', 'Усі')] + Trainer.GENDER_CHOICES,
+        required=False
+    )
+    min_experience = forms.IntegerField(label="Стаж від (років)", min_value=0, required=False)
+
+    def filter(self, queryset):
+        """Застосовує валідні фільтри до queryset тренерів"""
+        if not self.is_valid():
+            return queryset
+        data = self.cleaned_data
+        if data['specialization']:
+            queryset = queryset.filter(specialization=data['specialization'])
+        if data['gender']:
+            queryset = queryset.filter(gender=data['gender'])
+        if data['min_experience'] is not None:
+            queryset = queryset.filter(experience__gte=data['min_experience'])
+        return queryset
+
+
+class BookingForm(forms.Form):
+    """Вибір заняття, дати та тарифу для бронювання послуги"""
+
+    schedule = forms.ModelChoiceField(label="Заняття", queryset=Schedule.objects.none(), empty_label=None)
+    date = forms.DateField(label="Дата", widget=forms.DateInput(attrs={'type': 'date'}))
+    pricing_plan = forms.ModelChoiceField(label="Тариф", queryset=PricingPlan.objects.none(), empty_label=None)
+    notes = forms.CharField(label="Примітки", widget=forms.Textarea(attrs={'rows': 3}), required=False)
+    join_waitlist = forms.BooleanField(label="Стати в чергу, якщо місць немає", required=False)
+
+    def __init__(self, service, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['schedule'].queryset = service.schedules.filter(
+            is_active=True
+        ).select_related('trainer').order_by('day_of_week', 'start_time')
+        self.fields['pricing_plan'].queryset = service.pricing_plans.order_by('-is_default', 'price')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        schedule, date = cleaned_data.get('schedule'), cleaned_data.get('date')
+        if schedule and date and date.weekday() != schedule.day_of_week:
+            self.add_error('date', f'Це заняття проходить у {schedule.get_day_of_week_display().lower()}.')
+        return cleaned_data
+
+
+class AvailabilityForm(forms.Form):
+    """Параметри запиту доступності занять"""
+
+    MAX_DAYS = 62
+
+    start = forms.DateField(label="З", required=False)
+    end = forms.DateField(label="По", required=False)
+    service = forms.IntegerField(label="Послуга", min_value=1, required=False)
+    trainer = forms.IntegerField(label="Тренер", min_value=1, required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        # Без дат - найближчий тиждень
+        start = cleaned_data.get('start') or timezone.localdate()
+        end = cleaned_data.get('end') or start + datetime.timedelta(days=6)
+        if end < start:
+            raise forms.ValidationError('Кінець діапазону раніше за початок.')
+        if (end - start).days >= self.MAX_DAYS:
+            raise forms.ValidationError(f'Діапазон не може перевищувати {self.MAX_DAYS} днів.')
+        cleaned_data['start'], cleaned_data['end'] = start, end
+        return cleaned_data
@@ -0,0 +1,98 @@
+"""Ключі ідемпотентності для POST-представлень: повтор запиту повертає початковий результат"""
+import hashlib
+import uuid
+from datetime import timedelta
+from functools import wraps
+
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+# Скільки зберігається результат запиту за ключем
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+
+# Поле форми з ключем (для браузера); мобільні клієнти передають заголовок Idempotency-Key
+IDEMPOTENCY_FIELD = 'idempotency_key'
+
+
+def request_digest(request):
+    """Відбиток методу, шляху та даних запиту, щоб ключ не можна було використати для інших даних"""
+    digest = hashlib.sha256(f'{request.method} {request.path}'.encode())
+    for name in sorted(request.POST):
+        if name in ('csrfmiddlewaretoken', IDEMPOTENCY_FIELD):
+            continue
+        for value in request.POST.getlist(name):
+            digest.update(f'\0{name}={value}'.encode())
+    for name in sorted(request.FILES):
+        for upload in request.FILES.getlist(name):
+            digest.update(f'\0{name}:{upload.name}:{upload.size}'.encode())
+    return digest.hexdigest()
+
+
+def _replay(record, digest):
+    if record.request_digest != digest:
+        return HttpResponse('Ключ ідемпотентності вже використано для іншого запиту.', status=422)
+    response = HttpResponse(status=record.response_status)
+    if record.response_location:
+        response['Location'] = record.response_location
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view_func):
+    """
+    Робить POST-представлення ідемпотентним за ключем клієнта.
+
+    Якщо ключ уже відомий, збережений результат повертається одним SELECT
+    без повторного виконання представлення. Інакше представлення виконується
+    в транзакції, і успішний результат (перенаправлення) записується одним
+    INSERT у тій самій транзакції. Два паралельні повтори впираються
+    в унікальний індекс (user, key): транзакція другого відкочується разом
+    з його змінами, і він отримує результат першого. Відповіді з помилками
+    форми не зберігаються - їх можна повторити з тим самим ключем.
+    Для форм у request.new_idempotency_key кладеться свіжий ключ.
+    """
+    @wraps(view_func)
+    def _view_wrapper(request, *args, **kwargs):
+        request.new_idempotency_key = uuid.uuid4().hex
+        key = request.headers.get('Idempotency-Key') or request.POST.get(IDEMPOTENCY_FIELD)
+        if request.method != 'POST' or not key or not request.user.is_authenticated:
+            return view_func(request, *args, **kwargs)
+        if len(key) > 64:
+            return HttpResponseBadRequest('Ключ ідемпотентності задовгий (максимум 64 символи).')
+
+        digest = request_digest(request)
+        record = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+        if record is not None:
+            if record.expires_at > timezone.now():
+                return _replay(record, digest)
+            record.delete()
+
+        try:
+            with transaction.atomic():
+                response = view_func(request, *args, **kwargs)
+                if 300 <= response.status_code < 400:
+                    IdempotencyKey.objects.create(
+                        user=request.user,
+                        key=key,
+                        request_digest=digest,
+                        response_status=response.status_code,
+                        response_location=response.get('Location', ''),
+                        expires_at=timezone.now() + IDEMPOTENCY_KEY_TTL,
+                    )
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+            if record is None:
+                raise
+            return _replay(record, digest)
+        return response
+
+    return _view_wrapper
+
+
+def purge_expired():
+    """Видаляє прострочені ключі і повертає їх кількість"""
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -0,0 +1,194 @@
+"""Зменшені варіанти зображень (thumb/card/full) у WebP та JPEG поруч з оригіналом"""
+import logging
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger('elevix')
+
+# Назва варіанта -> максимальна ширина в пікселях
+VARIANTS = {
+    'thumb': 100,
+    'card': 300,
+    'full': 1200,
+}
+
+# Квадратні мініатюри для адмінки
+ADMIN_THUMBNAIL_SIZE = (100, 100)
+
+# Скільки не повторювати генерацію після помилки (секунди)
+THUMBNAIL_FAILURE_TIMEOUT = 60 * 10
+
+# Розширення -> (формат Pillow, параметри збереження)
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def variant_name(name, variant, ext):
+    """trainers/ivan.png -> trainers/ivan.png.card.webp"""
+    return f"{name}.{variant}.{ext}"
+
+
+def _widths_cache_key(name):
+    return f'elevix:variants:{name}'
+
+
+def _remember_widths(name, widths):
+    # Повний набір не зміниться до нового завантаження; неповний чекає на generate_image_variants
+    cache.set(_widths_cache_key(name), widths, None if len(widths) == len(VARIANTS) else THUMBNAIL_FAILURE_TIMEOUT)
+
+
+def _read_widths(field_file):
+    storage = field_file.storage
+    widths = {}
+    for variant in VARIANTS:
+        names = [variant_name(field_file.name, variant, ext) for ext in FORMATS]
+        if not all(storage.exists(name) for name in names):
+            continue
+        try:
+            with storage.open(names[0], 'rb') as f:
+                widths[variant] = Image.open(f).width
+        except (OSError, UnidentifiedImageError):
+            continue
+    return widths
+
+
+def variant_widths(field_file):
+    """
+    {'thumb': 100, 'card': 300, ...} - фактичні ширини наявних варіантів.
+
+    Для старих завантажень варіантів може ще не бути, а маленький оригінал
+    не розтягується до цільової ширини. Тому наявність і ширини читаються
+    зі сховища один раз і запам'ятовуються в кеші (generate_variants
+    записує їх туди одразу).
+    """
+    if not field_file:
+        return {}
+    widths = cache.get(_widths_cache_key(field_file.name))
+    if widths is None:
+        widths = _read_widths(field_file)
+        _remember_widths(field_file.name, widths)
+    return widths
+
+
+def image_variants(field_file):
+    """{'thumb': {'webp': url, 'jpg': url}, ...} або {} для порожнього поля; без варіанта - URL оригіналу"""
+    if not field_file:
+        return {}
+    storage = field_file.storage
+    widths = variant_widths(field_file)
+    return {
+        variant: {
+            ext: storage.url(variant_name(field_file.name, variant, ext)) if variant in widths else field_file.url
+            for ext in FORMATS
+        }
+        for variant in VARIANTS
+    }
+
+
+def image_srcset(field_file):
+    """{'webp': 'url 100w, ...', 'jpg': '...'} для атрибута srcset або {}, якщо варіантів ще немає"""
+    widths = variant_widths(field_file)
+    # Варіанти маленького оригіналу можуть мати однакову ширину - у srcset вона має бути унікальною
+    candidates = {}
+    for variant, width in widths.items():
+        candidates.setdefault(width, variant)
+    if not candidates:
+        return {}
+    storage = field_file.storage
+    return {
+        ext: ", ".join(
+            f"{storage.url(variant_name(field_file.name, variant, ext))} {width}w"
+            for width, variant in sorted(candidates.items())
+        )
+        for ext in FORMATS
+    }
+
+
+def _encode(image, fmt, options):
+    if fmt == 'JPEG' and image.mode not in ('RGB', 'L'):
+        # JPEG не має альфа-каналу: кладемо зображення на білий фон
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.convert('RGBA').split()[-1])
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, fmt, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def generate_variants(field_file):
+    """
+    Створює всі варіанти для завантаженого файлу.
+
+    Повертає кількість збережених файлів; пошкоджене зображення лише логується,
+    щоб не зламати збереження моделі.
+    """
+    if not field_file:
+        return 0
+    storage = field_file.storage
+    try:
+        with storage.open(field_file.name, 'rb') as source:
+            original = ImageOps.exif_transpose(Image.open(source))
+            original.load()
+    except (OSError, UnidentifiedImageError):
+        logger.warning('Не вдалося відкрити зображення %s для варіантів', field_file.name)
+        return 0
+
+    saved, widths = 0, {}
+    for variant, width in VARIANTS.items():
+        image = original.copy()
+        # thumbnail() лише зменшує - маленькі оригінали не розтягуються
+        image.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+        for ext, (fmt, options) in FORMATS.items():
+            name = variant_name(field_file.name, variant, ext)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, _encode(image, fmt, options))
+            saved += 1
+        widths[variant] = image.width
+    _remember_widths(field_file.name, widths)
+    return saved
+
+
+def thumbnail_name(name, size):
+    """trainers/ivan.png -> thumbs/100x100/trainers/ivan.png.webp"""
+    width, height = size
+    return f"thumbs/{width}x{height}/{name}.webp"
+
+
+def get_thumbnail_url(field_file, size=ADMIN_THUMBNAIL_SIZE):
+    """
+    URL квадратної мініатюри, яка створюється при першому запиті й лишається на диску.
+
+    Наявність файлу запам'ятовується в кеші, тож сторінка зі 100 рядками
+    не робить 100 перевірок файлової системи. Якщо оригінал відсутній або
+    пошкоджений - повертаємо URL оригіналу.
+    """
+    if not field_file:
+        return None
+    storage = field_file.storage
+    name = thumbnail_name(field_file.name, size)
+    cache_key = f'elevix:thumbnail:{name}'
+
+    state = cache.get(cache_key)
+    if state is None:
+        state = storage.exists(name) or _generate_thumbnail(field_file, name, size)
+        cache.set(cache_key, state, None if state else THUMBNAIL_FAILURE_TIMEOUT)
+
+    return storage.url(name) if state else field_file.url
+
+
+def _generate_thumbnail(field_file, name, size):
+    try:
+        with field_file.storage.open(field_file.name, 'rb') as source:
+            image = ImageOps.fit(ImageOps.exif_transpose(Image.open(source)), size, Image.Resampling.LANCZOS)
+        fmt, options = FORMATS['webp']
+        field_file.storage.save(name, _encode(image, fmt, options))
+    except (OSError, UnidentifiedImageError):
+        logger.warning('Не вдалося створити мініатюру для %s', field_file.name)
+        return False
+    return True
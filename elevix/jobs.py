@@ -0,0 +1,98 @@
+"""Фонові завдання: запис у транзакції бізнес-операції, виконання - командою run_jobs"""
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger('elevix')
+
+# Тип завдання -> обробник, що приймає payload як іменовані аргументи
+# (або саме завдання, якщо обробник позначений chunked)
+JOB_HANDLERS = {
+    'booking_transition': 'elevix.transitions.apply_side_effects',
+    'bulk_action': 'elevix.bulk.run_bulk_job',
+}
+
+# Завдання running без heartbeat довше цього вважається покинутим і береться знову
+JOB_STALE_AFTER = timedelta(minutes=30)
+
+
+class JobLost(Exception):
+    """Завдання перехопив інший виконавець, бо вважав його покинутим"""
+
+
+def enqueue(kind, **payload):
+    """Ставить завдання в чергу; викликається в транзакції операції, тож відкочується разом із нею"""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f'Невідомий тип завдання: {kind}')
+    return Job.objects.create(kind=kind, payload=payload)
+
+
+def stale_running():
+    """Умова для завдань running, виконавець яких упав: heartbeat старший за JOB_STALE_AFTER"""
+    return Q(status='running', heartbeat_at__lt=timezone.now() - JOB_STALE_AFTER)
+
+
+def claimable_jobs():
+    """Завдання, які можна взяти: нові та покинуті виконавцем, що впав посеред роботи"""
+    return Job.objects.filter(Q(status='pending') | stale_running())
+
+
+def touch(job, **fields):
+    """
+    Оновлює heartbeat_at і fields завдання та повертає, чи воно ще за цим виконавцем.
+
+    Перевірка attempts відсікає виконавця, чиє завдання вже вважалося
+    покинутим і було перехоплене іншим run_jobs.
+    """
+    return Job.objects.filter(pk=job.pk, status='running', attempts=job.attempts).update(
+        heartbeat_at=timezone.now(), **fields
+    ) == 1
+
+
+def run_pending(limit=None):
+    """
+    Виконує завдання в порядку надходження і повертає кількість оброблених.
+
+    Завдання забирається з SKIP LOCKED і одразу позначається running, тож
+    кілька паралельних run_jobs не виконають його двічі. Обробник працює
+    у власній транзакції разом із позначкою done: при помилці його зміни
+    відкочуються, а завдання отримує статус failed з текстом помилки.
+    Обробник із chunked = True фіксує зміни порціями сам і отримує
+    завдання, щоб записувати прогрес через touch(); при помилці зафіксовані
+    порції лишаються, а повтор продовжує з last_pk. Завдання running, від
+    якого довше JOB_STALE_AFTER не було heartbeat (run_jobs упав), знову
+    береться в роботу.
+    """
+    processed = 0
+    while limit is None or processed < limit:
+        with transaction.atomic():
+            job = claimable_jobs().select_for_update(skip_locked=True).order_by('created_at', 'id').first()
+            if job is None:
+                break
+            now = timezone.now()
+            Job.objects.filter(pk=job.pk).update(
+                status='running', started_at=now, heartbeat_at=now, attempts=F('attempts') + 1
+            )
+            job.status, job.attempts = 'running', job.attempts + 1
+
+        try:
+            handler = import_string(JOB_HANDLERS[job.kind])
+            if getattr(handler, 'chunked', False):
+                handler(job)
+                touch(job, status='done', error='', finished_at=timezone.now())
+            else:
+                with transaction.atomic():
+                    handler(**job.payload)
+                    if not touch(job, status='done', error='', finished_at=timezone.now()):
+                        raise JobLost(f'Завдання #{job.pk} виконує інший run_jobs')
+        except Exception as e:
+            logger.exception('Завдання %s #%s завершилося помилкою', job.kind, job.pk)
+            touch(job, status='failed', error=str(e), finished_at=timezone.now())
+        processed += 1
+    return processed
@@ -0,0 +1,56 @@
+"""Журнал використання занять пакета та кешований баланс Booking.sessions_remaining"""
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+
+from .booking import ACTIVE_STATUSES
+from .models import Booking, SessionUsage
+
+
+class CheckInError(Exception):
+    """Відвідування не можна списати (немає залишку, бронювання неактивне)"""
+
+
+def check_in(booking_id, staff=None, slot=None, note=''):
+    """
+    Списує одне заняття з пакета і додає запис у журнал.
+
+    Баланс зменшується умовним UPDATE ... SET sessions_remaining = sessions_remaining - 1
+    WHERE sessions_remaining > 0 без попереднього читання, тож паралельні
+    відмітки на рецепції не губляться і не заводять баланс у мінус.
+    Запис журналу створюється в тій самій транзакції.
+    """
+    with transaction.atomic():
+        updated = Booking.objects.filter(
+            pk=booking_id,
+            status__in=ACTIVE_STATUSES,
+            sessions_remaining__gt=0,
+        ).update(
+            sessions_remaining=F('sessions_remaining') - 1,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            raise CheckInError('Немає доступних занять для списання.')
+        return SessionUsage.objects.create(booking_id=booking_id, slot=slot, checked_in_by=staff, note=note)
+
+
+def reconcile_balances(booking_ids=None):
+    """
+    Перераховує sessions_remaining пакетів із журналу одним UPDATE.
+
+    Повертає кількість оновлених бронювань; без booking_ids - усі пакети.
+    """
+    used = SessionUsage.objects.filter(
+        booking=OuterRef('pk')
+    ).values('booking').annotate(total=Sum('sessions')).values('total')
+
+    bookings = Booking.objects.filter(sessions_total__isnull=False)
+    if booking_ids is not None:
+        bookings = bookings.filter(pk__in=set(booking_ids))
+    return bookings.update(
+        sessions_remaining=Least(
+            Greatest(F('sessions_total') - Coalesce(Subquery(used), Value(0)), Value(0)),
+            F('sessions_total'),
+        ),
+    )
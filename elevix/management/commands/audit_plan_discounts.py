@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from elevix.models import PricingPlan
+
+
+class Command(BaseCommand):
+    help = 'Показати тарифи зі знижкою: з міграції 0012 знижка віднімається від ціни при бронюванні'
+
+    def handle(self, *args, **options):
+        plans = PricingPlan.objects.filter(discount_percent__gt=0).select_related('service').order_by('service', 'pk')
+        count = 0
+        for plan in plans:
+            count += 1
+            self.stdout.write(
+                f'#{plan.pk} {plan.service.name} / {plan.name}: ціна {plan.price} грн, '
+                f'знижка {plan.discount_percent}% -> до сплати {plan.effective_price} грн'
+            )
+
+        if count:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️ {count} тарифів зі знижкою. Якщо ціну вводили вже зі знижкою, '
+                f'впишіть повну ціну або обнуліть знижку.'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS('✅ Тарифів зі знижкою немає!'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from elevix.images import generate_variants
+from elevix.models import GymUser, Trainer
+
+
+class Command(BaseCommand):
+    help = 'Згенерувати варіанти (thumb/card/full) для вже завантажених фото тренерів та аватарів'
+
+    def handle(self, *args, **options):
+        files = 0
+        for trainer in Trainer.objects.exclude(photo='').exclude(photo__isnull=True).only('photo').iterator():
+            files += generate_variants(trainer.photo)
+        for user in GymUser.objects.exclude(avatar='').exclude(avatar__isnull=True).only('avatar').iterator():
+            files += generate_variants(user.avatar)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Згенеровано {files} файлів варіантів!')
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from elevix.slots import SLOT_WEEKS_AHEAD, generate_slots
+
+
+class Command(BaseCommand):
+    help = 'Згенерувати заняття з розкладу на N тижнів уперед (запускати щодня, напр. з cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--weeks', type=int, default=SLOT_WEEKS_AHEAD, help='Горизонт запису в тижнях')
+
+    def handle(self, *args, **options):
+        created = generate_slots(weeks=options['weeks'])
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Створено {created} нових занять!')
+        )
@@ -0,0 +1,94 @@
+import csv
+from datetime import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from elevix.cache import SCHEDULE, bump_version
+from elevix.models import Schedule, Service, Trainer
+from elevix.overlaps import describe_overlap, find_overlaps
+from elevix.slots import generate_slots
+
+COLUMNS = ['trainer_id', 'service_id', 'day_of_week', 'start_time', 'end_time', 'max_participants']
+
+
+class Command(BaseCommand):
+    help = (
+        'Імпортувати розклад з CSV (колонки: ' + ', '.join(COLUMNS) + '). '
+        'Файл відхиляється цілком, якщо інтервали тренера перетинаються між собою або з чинним розкладом.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Шлях до CSV-файлу')
+        parser.add_argument('--dry-run', action='store_true', help='Лише перевірити файл')
+
+    def handle(self, *args, **options):
+        schedules, errors = self._read(options['path'])
+
+        trainer_ids = {schedule.trainer_id for schedule in schedules}
+        service_ids = {schedule.service_id for schedule in schedules}
+        known_trainers = set(Trainer.objects.filter(pk__in=trainer_ids).values_list('pk', flat=True))
+        known_services = set(Service.objects.filter(pk__in=service_ids).values_list('pk', flat=True))
+        for schedule in schedules:
+            if schedule.trainer_id not in known_trainers:
+                errors.append(f'Рядок {schedule._row}: тренера {schedule.trainer_id} не існує')
+            if schedule.service_id not in known_services:
+                errors.append(f'Рядок {schedule._row}: послуги {schedule.service_id} не існує')
+
+        # Один запит за чинним розкладом усіх тренерів файлу, далі - сортування і прохід у пам'яті
+        existing = list(Schedule.objects.filter(trainer_id__in=trainer_ids, is_active=True))
+        for first, second in find_overlaps(existing + schedules):
+            if first.pk is not None and second.pk is not None:
+                continue  # старі конфлікти в БД не блокують імпорт
+            rows = [f'рядок {s._row}' if s.pk is None else f'чинний розклад #{s.pk}' for s in (first, second)]
+            errors.append(f"Тренер {first.trainer_id}, {describe_overlap(first, second)} ({' та '.join(rows)})")
+
+        if errors:
+            for error in errors:
+                self.stderr.write(error)
+            raise CommandError(f'Імпорт скасовано: {len(errors)} помилок')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'✅ Файл коректний: {len(schedules)} розкладів'))
+            return
+
+        with transaction.atomic():
+            created = Schedule.objects.bulk_create(schedules)
+            # bulk_create обходить сигнали - заняття та кеш оновлюємо вручну
+            generate_slots(schedule_ids=[schedule.pk for schedule in created])
+            bump_version(SCHEDULE)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Імпортовано {len(created)} розкладів!')
+        )
+
+    def _read(self, path):
+        schedules, errors = [], []
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            missing = set(COLUMNS) - set(reader.fieldnames or [])
+            if missing:
+                raise CommandError(f'У файлі немає колонок: {", ".join(sorted(missing))}')
+
+            for row_number, row in enumerate(reader, start=2):
+                try:
+                    schedule = Schedule(
+                        trainer_id=int(row['trainer_id']),
+                        service_id=int(row['service_id']),
+                        day_of_week=int(row['day_of_week']),
+                        start_time=time.fromisoformat(row['start_time']),
+                        end_time=time.fromisoformat(row['end_time']),
+                        max_participants=int(row['max_participants'] or 1),
+                    )
+                except (TypeError, ValueError) as e:
+                    errors.append(f'Рядок {row_number}: {e}')
+                    continue
+                if not 0 <= schedule.day_of_week <= 6:
+                    errors.append(f'Рядок {row_number}: день тижня має бути від 0 до 6')
+                    continue
+                if schedule.end_time <= schedule.start_time:
+                    errors.append(f'Рядок {row_number}: час закінчення має бути пізніше за час початку')
+                    continue
+                schedule._row = row_number
+                schedules.append(schedule)
+        return schedules, errors
@@ -27,7 +27,7 @@ class Command(BaseCommand):
 
         PricingPlan.objects.create(
             service=mma, name="Пакет з 10 занять", plan_type="package",
-            price=8000, sessions_count=10, discount_percent=11.11
+            price=9000, sessions_count=10, discount_percent=11.11
         )
 
         ServiceFeature.objects.create(
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from elevix.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Видалити прострочені ключі ідемпотентності (запускати щодня з cron)'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Видалено {deleted} ключів!')
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from elevix.cache import CATALOG, bump_version
+from elevix.catalog import rebuild_snapshots
+from elevix.models import Service
+
+
+class Command(BaseCommand):
+    help = 'Перебудувати знімки каталогу для всіх послуг (після міграції або ручних змін у БД)'
+
+    def handle(self, *args, **options):
+        count = rebuild_snapshots(Service.objects.values_list('pk', flat=True))
+        bump_version(CATALOG)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Перебудовано {count} знімків каталогу!')
+        )
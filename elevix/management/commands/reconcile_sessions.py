@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from elevix.ledger import reconcile_balances
+
+
+class Command(BaseCommand):
+    help = 'Перерахувати залишок занять пакетів (Booking.sessions_remaining) із журналу відвідувань'
+
+    def handle(self, *args, **options):
+        updated = reconcile_balances()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Перераховано {updated} пакетів!')
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from elevix.jobs import run_pending
+
+
+class Command(BaseCommand):
+    help = 'Виконати фонові завдання з черги (запускати регулярно, напр. щохвилини з cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Максимум завдань за запуск')
+
+    def handle(self, *args, **options):
+        processed = run_pending(options['limit'])
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Виконано {processed} завдань!')
+        )
@@ -0,0 +1,175 @@
+import random
+from datetime import time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from elevix.cache import CATALOG, SCHEDULE, bump_version
+from elevix.catalog import rebuild_snapshots
+from elevix.models import GymUser, Trainer, Service, PricingPlan, ServiceFeature, Schedule, Booking, FAQ
+from elevix.slots import generate_slots
+
+# Домен користувачів, створених для навантажувального тестування
+BENCH_EMAIL_DOMAIN = 'bench.local'
+
+FIRST_NAMES = ['Олександр', 'Марія', 'Андрій', 'Ірина', 'Дмитро', 'Олена', 'Сергій', 'Наталія']
+LAST_NAMES = ['Коваленко', 'Шевченко', 'Бондар', 'Ткаченко', 'Мельник', 'Кравчук', 'Олійник', 'Лисенко']
+
+# Хости БД, які вважаються локальними (порожній - unix-сокет)
+LOCAL_DB_HOSTS = ('', 'localhost', '127.0.0.1', '::1')
+
+
+def is_local_database(settings_dict):
+    """SQLite або сервер БД на цій машині"""
+    return 'sqlite' in settings_dict['ENGINE'] or (settings_dict.get('HOST') or '') in LOCAL_DB_HOSTS
+
+
+class Command(BaseCommand):
+    help = 'Заповнити локальну БД синтетичними даними заданого масштабу для бенчмарків'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--trainers', type=int, default=200, help='Кількість тренерів')
+        parser.add_argument('--services-per-trainer', type=int, default=3, help='Послуг на тренера')
+        parser.add_argument('--users', type=int, default=2000, help='Кількість клієнтів')
+        parser.add_argument('--bookings-per-user', type=int, default=3, help='Бронювань на клієнта')
+        parser.add_argument('--faqs', type=int, default=20, help='Кількість FAQ')
+        parser.add_argument('--seed', type=int, default=42, help='Зерно генератора (для відтворюваності)')
+        parser.add_argument('--admin-email', default=f'admin@{BENCH_EMAIL_DOMAIN}')
+        parser.add_argument('--admin-password', default='bench-admin')
+        parser.add_argument('--password', default='bench-user', help='Пароль усіх клієнтів')
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Спочатку видалити каталог, FAQ та користувачів @bench.local (лише для локальної БД!)'
+        )
+        parser.add_argument(
+            '--yes-really', action='store_true',
+            help='Дозволити --reset для нелокальної БД',
+        )
+
+    def handle(self, *args, **options):
+        # DEBUG тут не аргумент: він увімкнений за замовчуванням, а DATABASE_URL за замовчуванням - віддалена БД
+        if options['reset'] and not (options['yes_really'] or is_local_database(connection.settings_dict)):
+            raise CommandError(
+                f"--reset видаляє всі бронювання, послуги, тренерів і FAQ, а БД "
+                f"{connection.settings_dict.get('HOST')} не локальна. "
+                "Задайте локальний DATABASE_URL або додайте --yes-really."
+            )
+
+        rng = random.Random(options['seed'])
+        batch_size = 1000
+
+        with transaction.atomic():
+            if options['reset']:
+                Booking.objects.all().delete()
+                Service.objects.all().delete()
+                Trainer.objects.all().delete()
+                FAQ.objects.all().delete()
+                GymUser.objects.filter(email__endswith=f'@{BENCH_EMAIL_DOMAIN}').delete()
+
+            password = make_password(options['password'])
+            users = GymUser.objects.bulk_create([
+                GymUser(
+                    email=f'user{i}@{BENCH_EMAIL_DOMAIN}',
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=rng.choice(LAST_NAMES),
+                    password=password,
+                )
+                for i in range(options['users'])
+            ], batch_size=batch_size)
+
+            admin = GymUser.objects.filter(email=options['admin_email']).first()
+            if admin is None:
+                GymUser.objects.create_superuser(
+                    email=options['admin_email'], password=options['admin_password'],
+                    first_name='Bench', last_name='Admin',
+                )
+
+            specializations = [value for value, _ in Trainer.SPECIALIZATION_CHOICES]
+            trainers = Trainer.objects.bulk_create([
+                Trainer(
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=rng.choice(LAST_NAMES),
+                    age=rng.randint(21, 55),
+                    gender=rng.choice('MF'),
+                    experience=rng.randint(1, 25),
+                    specialization=rng.choice(specializations),
+                    description='Синтетичний тренер для навантажувального тестування.',
+                )
+                for _ in range(options['trainers'])
+            ], batch_size=batch_size)
+
+            categories = [value for value, _ in Service.CATEGORY_CHOICES]
+            services = Service.objects.bulk_create([
+                Service(
+                    name=f'Послуга {trainer.pk}-{n}',
+                    description='Синтетична послуга.',
+                    duration=Decimal(rng.choice(['1.00', '1.50', '2.00'])),
+                    category=rng.choice(categories),
+                    trainer=trainer,
+                )
+                for trainer in trainers
+                for n in range(options['services_per_trainer'])
+            ], batch_size=batch_size)
+
+            plans, features, schedules = [], [], []
+            slots_taken = {}
+            for service in services:
+                price = Decimal(rng.randrange(300, 1500, 50))
+                plans.append(PricingPlan(
+                    service=service, name='Разове', plan_type='single', price=price, is_default=True,
+                ))
+                plans.append(PricingPlan(
+                    service=service, name='Пакет 10', plan_type='package', price=price * 10,
+                    sessions_count=10, discount_percent=Decimal('10'),
+                ))
+                features.extend(
+                    ServiceFeature(service=service, feature_text=f'Особливість {n + 1}', sort_order=n)
+                    for n in range(3)
+                )
+                # Слоти тренера не повторюються: (тренер, день, початок) унікальні
+                slot = slots_taken.get(service.trainer_id, rng.randrange(7 * 12))
+                slots_taken[service.trainer_id] = slot + 1
+                hour = 8 + slot // 7 % 12
+                schedules.append(Schedule(
+                    trainer_id=service.trainer_id, service=service, day_of_week=slot % 7,
+                    start_time=time(hour), end_time=time(hour + 1), max_participants=rng.randint(1, 12),
+                ))
+            plans = PricingPlan.objects.bulk_create(plans, batch_size=batch_size)
+            ServiceFeature.objects.bulk_create(features, batch_size=batch_size)
+            Schedule.objects.bulk_create(schedules, batch_size=batch_size)
+
+            statuses = [value for value, _ in Booking.STATUS_CHOICES]
+            now = timezone.now()
+            bookings = []
+            if plans:
+                for user in users:
+                    for _ in range(options['bookings_per_user']):
+                        plan = rng.choice(plans)
+                        bookings.append(Booking(
+                            user=user, service_id=plan.service_id, pricing_plan=plan,
+                            booking_date=now + timedelta(days=rng.randint(-60, 60), hours=rng.randint(0, 12)),
+                            status=rng.choice(statuses), total_price=plan.price,
+                            sessions_total=plan.sessions_count, sessions_remaining=plan.sessions_count,
+                        ))
+            Booking.objects.bulk_create(bookings, batch_size=batch_size)
+
+            FAQ.objects.bulk_create([
+                FAQ(question=f'Питання {n + 1}?', answer='Синтетична відповідь.', sort_order=n)
+                for n in range(options['faqs'])
+            ], batch_size=batch_size)
+
+            # bulk_create обходить сигнали - знімки та версії кешу оновлюємо вручну
+            rebuild_snapshots([service.pk for service in services])
+            generate_slots()
+            bump_version(CATALOG)
+            bump_version(SCHEDULE)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Створено {len(trainers)} тренерів, {len(services)} послуг, '
+            f'{len(users)} клієнтів, {len(bookings)} бронювань!'
+        ))
+        if trainers:
+            self.stdout.write(f'Перший тренер: pk={trainers[0].pk}')
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from elevix.notifications import SEND_BATCH_SIZE, send_pending
+from elevix.reminders import REMINDER_BATCH_SIZE, queue_reminders
+
+
+class Command(BaseCommand):
+    help = (
+        'Поставити в чергу нагадування за 24 та 2 години до занять і надіслати outbox '
+        '(запускати регулярно, напр. кожні 10 хвилин з cron)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=REMINDER_BATCH_SIZE, help='Бронювань за один запит')
+        parser.add_argument('--send-batch-size', type=int, default=SEND_BATCH_SIZE, help='Листів на одне SMTP-зʼєднання')
+        parser.add_argument('--no-send', action='store_true', help='Лише записати нагадування в outbox')
+
+    def handle(self, *args, **options):
+        queued = queue_reminders(batch_size=options['batch_size'])
+        sent = 0 if options['no_send'] else send_pending(options['send_batch_size'])
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Нових нагадувань: {queued}, надіслано листів: {sent}!')
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from elevix.notifications import SEND_BATCH_SIZE, send_pending
+
+
+class Command(BaseCommand):
+    help = 'Надіслати повідомлення з outbox (запускати регулярно, напр. щохвилини з cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=SEND_BATCH_SIZE, help='Листів на одне SMTP-зʼєднання')
+
+    def handle(self, *args, **options):
+        sent = send_pending(options['batch_size'])
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Надіслано {sent} повідомлень!')
+        )
@@ -0,0 +1,117 @@
+"""Middleware для контролю кількості SQL-запитів на запит"""
+import logging
+import os
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('elevix')
+
+
+def worker_rss_kb():
+    """Поточний RSS процесу в КБ (на системах без /proc - піковий)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class QueryBudgetExceeded(Exception):
+    """Представлення виконало більше SQL-запитів, ніж дозволяє його бюджет"""
+
+
+class QueryCounter:
+    """execute_wrapper, що рахує запити та сумарний час БД"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+class QueryBudgetMiddleware:
+    """
+    Рахує SQL-запити та час БД для кожного запиту і порівнює з бюджетом,
+    оголошеним декоратором @query_budget на представленні.
+
+    Перевищення логуються, а при QUERY_BUDGET_RAISE = True - піднімають
+    QueryBudgetExceeded (зручно в розробці та тестах).
+
+    Під ASGI працює асинхронно, тож Django не обгортає ним асинхронні представлення в потік.
+    execute_wrapper прив'язаний до з'єднання потоку, а асинхронна ORM
+    виконує запити через sync_to_async у потоці запиту, тож лічильник
+    встановлюється і знімається саме там. Запити з sync_to_async(thread_sensitive=False)
+    ідуть в інших потоках і не рахуються.
+
+    При QUERY_BUDGET_HEADERS = True кількість запитів, час БД, PID та RSS
+    воркера додаються до заголовків відповіді - їх збирає benchmarks/run.py.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.raise_on_exceed = getattr(settings, 'QUERY_BUDGET_RAISE', False)
+        self.expose_headers = getattr(settings, 'QUERY_BUDGET_HEADERS', False)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            self._count_queries(stack, counter)
+            response = self.get_response(request)
+        return self._check(request, response, counter)
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        stack = ExitStack()
+        await sync_to_async(self._count_queries)(stack, counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self._check(request, response, counter)
+
+    def _count_queries(self, stack, counter):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+
+    def _check(self, request, response, counter):
+        if self.expose_headers:
+            response.headers['X-DB-Queries'] = str(counter.count)
+            response.headers['X-DB-Time-Ms'] = f'{counter.duration * 1000:.2f}'
+            response.headers['X-Worker-PID'] = str(os.getpid())
+            response.headers['X-Worker-RSS-KB'] = str(worker_rss_kb())
+
+        budget = getattr(request, '_query_budget', None)
+        if budget is not None and counter.count > budget:
+            message = (
+                f'Перевищено бюджет запитів для {request.resolver_match.view_name}: '
+                f'{counter.count} > {budget} ({counter.duration * 1000:.1f} мс у БД)'
+            )
+            if self.raise_on_exceed:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = getattr(view_func, 'query_budget', None)
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elevix', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogSnapshot',
+            fields=[
+                ('service', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='snapshot', serialize=False, to='elevix.service', verbose_name='Послуга')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Активна')),
+                ('data', models.JSONField(default=dict, verbose_name='Дані')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата оновлення')),
+                ('trainer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='service_snapshots', to='elevix.trainer', verbose_name='Тренер')),
+            ],
+            options={
+                'verbose_name': 'Знімок каталогу',
+                'verbose_name_plural': 'Знімки каталогу',
+                'db_table': 'catalog_snapshots',
+                'ordering': ['service'],
+                'indexes': [models.Index(fields=['is_active', 'service'], name='catalog_active_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elevix', '0002_catalog_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trainer',
+            index=models.Index(fields=['-created_at', '-id'], name='trainer_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainer',
+            index=models.Index(fields=['specialization', '-created_at', '-id'], name='trainer_spec_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainer',
+            index=models.Index(fields=['gender', '-created_at', '-id'], name='trainer_gender_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elevix', '0003_trainer_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='schedule',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bookings', to='elevix.schedule', verbose_name='Слот розкладу'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['schedule', 'booking_date', 'status'], name='booking_slot_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elevix', '0004_booking_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('starts_at', models.DateTimeField(verbose_name='Початок')),
+                ('ends_at', models.DateTimeField(verbose_name='Кінець')),
+                ('capacity', models.PositiveIntegerField(verbose_name='Місць')),
+                ('booked_count', models.PositiveIntegerField(default=0, verbose_name='Зайнято')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Активне')),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='elevix.schedule', verbose_name='Розклад')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_occurrences', to='elevix.service', verbose_name='Послуга')),
+                ('trainer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_occurrences', to='elevix.trainer', verbose_name='Тренер')),
+            ],
+            options={
+                'verbose_name': 'Заняття',
+                'verbose_name_plural': 'Заняття',
+                'db_table': 'slot_occurrences',
+                'ordering': ['starts_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='slot',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bookings', to='elevix.slotoccurrence', verbose_name='Заняття'),
+        ),
+        migrations.AddIndex(
+            model_name='slotoccurrence',
+            index=models.Index(fields=['service', 'starts_at'], name='slot_service_start_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='slotoccurrence',
+            constraint=models.UniqueConstraint(fields=('schedule', 'starts_at'), name='slot_schedule_start_uniq'),
+        ),
+    ]
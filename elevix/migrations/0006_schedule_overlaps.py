@@ -0,0 +1,75 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:01
+
+from django.db import migrations, models
+
+from elevix.migrations._utils import postgres_only_sql
+from elevix.overlaps import find_overlaps
+
+# У PostgreSQL перетини відсікає ще й сама БД: EXCLUDE по (тренер, день, інтервал часу).
+# Для інтервалу часу потрібен власний range-тип, для "=" у GiST - btree_gist.
+POSTGRES_EXCLUSION_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    """
+    DO $$ BEGIN
+        CREATE TYPE elevix_timerange AS RANGE (subtype = time);
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END $$
+    """,
+    """
+    ALTER TABLE schedules ADD CONSTRAINT schedule_no_overlap EXCLUDE USING gist (
+        trainer_id WITH =,
+        day_of_week WITH =,
+        elevix_timerange(start_time, end_time) WITH &&
+    ) WHERE (is_active)
+    """,
+]
+
+POSTGRES_EXCLUSION_REVERSE_SQL = [
+    "ALTER TABLE schedules DROP CONSTRAINT IF EXISTS schedule_no_overlap",
+    "DROP TYPE IF EXISTS elevix_timerange",
+]
+
+
+def resolve_existing_conflicts(apps, schema_editor):
+    """
+    Готує наявні рядки до обмежень, інакше ADD CONSTRAINT перерве міграцію.
+
+    Розклад із end_time <= start_time виправити автоматично не можна - міграція
+    зупиняється зі списком pk. З активних розкладів, що перетинаються, вимикається
+    пізніше створений (більший pk); його заняття прибере наступний generate_slots.
+    """
+    Schedule = apps.get_model('elevix', 'Schedule')
+    invalid = list(Schedule.objects.filter(end_time__lte=models.F('start_time')).values_list('pk', flat=True))
+    if invalid:
+        raise RuntimeError(
+            f'Розклади з часом закінчення не пізніше за початок: {invalid}. '
+            'Виправте їх час і повторіть migrate.'
+        )
+
+    deactivated = []
+    active = list(Schedule.objects.filter(is_active=True))
+    conflicts = find_overlaps(active)
+    while conflicts:
+        later = {max(first.pk, second.pk) for first, second in conflicts}
+        deactivated.extend(sorted(later))
+        active = [schedule for schedule in active if schedule.pk not in later]
+        conflicts = find_overlaps(active)
+    if deactivated:
+        Schedule.objects.filter(pk__in=deactivated).update(is_active=False)
+        print(f'\n  Вимкнено розклади, що перетинались з іншими: {deactivated}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elevix', '0005_slot_occurrences'),
+    ]
+
+    operations = [
+        migrations.RunPython(resolve_existing_conflicts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='schedule',
+            constraint=models.CheckConstraint(condition=models.Q(('end_time__gt', models.F('start_time'))), name='schedule_end_after_start', violation_error_message='Час закінчення має бути пізніше за час початку.'),
+        ),
+        postgres_only_sql(POSTGRES_EXCLUSION_SQL, POSTGRES_EXCLUSION_REVERSE_SQL),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def open_ledger(apps, schema_editor):
+    """Вже використані заняття переносимо в журнал одним записом, щоб звірка не скинула баланс"""
+    Booking = apps.get_model('elevix', 'Booking')
+    SessionUsage = apps.get_model('elevix', 'SessionUsage')
+    bookings = Booking.objects.filter(
+        sessions_total__isnull=False, sessions_remaining__lt=models.F('sessions_total')
+    ).values_list('pk', 'sessions_total', 'sessions_remaining')
+    SessionUsage.objects.bulk_create([
+        SessionUsage(booking_id=pk, sessions=total - remaining, note='Початковий баланс')
+        for pk, total, remaining in bookings.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elevix', '0006_schedule_overlaps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sessions', models.SmallIntegerField(default=1, verbose_name='Занять')),
+                ('note', models.CharField(blank=True, max_length=200, verbose_name='Примітка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата відвідування')),
+            ],
+            options={
+                'verbose_name': 'Відвідування',
+                'verbose_name_plural': 'Журнал відвідувань',
+                'db_table': 'session_usages',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.CheckConstraint(condition=models.Q(('sessions_remaining__gte', 0), ('sessions_remaining__lte', models.F('sessions_total'))), name='booking_sessions_balance_range'),
+        ),
+        migrations.AddField(
+            model_name='sessionusage',
+            name='booking',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_usages', to='elevix.booking', verbose_name='Бронювання'),
+        ),
+        migrations.AddField(
+            model_name='sessionusage',
+            name='checked_in_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Відмітив'),
+        ),
+        migrations.AddField(
+            model_name='sessionusage',
+            name='slot',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='session_usages', to='elevix.slotoccurrence', verbose_name='Заняття'),
+        ),
+        migrations.AddIndex(
+            model_name='sessionusage',
+            index=models.Index(fields=['booking', 'created_at'], name='usage_booking_idx'),
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
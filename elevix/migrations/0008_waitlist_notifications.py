@@ -0,0 +1,56 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elevix', '0007_session_usage_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('waitlist_promoted', 'Місце з черги')], max_length=30, verbose_name='Тип')),
+                ('subject', models.CharField(max_length=200, verbose_name='Тема')),
+                ('body', models.TextField(verbose_name='Текст')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата створення')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Надіслано')),
+                ('booking', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='elevix.booking', verbose_name='Бронювання')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL, verbose_name='Користувач')),
+            ],
+            options={
+                'verbose_name': 'Повідомлення',
+                'verbose_name_plural': 'Повідомлення',
+                'db_table': 'notifications',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['sent_at', 'created_at'], name='notification_outbox_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('waiting', 'Очікує'), ('promoted', 'Записаний'), ('cancelled', 'Скасовано')], default='waiting', max_length=20, verbose_name='Статус')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата створення')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата оновлення')),
+                ('booking', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='waitlist_entry', to='elevix.booking', verbose_name='Бронювання')),
+                ('pricing_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='elevix.pricingplan', verbose_name='Тарифний план')),
+                ('slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist', to='elevix.slotoccurrence', verbose_name='Заняття')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to=settings.AUTH_USER_MODEL, verbose_name='Користувач')),
+            ],
+            options={
+                'verbose_name': 'Черга',
+                'verbose_name_plural': 'Черга на заняття',
+                'db_table': 'waitlist_entries',
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['slot', 'status', 'created_at', 'id'], name='waitlist_head_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'waiting')), fields=('slot', 'user'), name='waitlist_one_entry_per_user')],
+            },
+        ),
+    ]
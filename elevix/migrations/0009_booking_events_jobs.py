@@ -0,0 +1,59 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elevix', '0008_waitlist_notifications'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(choices=[('waitlist_promoted', 'Місце з черги'), ('booking_confirmed', 'Бронювання підтверджено'), ('booking_cancelled', 'Бронювання скасовано')], max_length=30, verbose_name='Тип'),
+        ),
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50, verbose_name='Тип')),
+                ('payload', models.JSONField(default=dict, verbose_name='Дані')),
+                ('status', models.CharField(choices=[('pending', 'Очікує'), ('running', 'Виконується'), ('done', 'Виконано'), ('failed', 'Помилка')], default='pending', max_length=20, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Спроб')),
+                ('error', models.TextField(blank=True, verbose_name='Помилка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата створення')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Початок')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+            ],
+            options={
+                'verbose_name': 'Завдання',
+                'verbose_name_plural': 'Фонові завдання',
+                'db_table': 'jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='job_queue_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BookingEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(choices=[('pending', 'Очікує підтвердження'), ('confirmed', 'Підтверджено'), ('completed', 'Завершено'), ('cancelled', 'Скасовано')], max_length=20, verbose_name='Був статус')),
+                ('to_status', models.CharField(choices=[('pending', 'Очікує підтвердження'), ('confirmed', 'Підтверджено'), ('completed', 'Завершено'), ('cancelled', 'Скасовано')], max_length=20, verbose_name='Новий статус')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата')),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Хто змінив')),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='elevix.booking', verbose_name='Бронювання')),
+            ],
+            options={
+                'verbose_name': 'Подія бронювання',
+                'verbose_name_plural': 'Історія бронювань',
+                'db_table': 'booking_events',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['booking', 'created_at'], name='booking_event_idx')],
+            },
+        ),
+    ]
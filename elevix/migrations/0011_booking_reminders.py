@@ -0,0 +1,26 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elevix', '0010_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(choices=[('waitlist_promoted', 'Місце з черги'), ('booking_confirmed', 'Бронювання підтверджено'), ('booking_cancelled', 'Бронювання скасовано'), ('reminder_24h', 'Нагадування за 24 години'), ('reminder_2h', 'Нагадування за 2 години')], max_length=30, verbose_name='Тип'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status__in', ('pending', 'confirmed'))), fields=['booking_date', 'id'], name='booking_upcoming_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(fields=('booking', 'kind'), name='notification_booking_kind_uniq'),
+        ),
+    ]
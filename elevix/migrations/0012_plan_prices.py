@@ -0,0 +1,47 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:15
+
+import django.db.models.expressions
+import django.db.models.functions.math
+from django.db import migrations, models
+
+
+
+def warn_about_discounted_plans(apps, schema_editor):
+    """
+    Досі discount_percent лише показувався, а до сплати йшла price; відтепер
+    знижка віднімається від price. Ціни не змінюються автоматично - якщо
+    price вводили вже зі знижкою, персонал виправляє тарифи за списком
+    audit_plan_discounts.
+    """
+    PricingPlan = apps.get_model('elevix', 'PricingPlan')
+    count = PricingPlan.objects.filter(discount_percent__gt=0).count()
+    if count:
+        print(
+            f'\n  {count} тарифів зі знижкою: до сплати тепер ціна мінус знижка. '
+            f'Перевірте їх: python manage.py audit_plan_discounts'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elevix', '0011_booking_reminders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pricingplan',
+            name='effective_price',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('price'), '*', django.db.models.expressions.CombinedExpression(models.Value(100), '-', models.F('discount_percent'))), '/', models.Value(100)), 2), output_field=models.DecimalField(decimal_places=2, max_digits=10), verbose_name='Ціна зі знижкою (грн)'),
+        ),
+        migrations.AddField(
+            model_name='pricingplan',
+            name='price_per_session',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(sessions_count__gt=0, then=django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('price'), '*', django.db.models.expressions.CombinedExpression(models.Value(100), '-', models.F('discount_percent'))), '/', models.Value(100)), '/', models.F('sessions_count')), 2)), default=django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('price'), '*', django.db.models.expressions.CombinedExpression(models.Value(100), '-', models.F('discount_percent'))), '/', models.Value(100)), 2)), output_field=models.DecimalField(decimal_places=2, max_digits=10), verbose_name='Ціна за заняття (грн)'),
+        ),
+        migrations.AddIndex(
+            model_name='pricingplan',
+            index=models.Index(fields=['service', 'price_per_session'], name='plan_service_price_idx'),
+        ),
+        migrations.RunPython(warn_about_discounted_plans, migrations.RunPython.noop),
+    ]
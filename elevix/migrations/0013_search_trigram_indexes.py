@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:21
+
+from django.db import migrations
+
+from elevix.migrations._utils import postgres_only_sql
+
+# icontains у PostgreSQL - це UPPER("col"::text) LIKE UPPER(%s), contains - "col"::text LIKE %s.
+# Індекси побудовані саме по цих виразах, інакше планувальник їх не використає.
+TRIGRAM_INDEXES = [
+    ('gym_user_email_trgm', 'gym_users', 'UPPER(email::text)'),
+    ('gym_user_first_name_trgm', 'gym_users', 'UPPER(first_name::text)'),
+    ('gym_user_last_name_trgm', 'gym_users', 'UPPER(last_name::text)'),
+    ('gym_user_middle_name_trgm', 'gym_users', 'UPPER(middle_name::text)'),
+    ('gym_user_phone_trgm', 'gym_users', '(phone::text)'),
+    ('service_name_trgm', 'services', 'UPPER(name::text)'),
+]
+
+POSTGRES_TRIGRAM_SQL = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({expression} gin_trgm_ops)"
+    for name, table, expression in TRIGRAM_INDEXES
+]
+
+# Розширення не видаляємо: ним можуть користуватися інші схеми БД
+POSTGRES_TRIGRAM_REVERSE_SQL = [f"DROP INDEX IF EXISTS {name}" for name, _, _ in TRIGRAM_INDEXES]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elevix', '0012_plan_prices'),
+    ]
+
+    operations = [
+        postgres_only_sql(POSTGRES_TRIGRAM_SQL, POSTGRES_TRIGRAM_REVERSE_SQL),
+    ]
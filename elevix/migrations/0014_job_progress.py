@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elevix', '0013_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='last_pk',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='Останній ID'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='processed',
+            field=models.PositiveIntegerField(default=0, verbose_name='Оброблено'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='query',
+            field=models.BinaryField(null=True, verbose_name='Вибірка'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='total',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Усього'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elevix', '0014_job_progress'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='job',
+            name='query',
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Остання активність'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='object_ids',
+            field=models.JSONField(default=list, editable=False, verbose_name='Обрані ID'),
+        ),
+    ]
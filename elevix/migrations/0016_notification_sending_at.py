@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elevix', '0015_job_object_ids_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='sending_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Надсилається з'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:40
+
+from django.db import migrations
+
+from elevix.catalog import save_snapshots
+from elevix.models import cheapest_plan_annotations
+
+
+def backfill_snapshots(apps, schema_editor):
+    """
+    Заповнює знімки каталогу для наявних послуг.
+
+    Головна та сторінка тренера читають лише catalog_snapshots, а сигнали
+    будують знімки тільки при змінах - без цього кроку після деплою каталог
+    порожній до ручного rebuild_catalog. Знімки будує той самий build_snapshot_data,
+    що й rebuild_snapshots, але з історичними моделями; тому крок стоїть після
+    міграцій, від полів яких залежать дані знімка (effective_price з 0012).
+    """
+    Service = apps.get_model('elevix', 'Service')
+    PricingPlan = apps.get_model('elevix', 'PricingPlan')
+    CatalogSnapshot = apps.get_model('elevix', 'CatalogSnapshot')
+    services = Service.objects.annotate(
+        **cheapest_plan_annotations(PricingPlan)
+    ).select_related(
+        'trainer'
+    ).prefetch_related(
+        'pricing_plans',
+        'features'
+    )
+    save_snapshots(services, CatalogSnapshot)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elevix', '0016_notification_sending_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+"""Спільні кроки міграцій (файл з _ на початку завантажувач міграцій пропускає)"""
+from django.db import migrations
+
+
+def _run_on_postgres(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+def postgres_only_sql(statements, reverse_statements):
+    """RunPython, що виконує SQL лише в PostgreSQL; на інших БД (SQLite у тестах) крок порожній"""
+    return migrations.RunPython(_run_on_postgres(statements), _run_on_postgres(reverse_statements))
@@ -1,7 +1,13 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Case, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Round
 from django.contrib.auth.models import AbstractUser, UserManager as DjangoUserManager
+from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
 
+from .images import image_srcset, image_variants
+
 
 class CustomUserManager(DjangoUserManager):
     """Кастомний менеджер для користувача без username"""
@@ -86,6 +92,16 @@ class GymUser(AbstractUser):
             initials += f"{self.middle_name[0]}."
         return f"{self.last_name} {initials}"
 
+    @property
+    def avatar_variants(self):
+        """URL зменшених варіантів аватара: {'thumb': {'webp': ..., 'jpg': ...}, ...}"""
+        return image_variants(self.avatar)
+
+    @property
+    def avatar_srcset(self):
+        """Значення srcset для аватара: {'webp': ..., 'jpg': ...}"""
+        return image_srcset(self.avatar)
+
 
 class Trainer(models.Model):
     """Тренер спортзалу"""
@@ -141,6 +157,12 @@ class Trainer(models.Model):
         verbose_name = 'Тренер'
         verbose_name_plural = 'Тренери'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset-пагінація каталогу: (created_at, id) з фільтрами
+            models.Index(fields=['-created_at', '-id'], name='trainer_keyset_idx'),
+            models.Index(fields=['specialization', '-created_at', '-id'], name='trainer_spec_keyset_idx'),
+            models.Index(fields=['gender', '-created_at', '-id'], name='trainer_gender_keyset_idx'),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.get_specialization_display()}"
@@ -150,6 +172,35 @@ class Trainer(models.Model):
         parts = [self.last_name, self.first_name, self.middle_name]
         return " ".join(filter(None, parts))
 
+    @property
+    def photo_variants(self):
+        """URL зменшених варіантів фото: {'thumb': {'webp': ..., 'jpg': ...}, ...}"""
+        return image_variants(self.photo)
+
+    @property
+    def photo_srcset(self):
+        """Значення srcset для фото: {'webp': ..., 'jpg': ...}"""
+        return image_srcset(self.photo)
+
+
+def cheapest_plan_annotations(plan_model):
+    """Анотації найдешевшого тарифу послуги; plan_model - PricingPlan або його історична модель у міграції"""
+    plans = plan_model.objects.filter(service=OuterRef('pk')).order_by('price_per_session', 'pk')
+    return {
+        'cheapest_plan_id': Subquery(plans.values('pk')[:1]),
+        'cheapest_price_per_session': Subquery(
+            plans.values('price_per_session')[:1],
+            output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        ),
+    }
+
+
+class ServiceQuerySet(models.QuerySet):
+
+    def with_cheapest_plan(self):
+        """Анотує найдешевший тариф послуги за ціною заняття (індекс plan_service_price_idx)"""
+        return self.annotate(**cheapest_plan_annotations(PricingPlan))
+
 
 class Service(models.Model):
     """Послуги залу"""
@@ -179,6 +230,8 @@ class Service(models.Model):
     created_at = models.DateTimeField("Дата створення", auto_now_add=True)
     updated_at = models.DateTimeField("Дата оновлення", auto_now=True)
 
+    objects = ServiceQuerySet.as_manager()
+
     class Meta:
         db_table = 'services'
         verbose_name = 'Послуга'
@@ -189,6 +242,11 @@ class Service(models.Model):
         return f"{self.name} ({self.get_category_display()})"
 
 
+def discounted_price():
+    """Ціна тарифу зі знижкою discount_percent (вираз для БД)"""
+    return F('price') * (Value(100) - F('discount_percent')) / Value(100)
+
+
 class PricingPlan(models.Model):
     """Тарифні плани для послуг"""
 
@@ -222,6 +280,23 @@ class PricingPlan(models.Model):
     )
     is_default = models.BooleanField("Базовий план", default=False)
 
+    # Обчислюються в БД при кожному записі, тож сортування і фільтри по них ідуть по індексу
+    effective_price = models.GeneratedField(
+        verbose_name="Ціна зі знижкою (грн)",
+        expression=Round(discounted_price(), 2),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+    )
+    price_per_session = models.GeneratedField(
+        verbose_name="Ціна за заняття (грн)",
+        expression=Case(
+            When(sessions_count__gt=0, then=Round(discounted_price() / F('sessions_count'), 2)),
+            default=Round(discounted_price(), 2),
+        ),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+    )
+
     created_at = models.DateTimeField("Дата створення", auto_now_add=True)
     updated_at = models.DateTimeField("Дата оновлення", auto_now=True)
 
@@ -230,15 +305,17 @@ class PricingPlan(models.Model):
         verbose_name = 'Тарифний план'
         verbose_name_plural = 'Тарифні плани'
         ordering = ['service', 'price']
+        indexes = [
+            # Найдешевший тариф послуги (Service.objects.with_cheapest_plan)
+            models.Index(fields=['service', 'price_per_session'], name='plan_service_price_idx'),
+        ]
 
     def __str__(self):
         return f"{self.service.name} - {self.name} ({self.price} грн)"
 
     def get_price_per_session(self):
-        """Ціна за одне заняття"""
-        if self.sessions_count and self.sessions_count > 0:
-            return self.price / self.sessions_count
-        return self.price
+        """Ціна за одне заняття з урахуванням знижки"""
+        return self.price_per_session
 
 
 class ServiceFeature(models.Model):
@@ -265,6 +342,44 @@ class ServiceFeature(models.Model):
         return f"{self.service.name} - {self.feature_text[:50]}"
 
 
+class CatalogSnapshot(models.Model):
+    """Денормалізований знімок послуги для публічних сторінок"""
+
+    service = models.OneToOneField(
+        Service,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='snapshot',
+        verbose_name="Послуга"
+    )
+
+    trainer = models.ForeignKey(
+        Trainer,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='service_snapshots',
+        verbose_name="Тренер"
+    )
+
+    is_active = models.BooleanField("Активна", default=True)
+    data = models.JSONField("Дані", default=dict)
+
+    updated_at = models.DateTimeField("Дата оновлення", auto_now=True)
+
+    class Meta:
+        db_table = 'catalog_snapshots'
+        verbose_name = 'Знімок каталогу'
+        verbose_name_plural = 'Знімки каталогу'
+        ordering = ['service']
+        indexes = [
+            models.Index(fields=['is_active', 'service'], name='catalog_active_idx'),
+        ]
+
+    def __str__(self):
+        return self.data.get('name', str(self.service_id))
+
+
 class Booking(models.Model):
     """Бронювання послуг"""
 
@@ -296,11 +411,29 @@ class Booking(models.Model):
         verbose_name="Тарифний план"
     )
 
+    schedule = models.ForeignKey(
+        'Schedule',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='bookings',
+        verbose_name="Слот розкладу"
+    )
+
+    slot = models.ForeignKey(
+        'SlotOccurrence',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='bookings',
+        verbose_name="Заняття"
+    )
+
     booking_date = models.DateTimeField("Дата та час бронювання")
     status = models.CharField("Статус", max_length=20, choices=STATUS_CHOICES, default='pending')
     total_price = models.DecimalField("Загальна сума (грн)", max_digits=10, decimal_places=2)
 
-    # Для пакетних послуг
+    # Для пакетних послуг; sessions_remaining - кешований баланс журналу SessionUsage
     sessions_total = models.PositiveIntegerField("Всього занять", null=True, blank=True)
     sessions_remaining = models.PositiveIntegerField("Залишок занять", null=True, blank=True)
 
@@ -315,6 +448,22 @@ class Booking(models.Model):
         verbose_name = 'Бронювання'
         verbose_name_plural = 'Бронювання'
         ordering = ['-booking_date']
+        indexes = [
+            # Підрахунок зайнятих місць у слоті (elevix.booking.create_booking)
+            models.Index(fields=['schedule', 'booking_date', 'status'], name='booking_slot_idx'),
+            # Вибірка майбутніх активних бронювань для нагадувань (elevix.reminders)
+            models.Index(
+                fields=['booking_date', 'id'],
+                name='booking_upcoming_idx',
+                condition=Q(status__in=('pending', 'confirmed')),
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(sessions_remaining__gte=0) & Q(sessions_remaining__lte=F('sessions_total')),
+                name='booking_sessions_balance_range',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.service.name} ({self.booking_date.strftime('%d.%m.%Y')})"
@@ -327,6 +476,52 @@ class Booking(models.Model):
         super().save(*args, **kwargs)
 
 
+class SessionUsage(models.Model):
+    """Запис журналу використання занять пакета (лише додається, не редагується)"""
+
+    booking = models.ForeignKey(
+        Booking,
+        on_delete=models.CASCADE,
+        related_name='session_usages',
+        verbose_name="Бронювання"
+    )
+
+    slot = models.ForeignKey(
+        'SlotOccurrence',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='session_usages',
+        verbose_name="Заняття"
+    )
+
+    # Додатне - списано заняття, від'ємне - повернено (коригування)
+    sessions = models.SmallIntegerField("Занять", default=1)
+    checked_in_by = models.ForeignKey(
+        GymUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Відмітив"
+    )
+    note = models.CharField("Примітка", max_length=200, blank=True)
+
+    created_at = models.DateTimeField("Дата відвідування", auto_now_add=True)
+
+    class Meta:
+        db_table = 'session_usages'
+        verbose_name = 'Відвідування'
+        verbose_name_plural = 'Журнал відвідувань'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['booking', 'created_at'], name='usage_booking_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.booking_id}: {self.sessions:+d} ({self.created_at:%d.%m.%Y %H:%M})"
+
+
 class Schedule(models.Model):
     """Розклад тренувань"""
 
@@ -371,10 +566,330 @@ class Schedule(models.Model):
         verbose_name_plural = 'Розклади'
         ordering = ['day_of_week', 'start_time']
         unique_together = ['trainer', 'day_of_week', 'start_time']
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(end_time__gt=F('start_time')),
+                name='schedule_end_after_start',
+                violation_error_message='Час закінчення має бути пізніше за час початку.',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.trainer.get_full_name()} - {self.get_day_of_week_display()} {self.start_time}"
 
+    def overlapping(self):
+        """Активні розклади тренера в цей день, що перетинаються з цим (індекс trainer, day_of_week, start_time)"""
+        return Schedule.objects.filter(
+            trainer_id=self.trainer_id,
+            day_of_week=self.day_of_week,
+            is_active=True,
+            start_time__lt=self.end_time,
+            end_time__gt=self.start_time,
+        ).exclude(pk=self.pk)
+
+    def clean(self):
+        super().clean()
+        self.validate_no_overlap()
+
+    def validate_no_overlap(self):
+        """
+        Тренер не може вести два заняття одночасно.
+
+        Викликається з clean() у формах та адмінці (import_schedules звіряє
+        файл через find_overlaps). Прямий save()/create() не перевіряє:
+        у PostgreSQL перетин відхилить EXCLUDE schedule_no_overlap, на інших
+        БД такий рядок буде збережено.
+        """
+        if not (self.is_active and self.trainer_id and self.start_time and self.end_time):
+            return
+        if self.end_time <= self.start_time:
+            return  # це відхилить schedule_end_after_start
+        conflict = self.overlapping().first()
+        if conflict is not None:
+            raise ValidationError(
+                f"Тренер уже зайнятий: {conflict.get_day_of_week_display()} "
+                f"{conflict.start_time:%H:%M}-{conflict.end_time:%H:%M}."
+            )
+
+
+class SlotOccurrence(models.Model):
+    """Конкретне заняття, згенероване з тижневого шаблону Schedule"""
+
+    schedule = models.ForeignKey(
+        Schedule,
+        on_delete=models.CASCADE,
+        related_name='occurrences',
+        verbose_name="Розклад"
+    )
+
+    # Денормалізовано з розкладу для вибірок доступності без JOIN
+    service = models.ForeignKey(
+        Service,
+        on_delete=models.CASCADE,
+        related_name='slot_occurrences',
+        verbose_name="Послуга"
+    )
+
+    trainer = models.ForeignKey(
+        Trainer,
+        on_delete=models.CASCADE,
+        related_name='slot_occurrences',
+        verbose_name="Тренер"
+    )
+
+    starts_at = models.DateTimeField("Початок")
+    ends_at = models.DateTimeField("Кінець")
+    capacity = models.PositiveIntegerField("Місць")
+    booked_count = models.PositiveIntegerField("Зайнято", default=0)
+    is_active = models.BooleanField("Активне", default=True)
+
+    class Meta:
+        db_table = 'slot_occurrences'
+        verbose_name = 'Заняття'
+        verbose_name_plural = 'Заняття'
+        ordering = ['starts_at']
+        constraints = [
+            models.UniqueConstraint(fields=['schedule', 'starts_at'], name='slot_schedule_start_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['service', 'starts_at'], name='slot_service_start_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.service.name} - {timezone.localtime(self.starts_at):%d.%m.%Y %H:%M}"
+
+    @property
+    def places_left(self):
+        """Вільні місця"""
+        return max(self.capacity - self.booked_count, 0)
+
+
+class WaitlistEntry(models.Model):
+    """Черга (FIFO) на заповнене заняття"""
+
+    STATUS_CHOICES = [
+        ('waiting', 'Очікує'),
+        ('promoted', 'Записаний'),
+        ('cancelled', 'Скасовано'),
+    ]
+
+    slot = models.ForeignKey(
+        SlotOccurrence,
+        on_delete=models.CASCADE,
+        related_name='waitlist',
+        verbose_name="Заняття"
+    )
+
+    user = models.ForeignKey(
+        GymUser,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries',
+        verbose_name="Користувач"
+    )
+
+    pricing_plan = models.ForeignKey(
+        PricingPlan,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries',
+        verbose_name="Тарифний план"
+    )
+
+    status = models.CharField("Статус", max_length=20, choices=STATUS_CHOICES, default='waiting')
+    booking = models.OneToOneField(
+        Booking,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='waitlist_entry',
+        verbose_name="Бронювання"
+    )
+
+    created_at = models.DateTimeField("Дата створення", auto_now_add=True)
+    updated_at = models.DateTimeField("Дата оновлення", auto_now=True)
+
+    class Meta:
+        db_table = 'waitlist_entries'
+        verbose_name = 'Черга'
+        verbose_name_plural = 'Черга на заняття'
+        ordering = ['created_at', 'id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['slot', 'user'],
+                condition=Q(status='waiting'),
+                name='waitlist_one_entry_per_user',
+            ),
+        ]
+        indexes = [
+            # Голова черги заняття - один прохід по індексу
+            models.Index(fields=['slot', 'status', 'created_at', 'id'], name='waitlist_head_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.get_full_name()} - {self.slot}"
+
+
+class Notification(models.Model):
+    """Вихідне повідомлення (outbox): створюється в транзакції, надсилається командою send_notifications"""
+
+    KIND_CHOICES = [
+        ('waitlist_promoted', 'Місце з черги'),
+        ('booking_confirmed', 'Бронювання підтверджено'),
+        ('booking_cancelled', 'Бронювання скасовано'),
+        ('reminder_24h', 'Нагадування за 24 години'),
+        ('reminder_2h', 'Нагадування за 2 години'),
+    ]
+
+    user = models.ForeignKey(
+        GymUser,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name="Користувач"
+    )
+
+    booking = models.ForeignKey(
+        Booking,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='notifications',
+        verbose_name="Бронювання"
+    )
+
+    kind = models.CharField("Тип", max_length=30, choices=KIND_CHOICES)
+    subject = models.CharField("Тема", max_length=200)
+    body = models.TextField("Текст")
+
+    created_at = models.DateTimeField("Дата створення", auto_now_add=True)
+    # Час, коли send_notifications забрав повідомлення на надсилання (див. SEND_CLAIM_TIMEOUT)
+    sending_at = models.DateTimeField("Надсилається з", null=True, blank=True)
+    sent_at = models.DateTimeField("Надіслано", null=True, blank=True)
+
+    class Meta:
+        db_table = 'notifications'
+        verbose_name = 'Повідомлення'
+        verbose_name_plural = 'Повідомлення'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['sent_at', 'created_at'], name='notification_outbox_idx'),
+        ]
+        constraints = [
+            # Кожне повідомлення про бронювання створюється не більше одного разу
+            models.UniqueConstraint(fields=['booking', 'kind'], name='notification_booking_kind_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.user.email}"
+
+
+class BookingEvent(models.Model):
+    """Аудит переходів статусу бронювання"""
+
+    booking = models.ForeignKey(
+        Booking,
+        on_delete=models.CASCADE,
+        related_name='events',
+        verbose_name="Бронювання"
+    )
+
+    from_status = models.CharField("Був статус", max_length=20, choices=Booking.STATUS_CHOICES)
+    to_status = models.CharField("Новий статус", max_length=20, choices=Booking.STATUS_CHOICES)
+    actor = models.ForeignKey(
+        GymUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Хто змінив"
+    )
+
+    created_at = models.DateTimeField("Дата", auto_now_add=True)
+
+    class Meta:
+        db_table = 'booking_events'
+        verbose_name = 'Подія бронювання'
+        verbose_name_plural = 'Історія бронювань'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['booking', 'created_at'], name='booking_event_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.booking_id}: {self.from_status} → {self.to_status}"
+
+
+class Job(models.Model):
+    """Фонове завдання; виконується командою run_jobs"""
+
+    STATUS_CHOICES = [
+        ('pending', 'Очікує'),
+        ('running', 'Виконується'),
+        ('done', 'Виконано'),
+        ('failed', 'Помилка'),
+    ]
+
+    kind = models.CharField("Тип", max_length=50)
+    payload = models.JSONField("Дані", default=dict)
+    status = models.CharField("Статус", max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField("Спроб", default=0)
+    error = models.TextField("Помилка", blank=True)
+
+    # Масові дії (elevix.bulk): pk вибірки, прогрес і позиція, з якої продовжити після збою
+    object_ids = models.JSONField("Обрані ID", default=list, editable=False)
+    total = models.PositiveIntegerField("Усього", null=True, blank=True)
+    processed = models.PositiveIntegerField("Оброблено", default=0)
+    last_pk = models.BigIntegerField("Останній ID", null=True, blank=True)
+
+    created_at = models.DateTimeField("Дата створення", auto_now_add=True)
+    started_at = models.DateTimeField("Початок", null=True, blank=True)
+    # Оновлюється виконавцем; running без оновлень довше JOB_STALE_AFTER - покинуте завдання
+    heartbeat_at = models.DateTimeField("Остання активність", null=True, blank=True)
+    finished_at = models.DateTimeField("Завершено", null=True, blank=True)
+
+    class Meta:
+        db_table = 'jobs'
+        verbose_name = 'Завдання'
+        verbose_name_plural = 'Фонові завдання'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.get_status_display()})"
+
+
+class IdempotencyKey(models.Model):
+    """Результат POST-запиту за ключем ідемпотентності (для повторів з поганої мережі)"""
+
+    user = models.ForeignKey(
+        GymUser,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="Користувач"
+    )
+
+    key = models.CharField("Ключ", max_length=64)
+    request_digest = models.CharField("Відбиток запиту", max_length=64)
+    response_status = models.PositiveSmallIntegerField("Код відповіді")
+    response_location = models.CharField("Перенаправлення", max_length=500, blank=True)
+
+    created_at = models.DateTimeField("Дата створення", auto_now_add=True)
+    expires_at = models.DateTimeField("Діє до")
+
+    class Meta:
+        db_table = 'idempotency_keys'
+        verbose_name = 'Ключ ідемпотентності'
+        verbose_name_plural = 'Ключі ідемпотентності'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_user_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='idempotency_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.response_status})"
+
 
 class FAQ(models.Model):
     """Часті питання та відповіді"""
@@ -0,0 +1,59 @@
+"""Outbox повідомлень: запис у транзакції бізнес-операції, надсилання - окремим процесом"""
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Notification
+
+# Скільки повідомлень надсилається через одне SMTP-з'єднання
+SEND_BATCH_SIZE = 100
+
+# Повідомлення, забране процесом, що впав до позначки sent_at, повертається в чергу через цей час
+SEND_CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def _claim(batch_size):
+    """Забирає пакет ненадісланих повідомлень позначкою sending_at і одразу фіксує її"""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            Notification.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('user')
+            .filter(sent_at__isnull=True)
+            .filter(Q(sending_at__isnull=True) | Q(sending_at__lt=now - SEND_CLAIM_TIMEOUT))
+            .order_by('created_at', 'id')[:batch_size]
+        )
+        Notification.objects.filter(pk__in=[notification.pk for notification in batch]).update(sending_at=now)
+    return batch
+
+
+def send_pending(batch_size=SEND_BATCH_SIZE):
+    """
+    Надсилає ненадіслані повідомлення пакетами і повертає їх кількість.
+
+    Пакет забирається короткою транзакцією (SKIP LOCKED + sending_at), тож
+    кілька паралельних send_notifications не візьмуть один лист, а SMTP
+    не тримає транзакцію відкритою. Кожен лист позначається sent_at одразу
+    після надсилання: якщо SMTP падає посеред пакета, уже доставлені листи
+    не підуть повторно, а решта повертається в чергу.
+    """
+    sent = 0
+    while True:
+        batch = _claim(batch_size)
+        if not batch:
+            return sent
+        pending = {notification.pk for notification in batch}
+        try:
+            with get_connection() as connection:
+                for notification in batch:
+                    EmailMessage(
+                        notification.subject, notification.body, to=[notification.user.email], connection=connection
+                    ).send()
+                    Notification.objects.filter(pk=notification.pk).update(sent_at=timezone.now(), sending_at=None)
+                    pending.discard(notification.pk)
+                    sent += 1
+        finally:
+            Notification.objects.filter(pk__in=pending).update(sending_at=None)
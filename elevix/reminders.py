@@ -0,0 +1,100 @@
+"""Нагадування про заняття за 24 та 2 години до початку"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .booking import ACTIVE_STATUSES
+from .models import Booking, Notification
+
+# Тип нагадування -> за скільки до початку заняття його надсилати (від більшого до меншого)
+REMINDERS = (
+    ('reminder_24h', timedelta(hours=24), 'завтра'),
+    ('reminder_2h', timedelta(hours=2), 'за дві години'),
+)
+
+# Скільки бронювань обробляється за один запит
+REMINDER_BATCH_SIZE = 500
+
+
+def _due_bookings(kind, since, until):
+    """Активні бронювання з початком у (since, until] без нагадування kind - по індексу booking_upcoming_idx"""
+    return Booking.objects.filter(
+        status__in=ACTIVE_STATUSES,
+        booking_date__gt=since,
+        booking_date__lte=until,
+    ).exclude(
+        Exists(Notification.objects.filter(booking=OuterRef('pk'), kind=kind))
+    ).select_related('user', 'service').order_by('booking_date', 'id')
+
+
+def _insert_new(notifications, kind):
+    """
+    Записує нагадування і повертає кількість справді доданих.
+
+    Зазвичай це один INSERT. Якщо паралельний запуск уже записав частину
+    нагадувань, унікальність (booking, kind) відкочує INSERT - тоді
+    наявні відкидаються і решта записується повторно.
+    """
+    while notifications:
+        try:
+            with transaction.atomic():
+                Notification.objects.bulk_create(notifications)
+            return len(notifications)
+        except IntegrityError:
+            existing = set(Notification.objects.filter(
+                kind=kind, booking_id__in=[notification.booking_id for notification in notifications]
+            ).values_list('booking_id', flat=True))
+            if not existing:
+                raise
+            notifications = [notification for notification in notifications if notification.booking_id not in existing]
+    return 0
+
+
+def queue_reminders(now=None, batch_size=REMINDER_BATCH_SIZE):
+    """
+    Записує в outbox нагадування, час яких настав, і повертає їх кількість.
+
+    Кожне нагадування має своє вікно: 24-годинне - для занять, що почнуться
+    через 2-24 години, 2-годинне - протягом найближчих двох. Бронювання
+    читаються порціями за (booking_date, id) без OFFSET, шаблон листа
+    компілюється один раз. Унікальність (booking, kind) гарантує, що
+    повторний чи паралельний запуск не створить друге нагадування, а
+    в підсумок потрапляють лише справді записані.
+    """
+    now = now or timezone.now()
+    template = get_template('elevix/emails/booking_reminder.txt')
+    queued = 0
+    for index, (kind, lead, lead_text) in enumerate(REMINDERS):
+        # Нижня межа - вікно наступного (коротшого) нагадування
+        since = now + REMINDERS[index + 1][1] if index + 1 < len(REMINDERS) else now
+        bookings = _due_bookings(kind, since, now + lead)
+        position = None
+        while True:
+            page = bookings
+            if position is not None:
+                booking_date, pk = position
+                page = page.filter(Q(booking_date__gt=booking_date) | Q(booking_date=booking_date, id__gt=pk))
+            batch = list(page[:batch_size])
+            if not batch:
+                break
+            queued += _insert_new([
+                Notification(
+                    user_id=booking.user_id,
+                    booking=booking,
+                    kind=kind,
+                    subject=f'Нагадування: {booking.service.name} {lead_text}',
+                    body=template.render({
+                        'booking': booking,
+                        'lead': lead_text,
+                        'starts_at': timezone.localtime(booking.booking_date),
+                    }),
+                )
+                for booking in batch
+            ], kind)
+            if len(batch) < batch_size:
+                break
+            position = (batch[-1].booking_date, batch[-1].pk)
+    return queued
@@ -0,0 +1,91 @@
+"""Сигнали для знімків каталогу, занять розкладу, інвалідації кешу та варіантів зображень"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .cache import CATALOG, SCHEDULE, bump_version
+from .catalog import schedule_rebuild
+from .images import generate_variants
+from .models import GymUser, Trainer, Service, PricingPlan, ServiceFeature, Schedule, FAQ
+from .slots import schedule_regenerate
+
+# Моделі та поля зображень, для яких генеруються варіанти
+IMAGE_FIELDS = {
+    Trainer: 'photo',
+    GymUser: 'avatar',
+}
+
+
+# Знімки мають перебудуватися раніше, ніж буде збільшено версію каталогу,
+# тому ці обробники підключаються першими
+
+
+@receiver([post_save, post_delete], sender=Service)
+def refresh_service_snapshot(sender, instance, **kwargs):
+    schedule_rebuild([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=PricingPlan)
+@receiver([post_save, post_delete], sender=ServiceFeature)
+def refresh_parent_service_snapshot(sender, instance, **kwargs):
+    schedule_rebuild([instance.service_id])
+
+
+@receiver(pre_delete, sender=Trainer)
+def remember_trainer_services(sender, instance, **kwargs):
+    """Після видалення тренера зв'язок з послугами вже обнулено, тому запам'ятовуємо їх заздалегідь"""
+    instance._service_ids = list(instance.services.values_list('pk', flat=True))
+
+
+@receiver([post_save, post_delete], sender=Trainer)
+def refresh_trainer_snapshots(sender, instance, **kwargs):
+    service_ids = getattr(instance, '_service_ids', None)
+    if service_ids is None:
+        service_ids = list(instance.services.values_list('pk', flat=True))
+    schedule_rebuild(service_ids)
+
+
+@receiver(post_save, sender=Schedule)
+def regenerate_schedule_slots(sender, instance, **kwargs):
+    """Зміна часу, місткості чи активності шаблону переносить зміни на майбутні заняття"""
+    schedule_regenerate(schedule_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Service)
+def regenerate_service_slots(sender, instance, **kwargs):
+    """Неактивна послуга не має відкритих занять"""
+    schedule_regenerate(service_ids=[instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Trainer)
+@receiver([post_save, post_delete], sender=Service)
+@receiver([post_save, post_delete], sender=PricingPlan)
+@receiver([post_save, post_delete], sender=ServiceFeature)
+@receiver([post_save, post_delete], sender=FAQ)
+def invalidate_catalog(sender, **kwargs):
+    """Будь-яка зміна каталогу робить закешовані фрагменти головної застарілими"""
+    bump_version(CATALOG)
+
+
+@receiver([post_save, post_delete], sender=Schedule)
+def invalidate_schedule(sender, **kwargs):
+    """Зміна розкладу інвалідує валідатори сторінок тренерів"""
+    bump_version(SCHEDULE)
+
+
+@receiver(pre_save, sender=Trainer)
+@receiver(pre_save, sender=GymUser)
+def detect_new_image(sender, instance, **kwargs):
+    """Незбережений (_committed=False) файл означає щойно завантажене зображення"""
+    field_file = getattr(instance, IMAGE_FIELDS[sender])
+    instance._image_uploaded = bool(field_file) and not field_file._committed
+
+
+@receiver(post_save, sender=Trainer)
+@receiver(post_save, sender=GymUser)
+def create_image_variants(sender, instance, **kwargs):
+    if getattr(instance, '_image_uploaded', False):
+        instance._image_uploaded = False
+        transaction.on_commit(partial(generate_variants, getattr(instance, IMAGE_FIELDS[sender])))
@@ -0,0 +1,191 @@
+"""Матеріалізація занять (SlotOccurrence) з тижневих шаблонів розкладу та їх доступність"""
+from datetime import date as Date, datetime, timedelta
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .cache import aget_versions, bump_version
+from .models import Booking, Schedule, SlotOccurrence
+
+# На скільки тижнів уперед відкрито запис
+SLOT_WEEKS_AHEAD = 8
+
+# Скільки живе закешована доступність тижня (версія послуги інвалідує її раніше)
+AVAILABILITY_TIMEOUT = 60 * 60
+
+
+def availability_namespace(service_id):
+    """Простір версій доступності однієї послуги"""
+    return f'availability:{service_id}'
+
+
+def bump_availability(service_ids):
+    """Інвалідує закешовану доступність послуг після коміту"""
+    for service_id in set(service_ids):
+        bump_version(availability_namespace(service_id))
+
+
+def slot_bounds(schedule, date):
+    """Початок і кінець заняття за розкладом schedule у дату date"""
+    return (
+        timezone.make_aware(datetime.combine(date, schedule.start_time)),
+        timezone.make_aware(datetime.combine(date, schedule.end_time)),
+    )
+
+
+def occurrence_bounds(schedule, since, weeks):
+    """Межі занять розкладу на weeks тижнів, починаючи з дати since"""
+    first = since + timedelta(days=(schedule.day_of_week - since.weekday()) % 7)
+    for week in range(weeks):
+        yield slot_bounds(schedule, first + timedelta(weeks=week))
+
+
+def generate_slots(schedule_ids=None, service_ids=None, weeks=SLOT_WEEKS_AHEAD):
+    """
+    Синхронізує майбутні заняття з розкладом і повертає кількість створених.
+
+    Без аргументів обробляє весь розклад (щоденний запуск зсуває горизонт запису),
+    інакше - лише вказані розклади/послуги. Нові заняття створюються, змінені
+    (кінець, місткість) оновлюються, а ті, що більше не відповідають активному
+    розкладу, видаляються; якщо на них уже є записи - лише вимикаються.
+    """
+    now = timezone.now()
+    scope = Q()
+    if schedule_ids is not None:
+        scope &= Q(pk__in=set(schedule_ids))
+    if service_ids is not None:
+        scope &= Q(service_id__in=set(service_ids))
+    schedules = list(Schedule.objects.filter(scope).select_related('service'))
+
+    existing = {
+        (slot.schedule_id, slot.starts_at): slot
+        for slot in SlotOccurrence.objects.filter(
+            schedule__in=[schedule.pk for schedule in schedules], starts_at__gt=now
+        )
+    }
+
+    to_create, to_update, wanted = [], [], set()
+    for schedule in schedules:
+        if not (schedule.is_active and schedule.service.is_active):
+            continue
+        for starts_at, ends_at in occurrence_bounds(schedule, timezone.localdate(now), weeks):
+            if starts_at <= now:
+                continue
+            wanted.add((schedule.pk, starts_at))
+            fields = {
+                'service_id': schedule.service_id,
+                'trainer_id': schedule.trainer_id,
+                'ends_at': ends_at,
+                'capacity': schedule.max_participants,
+                'is_active': True,
+            }
+            slot = existing.get((schedule.pk, starts_at))
+            if slot is None:
+                to_create.append(SlotOccurrence(schedule=schedule, starts_at=starts_at, **fields))
+            elif any(getattr(slot, name) != value for name, value in fields.items()):
+                for name, value in fields.items():
+                    setattr(slot, name, value)
+                to_update.append(slot)
+
+    stale = [slot for key, slot in existing.items() if key not in wanted]
+    changed_services = {slot.service_id for slot in stale + to_update + to_create}
+    stale = [slot.pk for slot in stale]
+    with transaction.atomic():
+        if stale:
+            # Умова на booked_count у самому запиті - запис, що встиг з'явитися, не загубиться
+            SlotOccurrence.objects.filter(pk__in=stale, booked_count=0).delete()
+            SlotOccurrence.objects.filter(pk__in=stale, booked_count__gt=0).update(is_active=False)
+        SlotOccurrence.objects.bulk_update(
+            to_update, ['service', 'trainer', 'ends_at', 'capacity', 'is_active'], batch_size=500
+        )
+        SlotOccurrence.objects.bulk_create(to_create, batch_size=500, ignore_conflicts=True)
+        bump_availability(changed_services)
+    return len(to_create)
+
+
+def schedule_regenerate(schedule_ids=None, service_ids=None):
+    """Регенерація занять після коміту, щоб читати вже збережений розклад"""
+    transaction.on_commit(partial(generate_slots, schedule_ids=schedule_ids, service_ids=service_ids))
+
+
+def recount_slots(slot_ids):
+    """Перераховує booked_count з бронювань (після масових змін статусів через update())"""
+    booked = Booking.objects.filter(
+        slot=OuterRef('pk')
+    ).exclude(
+        status='cancelled'
+    ).values('slot').annotate(total=Count('pk')).values('total')
+    slots = SlotOccurrence.objects.filter(pk__in=set(slot_ids))
+    bump_availability(slots.values_list('service_id', flat=True))
+    return slots.update(booked_count=Coalesce(Subquery(booked), Value(0)))
+
+
+def week_start(date):
+    """Понеділок тижня, якому належить дата"""
+    return date - timedelta(days=date.weekday())
+
+
+def _slot_data(slot):
+    return {
+        'id': slot.pk,
+        'service_id': slot.service_id,
+        'trainer_id': slot.trainer_id,
+        'starts_at': timezone.localtime(slot.starts_at).isoformat(),
+        'ends_at': timezone.localtime(slot.ends_at).isoformat(),
+        'capacity': slot.capacity,
+        'booked': slot.booked_count,
+        'places_left': slot.places_left,
+    }
+
+
+async def aget_availability(service_ids, start, end):
+    """
+    Заняття послуг service_ids з датами в [start, end] разом із вільними місцями.
+
+    Кешується по (послуга, тиждень) з версією послуги, яку збільшують бронювання
+    та зміни розкладу. Тижні, яких немає в кеші, для всіх послуг читаються
+    одним запитом, тож кількість запитів не залежить від діапазону та кількості занять.
+    """
+    weeks, week = [], week_start(start)
+    while week <= end:
+        weeks.append(week)
+        week += timedelta(weeks=1)
+
+    versions = await aget_versions([availability_namespace(pk) for pk in service_ids])
+    keys = {
+        (pk, week): f'elevix:availability:{pk}:{week.isoformat()}:{versions[availability_namespace(pk)]}'
+        for pk in service_ids
+        for week in weeks
+    }
+    cached = await cache.aget_many(keys.values())
+
+    missing = [pair for pair, key in keys.items() if key not in cached]
+    if missing:
+        fresh = {pair: [] for pair in missing}
+        first_week = min(week for _, week in missing)
+        last_week = max(week for _, week in missing)
+        slots = SlotOccurrence.objects.filter(
+            service_id__in={pk for pk, _ in missing},
+            is_active=True,
+            starts_at__gte=timezone.make_aware(datetime.combine(first_week, datetime.min.time())),
+            starts_at__lt=timezone.make_aware(datetime.combine(last_week + timedelta(weeks=1), datetime.min.time())),
+        ).order_by('starts_at')
+        async for slot in slots:
+            pair = (slot.service_id, week_start(timezone.localdate(slot.starts_at)))
+            if pair in fresh:
+                fresh[pair].append(_slot_data(slot))
+        fresh = {keys[pair]: data for pair, data in fresh.items()}
+        await cache.aset_many(fresh, AVAILABILITY_TIMEOUT)
+        cached.update(fresh)
+
+    result = [
+        slot
+        for key in keys.values()
+        for slot in cached[key]
+        if start <= Date.fromisoformat(slot['starts_at'][:10]) <= end
+    ]
+    return sorted(result, key=lambda slot: (slot['starts_at'], slot['service_id']))
@@ -0,0 +1,142 @@
+"""Статичні файли: хешоване сховище з попередньо стиснутими копіями та їх віддача"""
+import gzip
+import mimetypes
+import re
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+from PIL import Image, UnidentifiedImageError
+
+try:
+    import brotli
+except ImportError:  # brotli - необов'язкова залежність, без неї пишемо лише .gz
+    brotli = None
+
+# Файли, які має сенс стискати
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.html', '.txt', '.json', '.map', '.xml')
+
+# Зображення, для яких створюється WebP-копія
+WEBP_SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Стиснута копія зберігається, лише якщо вона хоча б на 5% менша
+MIN_COMPRESSION_RATIO = 0.95
+
+# Ім'я, захешоване ManifestStaticFilesStorage: style.3f1a2b4c5d6e.css
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+
+
+class PrecompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage, що під час collectstatic додатково пише
+    .gz/.br копії текстових файлів та .webp копії JPEG/PNG поруч із хешованими.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = []
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.append(hashed_name)
+            yield name, hashed_name, processed
+
+        if dry_run:
+            return
+        for hashed_name in hashed_names:
+            self._write_sidecars(hashed_name)
+
+    def _write_sidecars(self, name):
+        suffix = Path(name).suffix.lower()
+        if suffix in COMPRESSIBLE_EXTENSIONS:
+            with self.open(name) as source:
+                content = source.read()
+            self._write_if_smaller(f'{name}.gz', gzip.compress(content, compresslevel=9, mtime=0), content)
+            if brotli is not None:
+                self._write_if_smaller(f'{name}.br', brotli.compress(content), content)
+        elif suffix in WEBP_SOURCE_EXTENSIONS:
+            self._write_webp(name)
+
+    def _write_if_smaller(self, name, compressed, original):
+        if len(compressed) < len(original) * MIN_COMPRESSION_RATIO:
+            self._replace(name, compressed)
+
+    def _write_webp(self, name):
+        try:
+            with self.open(name) as source:
+                image = Image.open(source)
+                image.load()
+        except (OSError, UnidentifiedImageError):
+            return
+        buffer = BytesIO()
+        image.save(buffer, 'WEBP', quality=80, method=6)
+        self._replace(f'{name}.webp', buffer.getvalue())
+
+    def _replace(self, name, content):
+        path = Path(self.path(name))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+
+def _accepts(header, token):
+    """Чи є token у заголовку Accept/Accept-Encoding без q=0"""
+    for part in header.split(','):
+        value, _, params = part.strip().partition(';')
+        if value.strip() == token:
+            return params.replace(' ', '') not in ('q=0', 'q=0.0')
+    return False
+
+
+def serve_static(request, path):
+    """
+    Віддає зібрані collectstatic файли з STATIC_ROOT.
+
+    Хешовані імена отримують Cache-Control immutable на рік, тож повторні
+    візити не роблять жодного запиту за статикою. Якщо клієнт підтримує,
+    віддаються готові .br/.gz копії або WebP-версія зображення.
+    """
+    try:
+        fullpath = Path(safe_join(settings.STATIC_ROOT, path))
+    except ValueError:
+        raise Http404
+    if not fullpath.is_file():
+        raise Http404
+
+    stat = fullpath.stat()
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    content_type, _ = mimetypes.guess_type(fullpath.name)
+    content_type = content_type or 'application/octet-stream'
+    served, encoding, vary = fullpath, None, []
+
+    if fullpath.suffix.lower() in WEBP_SOURCE_EXTENSIONS:
+        vary.append('Accept')
+        webp = fullpath.with_name(fullpath.name + '.webp')
+        if _accepts(request.META.get('HTTP_ACCEPT', ''), 'image/webp') and webp.is_file():
+            served, content_type = webp, 'image/webp'
+    elif fullpath.suffix.lower() in COMPRESSIBLE_EXTENSIONS:
+        vary.append('Accept-Encoding')
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        for candidate_encoding, extension in (('br', '.br'), ('gzip', '.gz')):
+            candidate = fullpath.with_name(fullpath.name + extension)
+            if _accepts(accept_encoding, candidate_encoding) and candidate.is_file():
+                served, encoding = candidate, candidate_encoding
+                break
+
+    response = FileResponse(served.open('rb'), content_type=content_type)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if vary:
+        response.headers['Vary'] = ', '.join(vary)
+    response.headers['Last-Modified'] = http_date(stat.st_mtime)
+    response.headers['Cache-Control'] = (
+        IMMUTABLE_CACHE_CONTROL if HASHED_NAME_RE.search(fullpath.name) else REVALIDATE_CACHE_CONTROL
+    )
+    return response
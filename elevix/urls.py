@@ -11,4 +11,6 @@ urlpatterns = [
     path('trainers/<int:pk>/', views.trainer_detail, name='trainer_detail'),
 
     path('booking/<int:service_id>/', views.booking_create, name='booking_create'),
+    path('booking/<int:pk>/cancel/', views.booking_cancel, name='booking_cancel'),
+    path('availability/', views.availability, name='availability'),
 ]
\ No newline at end of file
@@ -1,48 +1,128 @@
+import hashlib
 import logging
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
+from django.utils import timezone
+from django.views.decorators.http import require_POST
 from django.contrib import messages
 from django.contrib.auth import logout as auth_logout
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.db.models import Count, Max, Q
 
-from .forms import ProfileEditForm
-from .models import Trainer, Service, FAQ
+from .booking import ACTIVE_STATUSES, BookingError, SlotFullError, cancel_bookings, create_booking
+from .cache import CATALOG, SCHEDULE, aget_version, arender_fragments, get_version_datetime
+from .decorators import acondition, query_budget
+from .forms import AvailabilityForm, BookingForm, ProfileEditForm, TrainerFilterForm
+from .idempotency import idempotent
+from .models import Trainer, Service, CatalogSnapshot, FAQ, Booking
+from .pagination import encode_cursor, keyset_filter
+from .slots import aget_availability
+from .waitlist import WaitlistError, join_waitlist
 
+TRAINERS_PAGE_SIZE = 24
 
-def index(request):
-    """Головна сторінка з тренерами та послугами"""
-    trainers = Trainer.objects.all()
-    services = Service.objects.filter(
+
+async def _load_trainers():
+    return {"trainers": [trainer async for trainer in Trainer.objects.all()]}
+
+
+async def _load_services():
+    # Послуги з тарифами та особливостями читаємо з готових знімків одним запитом
+    services = CatalogSnapshot.objects.filter(
         is_active=True
-    ).prefetch_related(
-        'pricing_plans',
-        'features'
-    ).order_by('id')
+    ).order_by('service_id').values_list('data', flat=True)
+    return {"services": [data async for data in services]}
 
-    faqs = FAQ.objects.filter(is_active=True).order_by('sort_order', 'id')
 
-    return render(request, "index.html", {
-        "trainers": trainers,
-        "services": services,
-        "faqs": faqs,
-    })
+async def _load_faqs():
+    faqs = FAQ.objects.filter(is_active=True).order_by('sort_order', 'id')
+    return {"faqs": [faq async for faq in faqs]}
 
 
-def trainers_list(request):
-    """Список всіх тренерів"""
-    trainers = Trainer.objects.all()
-    print(f"Кількість тренерів: {trainers.count()}")
-    return render(request, 'elevix/trainers_list.html', {'trainers': trainers})
+@query_budget(3)
+async def index(request):
+    """Головна сторінка з тренерами та послугами"""
+    # Дані читаються з БД лише для фрагментів, яких ще немає в кеші
+    fragments = await arender_fragments(CATALOG, {
+        "trainers": ('elevix/fragments/index_trainers.html', _load_trainers),
+        "services": ('elevix/fragments/index_services.html', _load_services),
+        "faqs": ('elevix/fragments/index_faqs.html', _load_faqs),
+    })
+    return render(request, "index.html", {"fragments": fragments})
+
+
+def _make_etag(*parts):
+    return hashlib.md5(":".join(map(str, parts)).encode()).hexdigest()
+
+
+async def _trainers_list_validators(request):
+    """ETag та Last-Modified для списку тренерів (один агрегатний запит)"""
+    stats = await Trainer.objects.aaggregate(last=Max('updated_at'), total=Count('id'))
+    # Фільтри та курсор входять в ETag: кожна сторінка валідується окремо
+    return _make_etag(stats['last'], stats['total'], request.GET.urlencode()), stats['last']
+
+
+async def _trainer_detail_validators(request, pk):
+    """ETag та Last-Modified для сторінки тренера: тренер, знімки його послуг та версія розкладу"""
+    # Послуги показуються зі знімків каталогу, а знімок оновлюється і при зміні тарифу чи особливості
+    active = Q(service_snapshots__is_active=True)
+    row = await Trainer.objects.filter(pk=pk).aaggregate(
+        updated_at=Max('updated_at'),
+        services_updated=Max('service_snapshots__updated_at', filter=active),
+        services_total=Count('service_snapshots', filter=active),
+    )
+    if row['updated_at'] is None:
+        # Тренера немає - віддаємо керування view, яке поверне 404
+        return None, None
+
+    schedule_version = await aget_version(SCHEDULE)
+    schedule_changed = get_version_datetime(SCHEDULE, schedule_version)
+    last_modified = max(filter(None, [row['updated_at'], row['services_updated'], schedule_changed]))
+    etag = _make_etag(pk, row['updated_at'], row['services_updated'], row['services_total'], schedule_version)
+    return etag, last_modified
+
+
+@query_budget(2)
+@acondition(_trainers_list_validators)
+async def trainers_list(request):
+    """Список тренерів з фільтрами та keyset-пагінацією"""
+    form = TrainerFilterForm(request.GET)
+    trainers = keyset_filter(form.filter(Trainer.objects.all()), request.GET.get('cursor'))
+
+    # Беремо на один рядок більше, щоб дізнатися про наступну сторінку без COUNT
+    page = [trainer async for trainer in trainers[:TRAINERS_PAGE_SIZE + 1]]
+    next_query = None
+    if len(page) > TRAINERS_PAGE_SIZE:
+        page = page[:TRAINERS_PAGE_SIZE]
+        params = request.GET.copy()
+        params['cursor'] = encode_cursor(page[-1])
+        next_query = params.urlencode()
+
+    return render(request, 'elevix/trainers_list.html', {
+        'trainers': page,
+        'form': form,
+        'next_query': next_query,
+    })
 
 
-def trainer_detail(request, pk):
+@query_budget(4)
+@acondition(_trainer_detail_validators)
+async def trainer_detail(request, pk):
     """Детальна сторінка тренера"""
-    trainer = get_object_or_404(Trainer, pk=pk)
+    trainer = await aget_object_or_404(Trainer, pk=pk)
 
-    # Отримуємо послуги цього тренера
-    services = trainer.services.filter(is_active=True)
+    # Отримуємо послуги цього тренера (зі знімків каталогу)
+    services = CatalogSnapshot.objects.filter(
+        trainer_id=trainer.pk,
+        is_active=True
+    ).order_by('service_id').values_list('data', flat=True)
+    services = [data async for data in services]
 
     # Отримуємо розклад цього тренера
-    schedules = trainer.schedules.filter(is_active=True).order_by('day_of_week', 'start_time')
+    schedules = trainer.schedules.filter(
+        is_active=True
+    ).select_related('service').order_by('day_of_week', 'start_time')
+    schedules = [schedule async for schedule in schedules]
 
     context = {
         'trainer': trainer,
@@ -52,14 +132,50 @@ def trainer_detail(request, pk):
     return render(request, 'elevix/trainer_detail.html', context)
 
 
-@login_required(login_url='account_login')
-def profile(request):
-    """Профіль користувача з захистом авторизації"""
-    user = request.user
-    return render(request, "elevix/profile.html", {"user": user})
+@query_budget(2)
+async def availability(request):
+    """Вільні місця на заняттях за діапазон дат (JSON для інтерфейсу бронювання)"""
+    form = AvailabilityForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    data = form.cleaned_data
+
+    services = Service.objects.filter(is_active=True)
+    if data['service']:
+        services = services.filter(pk=data['service'])
+    if data['trainer']:
+        services = services.filter(schedules__trainer_id=data['trainer']).distinct()
+    service_ids = [pk async for pk in services.order_by('pk').values_list('pk', flat=True)]
+
+    slots = await aget_availability(service_ids, data['start'], data['end'])
+    if data['trainer']:
+        slots = [slot for slot in slots if slot['trainer_id'] == data['trainer']]
+
+    return JsonResponse({
+        'start': data['start'].isoformat(),
+        'end': data['end'].isoformat(),
+        'slots': slots,
+    })
 
 
+@query_budget(4)
+@login_required(login_url='account_login')
+async def profile(request):
+    """Профіль користувача з захистом авторизації"""
+    user = await request.auser()
+    # Контекст-процесор auth читає request.user синхронно - підставляємо вже завантаженого
+    request.user = user
+    trainer = await Trainer.objects.filter(user=user).afirst()
+    bookings = Booking.objects.filter(
+        user=user, status__in=ACTIVE_STATUSES, booking_date__gte=timezone.now()
+    ).select_related('service').order_by('booking_date')[:10]
+    bookings = [booking async for booking in bookings]
+    return render(request, "elevix/profile.html", {"user": user, "trainer": trainer, "bookings": bookings})
+
+
+@query_budget(8)
 @login_required(login_url='account_login')
+@idempotent
 def profile_edit(request):
     """Редагування профілю"""
     if request.method == 'POST':
@@ -81,9 +197,56 @@ def logout_view(request):
     return redirect("account_login")
 
 
+@query_budget(18)
 @login_required(login_url='account_login')
+@idempotent
 def booking_create(request, service_id):
     """Створення бронювання послуги"""
     service = get_object_or_404(Service, pk=service_id, is_active=True)
-    # Тут буде логіка створення бронювання
-    return render(request, 'elevix/booking_create.html', {'service': service})
\ No newline at end of file
+
+    if request.method == 'POST':
+        form = BookingForm(service, request.POST)
+        if form.is_valid():
+            data = form.cleaned_data
+            try:
+                booking = create_booking(
+                    request.user, data['schedule'].pk, data['pricing_plan'].pk, data['date'], data['notes']
+                )
+            except SlotFullError as e:
+                if not data['join_waitlist']:
+                    form.add_error(None, f'{e} Позначте «Стати в чергу», щоб отримати місце, щойно воно звільниться.')
+                else:
+                    try:
+                        join_waitlist(request.user, e.slot_id, data['pricing_plan'].pk)
+                    except WaitlistError as waitlist_error:
+                        form.add_error(None, str(waitlist_error))
+                    else:
+                        messages.info(request, 'Місць немає - ви в черзі. Повідомимо, щойно місце звільниться.')
+                        return redirect('elevix:profile')
+            except BookingError as e:
+                form.add_error(None, str(e))
+            else:
+                messages.success(
+                    request,
+                    f"Ви записані на {booking.booking_date:%d.%m.%Y %H:%M}. До сплати: {booking.total_price} грн."
+                )
+                return redirect('elevix:profile')
+    else:
+        form = BookingForm(service)
+
+    return render(request, 'elevix/booking_create.html', {'service': service, 'form': form})
+
+
+@query_budget(16)
+@require_POST
+@login_required(login_url='account_login')
+@idempotent
+def booking_cancel(request, pk):
+    """Скасування власного бронювання (звільнене місце отримує перший у черзі)"""
+    booking = get_object_or_404(Booking, pk=pk, user=request.user)
+    cancelled, _ = cancel_bookings([booking.pk], actor=request.user)
+    if cancelled:
+        messages.success(request, 'Бронювання скасовано.')
+    else:
+        messages.error(request, 'Це бронювання вже не можна скасувати.')
+    return redirect('elevix:profile')
@@ -0,0 +1,156 @@
+"""Черга на заповнені заняття та переведення з неї при скасуванні"""
+from django.db import IntegrityError, transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import Booking, Notification, PricingPlan, SlotOccurrence, WaitlistEntry
+
+
+class WaitlistError(Exception):
+    """Стати в чергу неможливо"""
+
+
+def join_waitlist(user, slot_id, pricing_plan_id):
+    """Ставить користувача в кінець черги на заповнене заняття"""
+    slot = SlotOccurrence.objects.filter(pk=slot_id, is_active=True, starts_at__gt=timezone.now()).first()
+    if slot is None:
+        raise WaitlistError('Заняття недоступне.')
+    # Вільні місця при непорожній черзі дістануться їй, тож новий учасник стає за нею
+    has_queue = WaitlistEntry.objects.filter(slot=slot, status='waiting').exists()
+    if slot.booked_count < slot.capacity and not has_queue:
+        raise WaitlistError('На заняття є вільні місця - забронюйте його.')
+    if not PricingPlan.objects.filter(pk=pricing_plan_id, service_id=slot.service_id).exists():
+        raise WaitlistError('Тарифний план не належить цій послузі.')
+    if Booking.objects.filter(slot=slot, user=user, status__in=('pending', 'confirmed')).exists():
+        raise WaitlistError('Ви вже записані на це заняття.')
+    try:
+        with transaction.atomic():
+            return WaitlistEntry.objects.create(slot=slot, user=user, pricing_plan_id=pricing_plan_id)
+    except IntegrityError:
+        raise WaitlistError('Ви вже в черзі на це заняття.')
+
+
+def release_place(slot_id):
+    """
+    Звільняє місце на занятті й віддає його першому в черзі.
+
+    Викликається в транзакції скасування. Голова черги читається одним
+    індексованим запитом (waitlist_head_idx), тож вартість не залежить від
+    довжини черги. Зменшення лічильника блокує рядок заняття, а SKIP LOCKED
+    не дає двом паралельним скасуванням перевести одного й того самого учасника.
+    Повертає створене бронювання або None, якщо черга порожня.
+    """
+    SlotOccurrence.objects.filter(pk=slot_id, booked_count__gt=0).update(booked_count=F('booked_count') - 1)
+    return promote_next(slot_id)
+
+
+def promote_next(slot_id):
+    """Віддає вільне місце заняття першому в черзі; None, якщо черга порожня або місць немає"""
+    entry = (
+        WaitlistEntry.objects.select_for_update(skip_locked=True, of=('self',))
+        .select_related('slot__service', 'pricing_plan')
+        .filter(slot_id=slot_id, status='waiting')
+        .order_by('created_at', 'id')
+        .first()
+    )
+    if entry is None:
+        return None
+
+    reserved = SlotOccurrence.objects.filter(
+        pk=slot_id, is_active=True, starts_at__gt=timezone.now(), booked_count__lt=F('capacity')
+    ).update(booked_count=F('booked_count') + 1)
+    if not reserved:
+        return None
+
+    slot = entry.slot
+    booking = _promoted_booking(entry, slot)
+    booking.save()
+
+    entry.status = 'promoted'
+    entry.booking = booking
+    entry.save(update_fields=['status', 'booking', 'updated_at'])
+
+    Notification.objects.create(**_promotion_notice(booking, slot))
+    return booking
+
+
+def _promoted_booking(entry, slot):
+    """Незбережене бронювання для учасника черги entry на занятті slot"""
+    plan = entry.pricing_plan
+    booking = Booking(
+        user_id=entry.user_id,
+        service_id=slot.service_id,
+        pricing_plan=plan,
+        schedule_id=slot.schedule_id,
+        slot_id=slot.pk,
+        booking_date=slot.starts_at,
+        total_price=plan.effective_price,
+    )
+    # bulk_create не викликає Booking.save(), тож заняття пакета заповнюються тут
+    if plan.sessions_count:
+        booking.sessions_total = booking.sessions_remaining = plan.sessions_count
+    return booking
+
+
+def _promotion_notice(booking, slot):
+    """Поля повідомлення waitlist_promoted для бронювання з черги"""
+    starts_at = timezone.localtime(slot.starts_at)
+    return dict(
+        user_id=booking.user_id,
+        booking=booking,
+        kind='waitlist_promoted',
+        subject=f'Місце звільнилося: {slot.service.name}',
+        body=(
+            f'Для вас звільнилося місце на занятті «{slot.service.name}» '
+            f'{starts_at:%d.%m.%Y о %H:%M}. Бронювання вже створено, до сплати: {booking.total_price} грн.'
+        ),
+    )
+
+
+def promote_waiting(slot_ids):
+    """
+    Заповнює з черги всі вільні місця занять slot_ids (після пакетного скасування).
+
+    Сталий набір запитів незалежно від кількості занять і переведених:
+    блокування занять із вільними місцями, вибірка перших N у черзі кожного
+    заняття (ROW_NUMBER() за created_at, id; N - вільні місця), блокування цих
+    записів, по одному bulk_create бронювань і повідомлень та по одному
+    bulk_update черги й лічильників. Записи, які саме переводить promote_next
+    іншого скасування, пропускаються (SKIP LOCKED). Повертає кількість переведених.
+    """
+    slots = {
+        slot.pk: slot
+        for slot in SlotOccurrence.objects.select_for_update(of=('self',)).select_related('service').filter(
+            pk__in=set(slot_ids), is_active=True, starts_at__gt=timezone.now(), booked_count__lt=F('capacity')
+        )
+    }
+    if not slots:
+        return 0
+
+    heads = WaitlistEntry.objects.filter(slot_id__in=slots, status='waiting').annotate(
+        position=Window(RowNumber(), partition_by=F('slot_id'), order_by=(F('created_at').asc(), F('id').asc())),
+        free=F('slot__capacity') - F('slot__booked_count'),
+    ).filter(position__lte=F('free')).values_list('pk', flat=True)
+    entries = list(
+        WaitlistEntry.objects.select_for_update(skip_locked=True, of=('self',))
+        .select_related('pricing_plan')
+        .filter(pk__in=list(heads), status='waiting')
+        .order_by('slot_id', 'created_at', 'id')
+    )
+    if not entries:
+        return 0
+
+    bookings = Booking.objects.bulk_create([_promoted_booking(entry, slots[entry.slot_id]) for entry in entries])
+    now = timezone.now()
+    for entry, booking in zip(entries, bookings):
+        entry.status, entry.booking, entry.updated_at = 'promoted', booking, now
+        slots[entry.slot_id].booked_count += 1
+    WaitlistEntry.objects.bulk_update(entries, ['status', 'booking', 'updated_at'])
+    SlotOccurrence.objects.bulk_update(
+        [slots[slot_id] for slot_id in {entry.slot_id for entry in entries}], ['booked_count']
+    )
+    Notification.objects.bulk_create([
+        Notification(**_promotion_notice(booking, slots[booking.slot_id])) for booking in bookings
+    ])
+    return len(entries)
@@ -3,6 +3,14 @@ ASGI config for mysite project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Production entry point (публічні сторінки та профіль - async-представлення,
+тож під ASGI вони не займають окремий потік на запит):
+
+    gunicorn mysite.asgi:application -k uvicorn.workers.UvicornWorker \
+        --workers 4 --bind 0.0.0.0:8000
+
+Порівняння з WSGI: python benchmarks/asgi_vs_wsgi.py --help
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -1,10 +1,11 @@
 from django import views
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
 
+from elevix.static import serve_static
 from elevix.views import index
 
 urlpatterns = [
@@ -15,6 +16,10 @@ urlpatterns = [
 
 ]
 
+if not settings.DEBUG:
+    # Хешована статика з довгим кешуванням (див. elevix.static)
+    urlpatterns += [re_path(r'^static/(?P<path>.*)$', serve_static)]
+
 if settings.DEBUG:  # только в режиме разработки
     import debug_toolbar
     urlpatterns += [path("__debug__/", include(debug_toolbar.urls))]